@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class ProductionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.production'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        # tokens modülü check --deploy için sistem kontrolü kaydeder
+        from . import tokens
+        from .catalog import bump_catalog_version
+        from .sites import remove_instance, replicate_instance
+
+        # Referans verideki değişiklikler saha veritabanlarına kopyalanır
+        post_save.connect(replicate_instance, dispatch_uid='production.replicate_instance')
+        post_delete.connect(remove_instance, dispatch_uid='production.remove_instance')
+        # Katalog değişiklikleri planlama matrislerini geçersiz kılar
+        post_save.connect(bump_catalog_version, dispatch_uid='production.bump_catalog_version')
+        post_delete.connect(bump_catalog_version, dispatch_uid='production.bump_catalog_version_delete')
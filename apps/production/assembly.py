@@ -0,0 +1,111 @@
+"""
+Stoktaki parçalardan montaj: uçak üretimi ve alt montaj üretimi aynı
+stok kontrolü ve parça tüketimi mantığını kullanır. Fonksiyonlar
+sahanın transaction'ı içinde çağrılmalıdır.
+"""
+from django.utils import timezone
+
+from .changes import record_changes
+from .events import publish_on_commit
+from .models import AircraftPart, AircraftPartRequirement, Part, PartStock, ProducedAircraft
+from .stock import apply_stock_deltas
+
+
+def reserve_parts(aircraft, part_types, quantities):
+    """
+    {part_type_id: adet} için stoktaki parçaları kilitleyerek seçer.
+    (seçilen parçalar {part_type_id: [Part]}, eksik parça listesi) döner;
+    eksik listesi boş değilse hiçbir parça kullanılmamalıdır.
+    """
+    stocks = dict(
+        PartStock.objects.filter(aircraft=aircraft, part_type_id__in=list(quantities))
+        .values_list('part_type_id', 'stock_quantity')
+    )
+    reserved = {}
+    missing = []
+    for part_type_id, required in quantities.items():
+        available = stocks.get(part_type_id, 0)
+        if available >= required:
+            parts = list(
+                Part.objects.filter(
+                    part_type_id=part_type_id,
+                    aircraft=aircraft,
+                    status='stock',
+                    is_deleted=False,
+                    reservation__isnull=True
+                ).order_by('id').select_for_update()[:required]
+            )
+            available = len(parts)
+            if available >= required:
+                reserved[part_type_id] = parts
+                continue
+        missing.append({
+            'part_type': part_types[part_type_id].name,
+            'aircraft': aircraft.name,
+            'required': required,
+            'available': available,
+            'missing': required - available
+        })
+    return reserved, missing
+
+
+def consume_parts(aircraft, parts, consumed_at):
+    """
+    Parçaları kullanılmış olarak işaretler, stok sayaçlarını düşürür ve
+    değişiklikleri yayınlar. Parçalar üzerinde önceden atanmış diğer
+    alanlar (ör. assembled_into) da aynı sorgu ile yazılır.
+    """
+    deltas = {}
+    consumed_by_team = {}
+    for part in parts:
+        part.status = 'used'
+        part.is_deleted = True
+        part.deleted_at = consumed_at
+        # Satırlar reserve_parts ile kilitli olduğu için sürüm kesin bilinir
+        part.version += 1
+        key = (part.part_type_id, aircraft.id)
+        deltas[key] = deltas.get(key, 0) - 1
+        consumed_by_team.setdefault(part.team_id, []).append(part.id)
+
+    Part.objects.bulk_update(parts, ['status', 'is_deleted', 'deleted_at', 'assembled_into', 'version'], batch_size=1000)
+    apply_stock_deltas(deltas)
+    for team_id, part_ids in consumed_by_team.items():
+        publish_on_commit('part.consumed', {'ids': part_ids}, team_id=team_id)
+        record_changes('part', part_ids, team_id=team_id, deleted=True)
+
+
+def assemble_aircraft(aircraft):
+    """
+    Uçağın parça gereksinimlerini stoktan karşılayarak bir uçak üretir.
+    (üretilen uçak, eksik parça listesi) döner; eksik parça varsa uçak
+    üretilmez ve stok değişmez.
+    """
+    requirements = AircraftPartRequirement.objects.filter(
+        aircraft=aircraft
+    ).select_related('part_type')
+
+    # Stok kontrolü ve kullanılacak parçaları kilitle
+    parts_to_use, missing_parts = reserve_parts(
+        aircraft,
+        {requirement.part_type_id: requirement.part_type for requirement in requirements},
+        {requirement.part_type_id: requirement.required_quantity for requirement in requirements}
+    )
+    if missing_parts:
+        return None, missing_parts
+
+    produced_aircraft = ProducedAircraft.objects.create(aircraft=aircraft)
+
+    # Kullanılan parçaları işaretle, stoktan düş ve uçağa bağla
+    parts = [part for part_list in parts_to_use.values() for part in part_list]
+    consume_parts(aircraft, parts, timezone.now())
+    AircraftPart.objects.bulk_create([
+        AircraftPart(produced_aircraft=produced_aircraft, part=part)
+        for part in parts
+    ])
+
+    record_changes('produced_aircraft', [produced_aircraft.id])
+    publish_on_commit('produced_aircraft.created', {
+        'id': produced_aircraft.id,
+        'aircraft': aircraft.id,
+    })
+    return produced_aircraft, []
@@ -0,0 +1,284 @@
+"""
+Parça ve uçak üretim işlemlerinin asenkron, toplu denetim kaydı.
+
+Olay yayınlanan her yazma işlemi (bkz. events.publish_on_commit) için
+transaction commit edildikten sonra parça başına kısa bir kayıt süreç içi
+tampona eklenir. Tampon; dolduğunda (AUDIT['BATCH_SIZE']), belirli
+aralıklarla (AUDIT['FLUSH_INTERVAL']) ve süreç kapanırken tek bir toplu
+INSERT ile AuditEntry tablosuna yazılır. Böylece iş transaction'ı denetim
+yazısını beklemez.
+
+Commit edilen bir işlemin kaydı kaybolmasın diye tampondaki kayıtlar
+AUDIT['SPOOL_DIR'] altındaki süreç dosyasına da eklenir; dosya kayıtlar
+veritabanına yazıldıktan sonra silinir. Süreç çökerse sonraki süreçler
+sahipsiz kalan dosyaları yeniden yükler. Veritabanı hatasında kayıtlar
+tamponda kalır ve sonraki boşaltmada tekrar denenir; `event_id` sayesinde
+aynı kayıt iki kez eklenmez.
+"""
+import atexit
+import contextvars
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditEntry, Personnel
+
+logger = logging.getLogger(__name__)
+
+# Denetlenen olaylar ve denetim kaydındaki karşılıkları
+AUDITED_EVENTS = {
+    'part.created': 'part.produced',
+    'part.consumed': 'part.consumed',
+    'part.deleted': 'part.deleted',
+    'part.status': 'part.status',
+    'produced_aircraft.created': 'aircraft.produced',
+}
+
+_actor = contextvars.ContextVar('audit_actor', default=None)
+
+
+def get_config():
+    return {
+        'BATCH_SIZE': 500,
+        'FLUSH_INTERVAL': 1.0,
+        'MAX_PENDING': 50000,
+        'SPOOL_DIR': None,
+        **getattr(settings, 'AUDIT', {}),
+    }
+
+
+def get_actor():
+    """İşlemi yapan kullanıcının id'si (istek dışında None)."""
+    return _actor.get()
+
+
+def build_records(event_type, data, team_id, site, user_id):
+    """
+    Olaydan parça başına denetim kayıtları üretir. Takıma özel olmayan
+    olaylar (ör. uçak üretimi) işlemi yapanın takımı ile kaydedilir.
+    """
+    action = AUDITED_EVENTS[event_type]
+    if team_id is None and user_id is not None:
+        team_id = Personnel.objects.filter(user_id=user_id).values_list('team_id', flat=True).first()
+    common = {
+        'created_at': timezone.now(),
+        'action': action,
+        'user_id': user_id,
+        'team_id': team_id,
+        'site': site,
+    }
+    details = {key: value for key, value in data.items() if key not in ('id', 'ids')}
+    if event_type == 'produced_aircraft.created':
+        return [{
+            **common, 'event_id': uuid.uuid4().hex, 'part_id': None,
+            'produced_aircraft_id': data['id'], 'data': details,
+        }]
+    return [
+        {**common, 'event_id': uuid.uuid4().hex, 'part_id': part_id, 'produced_aircraft_id': None, 'data': details}
+        for part_id in data['ids']
+    ]
+
+
+def record_event(event_type, data, team_id, site, user_id):
+    """Commit sonrası yayınlanan olayı denetim tamponuna ekler."""
+    if event_type in AUDITED_EVENTS:
+        buffer.add(build_records(event_type, data, team_id, site, user_id))
+
+
+class AuditBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._pending = []
+        self._segment = None
+        self._segment_path = None
+        self._segment_count = 0
+        # Kayıtları henüz veritabanına yazılamamış eski dosyalar
+        self._unflushed_segments = []
+        self._thread = None
+        self._atexit_registered = False
+
+    def add(self, records):
+        config = get_config()
+        with self._lock:
+            if self._pid != os.getpid():
+                # fork sonrası üst sürecin tamponu ve dosyaları bu sürece ait değildir
+                self._reset()
+            self._pending.extend(records)
+            self._spool(records, config)
+            pending = len(self._pending)
+            self._ensure_started(config)
+
+        if pending >= config['MAX_PENDING'] or (pending >= config['BATCH_SIZE'] and self._thread is None):
+            # Arka plan boşaltıcı yoksa veya yetişemiyorsa çağıran bekler
+            self.flush()
+        elif pending >= config['BATCH_SIZE']:
+            self._wake.set()
+
+    def _spool(self, records, config):
+        if not config['SPOOL_DIR']:
+            return
+        if self._segment is None:
+            os.makedirs(config['SPOOL_DIR'], exist_ok=True)
+            self._segment_count += 1
+            self._segment_path = os.path.join(
+                config['SPOOL_DIR'], f"audit-{self._pid}-{self._segment_count}.jsonl"
+            )
+            self._segment = open(self._segment_path, 'a', encoding='utf-8')
+        self._segment.write(''.join(json.dumps(record, cls=DjangoJSONEncoder) + '\n' for record in records))
+        # İşletim sistemine bırakılan veri süreç çökse de korunur
+        self._segment.flush()
+
+    def _ensure_started(self, config):
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+        if self._thread is None and config['FLUSH_INTERVAL']:
+            self._thread = threading.Thread(
+                target=self._run, args=(config['FLUSH_INTERVAL'],), name='audit-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self, interval):
+        recover_spool()
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            close_old_connections()
+            self.flush()
+
+    def flush(self):
+        """Tampondaki kayıtları tek toplu INSERT ile yazar; yazılan kayıt sayısını döner."""
+        with self._flush_lock:
+            with self._lock:
+                if self._pid != os.getpid():
+                    return 0
+                batch, self._pending = self._pending, []
+                segment = self._close_segment()
+            if not batch:
+                return 0
+            try:
+                write_records(batch)
+            except Exception:
+                logger.exception("Denetim kayıtları yazılamadı, tekrar denenecek (%d kayıt)", len(batch))
+                with self._lock:
+                    self._pending[:0] = batch
+                    if segment:
+                        self._unflushed_segments.append(segment)
+                return 0
+
+            for path in self._unflushed_segments + ([segment] if segment else []):
+                remove_file(path)
+            self._unflushed_segments = []
+            return len(batch)
+
+    def _close_segment(self):
+        path = self._segment_path
+        if self._segment is not None:
+            self._segment.close()
+        self._segment = self._segment_path = None
+        return path
+
+    def owns(self, path):
+        return path == self._segment_path or path in self._unflushed_segments
+
+
+def write_records(records):
+    AuditEntry.objects.bulk_create(
+        [AuditEntry(**record) for record in records],
+        batch_size=get_config()['BATCH_SIZE'],
+        ignore_conflicts=True
+    )
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def recover_spool():
+    """
+    Çökmüş süreçlerden kalan denetim dosyalarını veritabanına yazar;
+    yazılan kayıt sayısını döner.
+    """
+    spool_dir = get_config()['SPOOL_DIR']
+    if not spool_dir:
+        return 0
+    recovered = 0
+    for path in glob.glob(os.path.join(spool_dir, 'audit-*.jsonl')):
+        try:
+            pid = int(os.path.basename(path).split('-')[1])
+        except (IndexError, ValueError):
+            continue
+        # Aynı pid'li eski bir süreçten (ör. yeniden başlayan konteyner) kalan dosyalar da sahipsizdir
+        if (pid == os.getpid() and buffer.owns(path)) or (pid != os.getpid() and is_process_alive(pid)):
+            continue
+        claimed = f"{path}.recovering-{os.getpid()}"
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            # Başka bir süreç sahiplendi
+            continue
+        records = []
+        with open(claimed, encoding='utf-8') as spool:
+            for line in spool:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Çökme sırasında yarım kalmış son satır
+                    continue
+                record['created_at'] = parse_datetime(record['created_at'])
+                records.append(record)
+        try:
+            write_records(records)
+        except Exception:
+            logger.exception("Denetim dosyası yüklenemedi: %s", path)
+            os.rename(claimed, path)
+            continue
+        remove_file(claimed)
+        recovered += len(records)
+    return recovered
+
+
+buffer = AuditBuffer()
+
+
+class AuditMixin:
+    """İstekteki kullanıcıyı, yayınlanan olayların denetim kayıtları için saklar."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._audit_token = _actor.set(request.user.id if request.user.is_authenticated else None)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_audit_token', None)
+        if token is not None:
+            _actor.reset(token)
+            self._audit_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,211 @@
+"""
+Tek istekte birden fazla API çağrısı (POST /api/batch/).
+
+Alt istekler mevcut URL çözücüsü ve ViewSet'ler üzerinden süreç içinde
+çalıştırılır. Kimlik doğrulaması toplu istek için bir kez yapılır; alt
+isteklere doğrulanmış kullanıcı ve token (saha bilgisiyle birlikte)
+aktarılır. Ardışık GET istekleri birbirinden bağımsız kabul edilir ve
+BATCH['MAX_WORKERS'] iş parçacığı ile paralel çalışır; yazma istekleri
+sırayla ve kendinden önceki okumalar bittikten sonra çalışır, böylece
+sonraki okumalar yazmanın sonucunu görür.
+"""
+import contextvars
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import Http404, QueryDict, StreamingHttpResponse
+from django.urls import Resolver404, resolve, reverse
+from rest_framework import status
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ALLOWED_METHODS = SAFE_METHODS + ('POST', 'PUT', 'PATCH', 'DELETE')
+# Alt isteğin kendi başlığı olarak gönderilebilecek başlıklar
+SUB_REQUEST_HEADERS = ('If-Match', 'Idempotency-Key')
+# Alt istek yanıtından aktarılan başlıklar
+RESPONSE_HEADERS = ('ETag', 'Location', 'Retry-After')
+# Toplu isteğe ait olup alt isteklere aktarılmayan başlıklar
+EXCLUDED_META = ('HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH', 'HTTP_IF_MATCH', 'HTTP_IDEMPOTENCY_KEY')
+
+
+class BatchError(Exception):
+    """Toplu istek gövdesi geçersiz."""
+
+
+def get_config():
+    return {
+        'MAX_REQUESTS': 20,
+        'MAX_WORKERS': 4,
+        **getattr(settings, 'BATCH', {}),
+    }
+
+
+def get_max_workers():
+    workers = get_config()['MAX_WORKERS']
+    admission = getattr(settings, 'ADMISSION_CONTROL', {})
+    if admission.get('ENABLED') and admission.get('USER_CONCURRENCY'):
+        # Paralel alt istekler kullanıcının eşzamanlı ağır istek sınırını aşıp 429 almasın
+        workers = min(workers, admission['USER_CONCURRENCY'])
+    return workers
+
+
+def parse_sub_requests(data):
+    """
+    Toplu istek gövdesini doğrular ve alt istekleri normalleştirir:
+    {"requests": [{"method": "GET", "path": "/api/aircrafts/", "params": {...}, "body": {...}}]}
+    """
+    items = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise BatchError('requests alanı boş olmayan bir liste olmalıdır')
+    max_requests = get_config()['MAX_REQUESTS']
+    if len(items) > max_requests:
+        raise BatchError(f"Tek istekte en fazla {max_requests} alt istek gönderilebilir")
+
+    batch_path = reverse('api:batch')
+    sub_requests = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise BatchError(f"requests[{index}] bir nesne olmalıdır")
+        method = str(item.get('method', 'GET')).upper()
+        path = item.get('path')
+        params = item.get('params') or {}
+        headers = item.get('headers') or {}
+        if method not in ALLOWED_METHODS:
+            raise BatchError(f"requests[{index}]: geçersiz metot {method}")
+        if not isinstance(path, str) or not path.startswith('/api/'):
+            raise BatchError(f"requests[{index}]: path /api/ ile başlamalıdır")
+        path, _, query = path.partition('?')
+        if path == batch_path:
+            raise BatchError(f"requests[{index}]: toplu istekler iç içe kullanılamaz")
+        if not isinstance(params, dict) or not isinstance(headers, dict):
+            raise BatchError(f"requests[{index}]: params ve headers nesne olmalıdır")
+        sub_requests.append({
+            'id': item.get('id', index),
+            'method': method,
+            'path': path,
+            'query': build_query(query, params),
+            'body': item.get('body'),
+            'headers': {name: str(value) for name, value in headers.items() if name in SUB_REQUEST_HEADERS},
+        })
+    return sub_requests
+
+
+def build_query(query, params):
+    merged = QueryDict(query, mutable=True)
+    for name, value in params.items():
+        merged.setlist(name, [str(v) for v in value] if isinstance(value, list) else [str(value)])
+    return merged.urlencode()
+
+
+def build_request(request, sub_request):
+    """
+    Alt istek için WSGI isteği oluşturur. Kimlik doğrulaması tekrarlanmaz:
+    toplu isteğin kullanıcısı ve token'ı DRF'in zorunlu kimlik doğrulaması
+    ile aktarılır.
+    """
+    payload = b''
+    if sub_request['body'] is not None:
+        payload = json.dumps(sub_request['body']).encode('utf-8')
+    meta = request.META
+    environ = {
+        **{key: value for key, value in meta.items() if key.startswith('HTTP_') and key not in EXCLUDED_META},
+        **{'HTTP_' + name.upper().replace('-', '_'): value for name, value in sub_request['headers'].items()},
+        'REQUEST_METHOD': sub_request['method'],
+        'PATH_INFO': sub_request['path'],
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': sub_request['query'],
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'REMOTE_ADDR': meta.get('REMOTE_ADDR', ''),
+        'SERVER_NAME': meta.get('SERVER_NAME', 'localhost'),
+        'SERVER_PORT': str(meta.get('SERVER_PORT', '80')),
+        'SERVER_PROTOCOL': meta.get('SERVER_PROTOCOL', 'HTTP/1.1'),
+        'wsgi.input': io.BytesIO(payload),
+        'wsgi.url_scheme': request.scheme,
+    }
+    sub = WSGIRequest(environ)
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def dispatch(request, sub_request):
+    """Alt isteği çözümlenen view ile çalıştırır ve sonucunu döner."""
+    result = {'id': sub_request['id']}
+    try:
+        match = resolve(sub_request['path'])
+        response = match.func(build_request(request, sub_request), *match.args, **match.kwargs)
+    except (Resolver404, Http404):
+        return {**result, 'status': status.HTTP_404_NOT_FOUND, 'body': {'error': 'Bulunamadı'}}
+    if isinstance(response, StreamingHttpResponse):
+        return {
+            **result, 'status': status.HTTP_400_BAD_REQUEST,
+            'body': {'error': 'Akış yanıtları toplu istekte desteklenmez'},
+        }
+
+    if hasattr(response, 'data'):
+        # DRF yanıtı: veri dış yanıtla birlikte tek seferde JSON'a çevrilir
+        body = response.data
+    else:
+        if hasattr(response, 'render'):
+            response.render()
+        try:
+            body = json.loads(response.content) if response.content else None
+        except ValueError:
+            body = response.content.decode(response.charset or 'utf-8', errors='replace')
+    headers = {name: response[name] for name in RESPONSE_HEADERS if response.has_header(name)}
+    result.update({'status': response.status_code, 'body': body})
+    if headers:
+        result['headers'] = headers
+    return result
+
+
+def run_isolated(request, sub_request):
+    """
+    Alt isteği iş parçacığında, toplu isteğin bağlam değişkenlerinin
+    (saha, replika, denetim) kopyası ile çalıştırır ve kendi veritabanı
+    bağlantılarını kapatır.
+    """
+    try:
+        return dispatch(request, sub_request)
+    finally:
+        connections.close_all()
+
+
+def execute(request, sub_requests):
+    """
+    Alt istekleri çalıştırır; sonuçlar gönderilme sırasıyla döner. Ardışık
+    GET istekleri paralel, diğerleri sırayla çalışır.
+    """
+    max_workers = get_max_workers()
+    results = []
+    group = []
+
+    def run_group(executor):
+        if len(group) == 1 or executor is None:
+            results.extend(dispatch(request, item) for item in group)
+        else:
+            futures = [
+                executor.submit(contextvars.copy_context().run, run_isolated, request, item)
+                for item in group
+            ]
+            results.extend(future.result() for future in futures)
+        group.clear()
+
+    parallel = max_workers > 1 and sum(item['method'] == 'GET' for item in sub_requests) > 1
+    executor = ThreadPoolExecutor(max_workers=max_workers) if parallel else None
+    try:
+        for item in sub_requests:
+            if item['method'] == 'GET':
+                group.append(item)
+                continue
+            run_group(executor)
+            results.append(dispatch(request, item))
+        run_group(executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results
@@ -0,0 +1,169 @@
+"""
+Çok seviyeli ürün ağacı (bill of materials).
+
+Uçak gereksinimleri bir alt montaj parça tipini gösterebilir; alt
+montajların bileşenleri PartTypeComponent ile tanımlanır. Bir uçağın ağacı
+tek bir recursive CTE sorgusu ile açılır ve katalog sürümü ile birlikte
+cache'te saklanır (bkz. catalog.get_catalog_version). Böylece derin bir
+ağaç için uygulanabilirlik kontrolü de düz bir gereksinim listesindeki
+gibi tek stok sorgusu ile yapılır.
+"""
+from django.core.cache import cache
+from django.db import connections, router
+
+from .models import AircraftPartRequirement, PartStock, PartTypeComponent
+from .catalog import get_catalog_version
+
+# Döngüye karşı koruma; döngüler bileşen eklenirken ayrıca engellenir
+MAX_DEPTH = 20
+BOM_CACHE_TTL = 24 * 60 * 60
+
+BOM_QUERY = """
+WITH RECURSIVE bom (part_type_id, parent_id, edge_quantity, quantity, depth) AS (
+    SELECT part_type_id, CAST(NULL AS BIGINT), required_quantity, required_quantity, 0
+    FROM {requirement}
+    WHERE aircraft_id = %s
+  UNION ALL
+    SELECT c.component_id, c.parent_id, c.quantity, bom.quantity * c.quantity, bom.depth + 1
+    FROM bom
+    JOIN {component} c ON c.parent_id = bom.part_type_id
+    WHERE c.is_deleted = %s AND bom.depth < %s
+)
+SELECT part_type_id, parent_id, edge_quantity, quantity, depth FROM bom
+"""
+
+DESCENDANTS_QUERY = """
+WITH RECURSIVE tree (part_type_id, depth) AS (
+    SELECT CAST(%s AS BIGINT), 0
+  UNION ALL
+    SELECT c.component_id, tree.depth + 1
+    FROM tree
+    JOIN {component} c ON c.parent_id = tree.part_type_id
+    WHERE c.is_deleted = %s AND tree.depth < %s
+)
+SELECT DISTINCT part_type_id FROM tree
+"""
+
+
+def run_query(sql, params):
+    connection = connections[router.db_for_read(PartTypeComponent)]
+    sql = sql.format(
+        requirement=connection.ops.quote_name(AircraftPartRequirement._meta.db_table),
+        component=connection.ops.quote_name(PartTypeComponent._meta.db_table),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def explode_bom(aircraft_id):
+    """
+    Uçağın ürün ağacını açar:
+    - requirements: {parça tipi: uçak başına adet} (birinci seviye)
+    - components: {alt montaj: {bileşen: montaj başına adet}}
+    - totals: {parça tipi: uçak başına toplam adet} (düzleştirilmiş ağaç)
+    - order: parça tipleri, her tip kendisini içeren tüm montajlardan sonra
+      gelecek şekilde (en derin seviyeye göre) sıralı
+    """
+    requirements, components, totals, levels = {}, {}, {}, {}
+    for part_type_id, parent_id, edge_quantity, quantity, depth in run_query(
+        BOM_QUERY, [aircraft_id, False, MAX_DEPTH]
+    ):
+        totals[part_type_id] = totals.get(part_type_id, 0) + quantity
+        levels[part_type_id] = max(levels.get(part_type_id, 0), depth)
+        if parent_id is None:
+            requirements[part_type_id] = edge_quantity
+        else:
+            components.setdefault(parent_id, {})[part_type_id] = edge_quantity
+    return {
+        'requirements': requirements,
+        'components': components,
+        'totals': totals,
+        'order': sorted(levels, key=lambda part_type_id: (levels[part_type_id], part_type_id)),
+        'levels': levels,
+    }
+
+
+def get_bom(aircraft_id):
+    key = f"bom:{aircraft_id}:{get_catalog_version()}"
+    bom = cache.get(key)
+    if bom is None:
+        bom = explode_bom(aircraft_id)
+        cache.set(key, bom, BOM_CACHE_TTL)
+    return bom
+
+
+def get_descendants(part_type_id):
+    """Parça tipinin kendisi dahil tüm alt bileşenlerinin id kümesi."""
+    return {row[0] for row in run_query(DESCENDANTS_QUERY, [part_type_id, False, MAX_DEPTH])}
+
+
+def check_feasibility(aircraft_id, quantity):
+    """
+    `quantity` adet uçak için stok yeterli mi? Stokta olmayan alt montajlar
+    bileşenlerinden üretilecek kabul edilir (MRP net ihtiyaç hesabı).
+    Ağaç cache'ten okunduğu için ağaç derinliğinden bağımsız olarak tek
+    stok sorgusu atılır.
+    """
+    bom = get_bom(aircraft_id)
+    stock = dict(
+        PartStock.objects.filter(
+            aircraft_id=aircraft_id, part_type_id__in=list(bom['totals']), is_deleted=False
+        ).values_list('part_type_id', 'stock_quantity')
+    )
+
+    from_stock, assemble, missing = net_requirements(bom, stock, quantity)
+    return {
+        'feasible': not missing,
+        'from_stock': from_stock,
+        'assemble': assemble,
+        'missing': missing,
+    }
+
+
+def net_requirements(bom, stock, quantity):
+    """
+    `quantity` adet uçak için ağacı seviye sırasıyla stoktan düşer; stokta
+    olmayan alt montajların eksiği bileşenlerine aktarılır. (stoktan
+    kullanılan, montajlanacak, eksik) sözlüklerini döner.
+    """
+    gross = {part_type_id: count * quantity for part_type_id, count in bom['requirements'].items()}
+    from_stock, assemble, missing = {}, {}, {}
+    for part_type_id in bom['order']:
+        needed = gross.get(part_type_id, 0)
+        if not needed:
+            continue
+        used = min(needed, stock.get(part_type_id, 0))
+        if used:
+            from_stock[part_type_id] = used
+        shortage = needed - used
+        if not shortage:
+            continue
+        components = bom['components'].get(part_type_id)
+        if components:
+            assemble[part_type_id] = shortage
+            for component_id, count in components.items():
+                gross[component_id] = gross.get(component_id, 0) + shortage * count
+        else:
+            missing[part_type_id] = shortage
+    return from_stock, assemble, missing
+
+
+def get_capacity(bom, stock):
+    """
+    Stokla, alt montajlar bileşenlerinden üretilerek yapılabilecek en fazla
+    uçak sayısı; gereksinim yoksa None. Uygulanabilirlik adetle monoton
+    olduğu için üstel ve ikili arama ile bulunur.
+    """
+    if not bom['requirements']:
+        return None
+    low, high = 0, 1
+    while not net_requirements(bom, stock, high)[2]:
+        low, high = high, high * 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if net_requirements(bom, stock, middle)[2]:
+            high = middle
+        else:
+            low = middle
+    return low
@@ -0,0 +1,30 @@
+"""
+Katalog sürümü: uçak, parça tipi, gereksinim veya ürün ağacı kayıtları
+değiştiğinde artırılan ve paylaşımlı cache'te tutulan sayaç.
+
+Planlama matrisleri, ürün ağacı ve uçak JSON önbellekleri bu sürümle
+anahtarlanır. Sinyal bağlantıları uygulama açılışında kurulduğu için
+modül numpy gibi ağır bağımlılıkları içe aktarmaz (bkz. planning.py).
+"""
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'planning:catalog_version'
+CATALOG_MODELS = ('Aircraft', 'PartType', 'AircraftPartRequirement', 'PartTypeComponent')
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version(sender=None, **kwargs):
+    """Katalog değiştiğinde çağrılır; süreçlerdeki matrisler bir sonraki istekte yenilenir."""
+    if sender is not None and sender.__name__ not in CATALOG_MODELS:
+        return
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, 1, None)
@@ -0,0 +1,33 @@
+"""
+Delta senkronizasyonu (GET /api/sync/) için değişiklik günlüğü yardımcıları.
+
+Kayıtlar yazma işlemiyle aynı transaction içinde eklenir; böylece
+işlem geri alınırsa değişiklik de günlükte görünmez.
+"""
+from .models import ChangeLog
+
+
+def record_changes(model, object_ids, team_id=None, deleted=False):
+    ChangeLog.objects.bulk_create([
+        ChangeLog(model=model, object_id=object_id, team_id=team_id, deleted=deleted)
+        for object_id in object_ids
+    ])
+
+
+def record_team_changes(model, rows, deleted=False):
+    """
+    (object_id, team_id) çiftlerini takımlarına göre tek sorguda günlüğe
+    yazar.
+    """
+    ChangeLog.objects.bulk_create([
+        ChangeLog(model=model, object_id=object_id, team_id=team_id, deleted=deleted)
+        for object_id, team_id in rows
+    ])
+
+
+def record_reset():
+    """
+    Tek tek izlenemeyen toplu değişikliklerden (ör. CSV aktarımı) sonra
+    istemcilerin tam senkronizasyon yapması gerektiğini işaretler.
+    """
+    ChangeLog.objects.create(model='reset')
@@ -0,0 +1,176 @@
+"""
+Aynı anda gelen özdeş ağır okuma istekleri için tek hesaplama (single-flight).
+
+Vardiya başında aynı takımdan gelen aynı parametreli DataTable ve stok
+listesi istekleri aynı sorguları tekrar tekrar çalıştırır. @coalesced ile
+işaretlenen uç noktalarda istek; yol, normalleştirilmiş sorgu parametreleri,
+saha ve view'in belirlediği yetki kapsamı ile anahtarlanır:
+
+- Aynı süreçteki iş parçacıkları devam eden hesaplamayı bekler ve sonucunu
+  paylaşır.
+- Süreçler arasında hesaplama cache'teki kilit (`cache.add`) ile tek bir
+  worker'a bırakılır; diğer worker'lar sonucun cache'e yazılmasını bekler.
+- Başarılı yanıt COALESCING['TTL'] saniye daha cache'te tutulur; hemen
+  arkasından gelen özdeş istekler de bu sonucu kullanır.
+
+Yazma yapan ve bu yüzden birincil veritabanına sabitlenen kullanıcılar
+(bkz. db_routers.py) kendi yazdıklarını görmeleri için paylaşılan sonucu
+kullanmaz. DataTables'ın her istekte değişen `draw` sayacı anahtara dahil
+edilmez, paylaşılan yanıtta isteğin kendi değeri ile değiştirilir.
+"""
+import functools
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from rest_framework.response import Response
+
+from .db_routers import is_pinned
+from .sites import get_current_site
+
+COALESCED_HEADER = 'X-Coalesced'
+POLL_INTERVAL = 0.05
+# DataTables'ın istekten yanıta aynen taşıdığı sayaçlar
+ECHOED_PARAMS = ('draw', 'sEcho')
+
+
+def get_config():
+    return {
+        'ENABLED': True,
+        'TTL': 1,
+        'WAIT_TIMEOUT': 5,
+        'LOCK_TIMEOUT': 30,
+        'IGNORED_PARAMS': ('draw', 'sEcho', '_'),
+        **getattr(settings, 'COALESCING', {}),
+    }
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry = None
+
+
+_lock = threading.Lock()
+_flights = {}
+
+
+def get_key(request, scope, ignored_params):
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists() if name not in ignored_params
+        for value in values
+    )
+    raw = json.dumps([request.path, params, get_current_site(), scope])
+    return 'coalesce:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def to_entry(response):
+    """Yanıtı paylaşılabilir (pickle edilebilir) hale getirir; paylaşılamıyorsa None."""
+    if response.status_code != 200:
+        return None
+    if isinstance(response, Response):
+        return {'data': response.data}
+    if isinstance(response, HttpResponse) and response.get('Content-Type', '').startswith('application/json'):
+        data = json.loads(response.content)
+        # DataTables hataları 200 ile döner; hatalar paylaşılmaz
+        if isinstance(data, dict) and 'error' in data:
+            return None
+        return {'json': data}
+    return None
+
+
+def from_entry(request, entry):
+    if 'data' in entry:
+        response = Response(entry['data'])
+    else:
+        data = entry['json']
+        if isinstance(data, dict):
+            echoed = {name: int(request.query_params[name]) for name in ECHOED_PARAMS
+                      if name in data and request.query_params.get(name, '').isdigit()}
+            if echoed:
+                data = {**data, **echoed}
+        response = JsonResponse(data, safe=False)
+    response[COALESCED_HEADER] = 'true'
+    return response
+
+
+def compute_once(key, compute, config):
+    """
+    Hesaplamayı worker'lar arasında tek seferde yapar. (yanıt, paylaşılan
+    kayıt) döner; yanıt None ise sonuç başka bir worker'dan gelmiştir.
+    """
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, config['LOCK_TIMEOUT']):
+        try:
+            response = compute()
+            entry = to_entry(response)
+            if entry is not None:
+                cache.set(key, entry, config['TTL'])
+            return response, entry
+        finally:
+            cache.delete(lock_key)
+
+    # Başka bir worker hesaplıyor
+    deadline = time.monotonic() + config['WAIT_TIMEOUT']
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return None, entry
+        if cache.get(lock_key) is None:
+            # Hesaplama paylaşılamayan bir sonuçla bitti
+            break
+    response = compute()
+    return response, to_entry(response)
+
+
+def coalesced(view_method):
+    """
+    ViewSet okuma metotları için dekoratör. Yetki kapsamı view'in
+    `get_coalescing_scope(request)` metodundan alınır. @action
+    dekoratörünün altında kullanılmalıdır.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        config = get_config()
+        if not config['ENABLED'] or (request.user.is_authenticated and is_pinned(request.user)):
+            return view_method(self, request, *args, **kwargs)
+
+        key = get_key(request, self.get_coalescing_scope(request), config['IGNORED_PARAMS'])
+        entry = cache.get(key)
+        if entry is not None:
+            return from_entry(request, entry)
+
+        with _lock:
+            flight = _flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _flights[key] = Flight()
+
+        if not leader:
+            if flight.done.wait(config['WAIT_TIMEOUT']) and flight.entry is not None:
+                return from_entry(request, flight.entry)
+            return view_method(self, request, *args, **kwargs)
+
+        try:
+            response, flight.entry = compute_once(
+                key, lambda: view_method(self, request, *args, **kwargs), config
+            )
+        finally:
+            with _lock:
+                _flights.pop(key, None)
+            flight.done.set()
+        return response if response is not None else from_entry(request, flight.entry)
+
+    return wrapper
+
+
+class CoalescingMixin:
+    def get_coalescing_scope(self, request):
+        """Yanıtı belirleyen yetki kapsamı; varsayılan olarak kullanıcı."""
+        return f"user:{request.user.pk}"
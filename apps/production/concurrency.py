@@ -0,0 +1,106 @@
+"""
+Sürüm kolonu ile iyimser eşzamanlılık kontrolü.
+
+Sürümlü modeller (models.VersionedModel) güncellenirken sadece değişen
+alanları `UPDATE ... WHERE id = ? AND version = ?` ile yazar ve sürümü bir
+artırır. Satır başka bir istek tarafından değiştirildiyse güncelleme hiçbir
+satırı etkilemez ve VersionConflict fırlatılır; ViewSet'ler bunu güncel
+kayıtla birlikte 409 yanıtına çevirir.
+
+İstemciler okudukları sürümü `If-Match: "<version>"` başlığı (detay
+yanıtlarındaki ETag) veya istek gövdesindeki `version` alanı ile bildirir.
+"""
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class VersionConflict(Exception):
+    """Kayıt okunduktan sonra başka bir istek tarafından değiştirildi."""
+
+    def __init__(self, instance):
+        super().__init__(f"{instance._meta.object_name} #{instance.pk} başka bir istek tarafından değiştirildi")
+        self.model = type(instance)
+        self.pk = instance.pk
+
+
+def get_etag(instance):
+    return quote_etag(str(instance.version))
+
+
+def get_expected_version(request):
+    """
+    İstemcinin okuduğu sürüm(ler). Başlık ve gövdede sürüm yoksa veya
+    `If-Match: *` ise None döner ve yüklenen sürüm kullanılır.
+    """
+    header = request.headers.get('If-Match')
+    if header is not None:
+        etags = parse_etags(header)
+        if etags == ['*']:
+            return None
+        versions = set()
+        for etag in etags:
+            try:
+                versions.add(int(etag.removeprefix('W/').strip('"')))
+            except ValueError:
+                continue
+        return versions
+    version = request.data.get('version') if hasattr(request.data, 'get') else None
+    if version is None:
+        return None
+    try:
+        return {int(version)}
+    except (TypeError, ValueError):
+        return set()
+
+
+def check_version(request, instance):
+    """
+    Yüklenen kayıt istemcinin okuduğu sürümde değilse VersionConflict
+    fırlatır. Sürümsüz modeller için bir şey yapmaz.
+    """
+    if not hasattr(instance, 'version'):
+        return
+    expected = get_expected_version(request)
+    if expected is not None and instance.version not in expected:
+        raise VersionConflict(instance)
+
+
+class OptimisticConcurrencyMixin:
+    """
+    Sürümlü modellerin detay yanıtlarına ETag ekler ve VersionConflict
+    hatalarını güncel kayıtla birlikte 409 yanıtına çevirir.
+    """
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            check_version(self.request, instance)
+        return instance
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        version = response.data.get('version') if isinstance(response.data, dict) else None
+        if version is not None:
+            response['ETag'] = quote_etag(str(version))
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Başarılı güncellemelerde yeni sürüm ETag olarak döner
+        if (
+            request.method in ('PUT', 'PATCH') and response.status_code == status.HTTP_200_OK
+            and isinstance(response.data, dict) and response.data.get('version') is not None
+        ):
+            response['ETag'] = quote_etag(str(response.data['version']))
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        if not isinstance(exc, VersionConflict):
+            return super().handle_exception(exc)
+
+        current = exc.model._base_manager.filter(pk=exc.pk).first()
+        headers = {'ETag': get_etag(current)} if current is not None else {}
+        return Response({
+            'error': 'Kayıt siz okuduktan sonra başka bir kullanıcı tarafından değiştirildi',
+            'current': self.get_serializer(current).data if current is not None else None,
+        }, status=status.HTTP_409_CONFLICT, headers=headers)
@@ -0,0 +1,94 @@
+"""
+DataTable uç noktaları (/api/datatable/...) için sunucu taraflı görünümler.
+
+django_datatables_view sadece bu uç noktalarda kullanılır; modül ViewSet
+action'larından ilk istekte içe aktarılır, böylece worker açılışında
+yüklenmez.
+"""
+from django.db.models import Q
+from django_datatables_view.base_datatable_view import BaseDatatableView
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .db_routers import replica_reads, should_use_replica
+from .models import Aircraft, Part, Personnel, ProducedAircraft
+
+
+class BaseDataTableViewSet(BaseDatatableView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    model = None
+    columns = []
+    order_columns = []
+    searchable_columns = []
+
+    def dispatch(self, request, *args, **kwargs):
+        # Okumalar, BaseViewSet'te olduğu gibi replikaya yönlendirilir
+        with replica_reads(should_use_replica(request)):
+            return super().dispatch(request, *args, **kwargs)
+    
+    def get_initial_queryset(self):
+        return self.model.objects.filter(is_deleted=False)
+
+    def filter_queryset(self, qs):
+        search = self.request.GET.get('search[value]', None)
+        if search:
+            q = Q()
+            for column in self.searchable_columns:
+                q |= Q(**{f"{column}__icontains": search})
+            qs = qs.filter(q)
+        return qs
+
+    def render_response(self, data):
+        return Response({
+            'draw': int(self.request.GET.get('draw', 1)),
+            'recordsTotal': self.total_records,
+            'recordsFiltered': self.total_display_records,
+            'data': data
+        })
+
+
+class AircraftDatatableView(BaseDataTableViewSet):
+    model = Aircraft
+    columns = ['id', 'name', 'description']
+    order_columns = ['id', 'name', 'description']
+    searchable_columns = ['name', 'description']
+
+class PartDatatableView(BaseDataTableViewSet):
+    model = Part
+    columns = ['id', 'part_type__name', 'aircraft__name', 'team__name', 'status', 'stock']
+    order_columns = ['id', 'part_type__name', 'aircraft__name', 'team__name', 'status', 'stock']
+    searchable_columns = ['part_type__name', 'aircraft__name', 'team__name']
+
+    def get_initial_queryset(self):
+        qs = super().get_initial_queryset()
+        try:
+            personnel = Personnel.objects.get(user=self.request.user)
+            if personnel.team.name == 'Montaj Takımı':
+                return qs.filter(status='stock', reservation__isnull=True)
+            return qs.filter(team=personnel.team, reservation__isnull=True)
+        except Personnel.DoesNotExist:
+            return Part.objects.none()
+
+    def render_column(self, row, column):
+        if column == 'part_type__name':
+            return row.part_type.name if row.part_type else ''
+        elif column == 'aircraft__name':
+            return row.aircraft.name if row.aircraft else ''
+        elif column == 'team__name':
+            return row.team.name if row.team else ''
+        else:
+            return super().render_column(row, column)
+
+class ProducedAircraftDatatableView(BaseDataTableViewSet):
+    model = ProducedAircraft
+    columns = ['id', 'aircraft__name', 'date']
+    order_columns = ['id', 'aircraft__name', 'date']
+    searchable_columns = ['aircraft__name']
+
+    def render_column(self, row, column):
+        if column == 'aircraft__name':
+            return row.aircraft.name if row.aircraft else ''
+        else:
+            return super().render_column(row, column)
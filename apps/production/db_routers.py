@@ -0,0 +1,124 @@
+"""
+Okuma replikası yönlendirmesi.
+
+BaseViewSet üzerinden gelen güvenli (GET/HEAD/OPTIONS) isteklerdeki
+okumalar settings.REPLICA_DATABASES içindeki replikalardan birine
+gönderilir. Yazmalar ve `transaction.atomic` blokları içindeki okumalar
+her zaman birincil (default) veritabanında kalır.
+
+Yazma yapan kullanıcının sonraki okumaları REPLICA_PIN_SECONDS boyunca
+birincil veritabanına sabitlenir; böylece kullanıcı kendi yazdığını
+replika gecikmesinden bağımsız olarak hemen görür.
+"""
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .sites import REFERENCE_MODELS, SITE_MODELS, get_site_database
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+def get_pin_key(user):
+    return f"replica:pin:{user.pk}"
+
+
+def pin_to_primary(user):
+    cache.set(get_pin_key(user), 1, getattr(settings, 'REPLICA_PIN_SECONDS', 10))
+
+
+def is_pinned(user):
+    return cache.get(get_pin_key(user)) is not None
+
+
+def should_use_replica(request):
+    """Güvenli metotlu ve birincile sabitlenmemiş istekler replikadan okur."""
+    if request.method not in SAFE_METHODS or not getattr(settings, 'REPLICA_DATABASES', []):
+        return False
+    user = getattr(request, 'user', None)
+    return not (user is not None and user.is_authenticated and is_pinned(user))
+
+
+@contextlib.contextmanager
+def replica_reads(enabled=True):
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class SiteRouter:
+    """
+    Saha verisini (bkz. sites.SITE_MODELS) geçerli sahanın veritabanına
+    yönlendirir. Saha birincil veritabanındaysa karar PrimaryReplicaRouter'a
+    bırakılır.
+    """
+
+    def _site_database(self, model):
+        if model._meta.app_label != 'production' or model._meta.model_name not in SITE_MODELS:
+            return None
+        alias = get_site_database()
+        return None if alias == DEFAULT_DB_ALIAS else alias
+
+    def db_for_read(self, model, **hints):
+        return self._site_database(model)
+
+    def db_for_write(self, model, **hints):
+        return self._site_database(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Referans veri her saha veritabanında kopyası bulunduğu için ilişkilendirilebilir
+        if type(obj1).__name__ in REFERENCE_MODELS or type(obj2).__name__ in REFERENCE_MODELS:
+            return True
+        return None
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'REPLICA_DATABASES', [])
+        if not replicas or not _replica_reads.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Replikadan okunan nesneler de birincil veritabanına yazılır
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *getattr(settings, 'REPLICA_DATABASES', [])}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMixin:
+    """
+    Kimlik doğrulamasından sonra, isteğin okumalarının replikaya gidip
+    gidemeyeceğine karar verir ve yazma yapan kullanıcıyı birincil
+    veritabanına sabitler.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._replica_token = _replica_reads.set(should_use_replica(request))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _replica_reads.reset(token)
+            self._replica_token = None
+        if (
+            request.method not in SAFE_METHODS
+            and request.user and request.user.is_authenticated
+            and response.status_code < 400
+        ):
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,240 @@
+"""
+Stok ve üretim değişikliklerinin Server-Sent Events ile istemcilere iletilmesi.
+
+Yazma işlemleri transaction commit edildikten sonra olayları süreç içi
+`hub` nesnesine bırakır; hub olayları bağlı tüm dinleyicilere dağıtır ve
+son olayları `Last-Event-ID` ile kaldığı yerden devam edebilmek için
+bellekte tutar. Hub süreç içidir: her worker kendi yazma işlemlerinin
+olaylarını yayınlar, bu yüzden uç nokta tek bir ASGI worker ile
+(ör. `uvicorn config.asgi:application`) çalıştırılmalıdır.
+
+Boşta bekleyen bir bağlantı sadece bir asyncio kuyruğu ve belirli
+aralıklarla gönderilen bir keepalive satırı maliyetindedir; veritabanına
+hiç sorgu atılmaz.
+"""
+import asyncio
+import collections
+import itertools
+import json
+import threading
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .audit import get_actor, record_event
+from .models import Personnel
+from .sites import get_current_site, on_site_commit
+
+HEARTBEAT_SECONDS = 15
+HISTORY_SIZE = 1000
+SUBSCRIBER_QUEUE_SIZE = 500
+ASSEMBLY_TEAM_NAME = 'Montaj Takımı'
+
+
+class Event:
+    __slots__ = ('id', 'type', 'data', 'team_id', 'part_type_id', 'site')
+
+    def __init__(self, event_id, event_type, data, team_id=None, part_type_id=None, site=None):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        self.team_id = team_id
+        self.part_type_id = part_type_id
+        self.site = site
+
+    def encode(self):
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class Subscription:
+    """Tek bir SSE bağlantısının olay kuyruğu."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def push(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Bağlantının event loop'u kapanmış
+            pass
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Yavaş istemci: kuyruğu boşaltıp bağlantıyı kapat,
+            # istemci Last-Event-ID ile yeniden bağlanır
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventHub:
+    """
+    Süreç içi olay dağıtıcısı. Olay id'leri `<epoch>-<sıra>` biçimindedir;
+    epoch süreç yeniden başladığında değişir ve eski id ile gelen istemciye
+    verilerini yeniden yüklemesi gerektiği bildirilir.
+    """
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+        self._history = collections.deque(maxlen=history_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data, team_id=None, part_type_id=None, site=None):
+        with self._lock:
+            event = Event(
+                f"{self.epoch}-{next(self._sequence)}", event_type, data,
+                team_id=team_id, part_type_id=part_type_id, site=site
+            )
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push(event)
+        return event
+
+    def subscribe(self, loop, last_event_id=None):
+        """
+        Yeni bir dinleyici kaydeder. (abonelik, kaçırılan olaylar) döner;
+        kaçırılan olaylar artık bellekte değilse ikinci değer None olur.
+        """
+        subscription = Subscription(loop)
+        with self._lock:
+            backlog = self._events_after(last_event_id) if last_event_id else []
+            self._subscribers.add(subscription)
+        return subscription, backlog
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _events_after(self, last_event_id):
+        epoch, _, sequence = last_event_id.partition('-')
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if self._history and int(self._history[0].id.split('-')[1]) > sequence + 1:
+            return None
+        return [event for event in self._history if int(event.id.split('-')[1]) > sequence]
+
+
+hub = EventHub()
+
+
+def publish_on_commit(event_type, data, team_id=None, part_type_id=None):
+    """
+    Olayı, sahanın içinde bulunulan transaction'ı commit edildikten sonra
+    yayınlar ve denetim kaydına ekler (bkz. audit.py).
+    """
+    site = get_current_site()
+    user_id = get_actor()
+
+    def publish():
+        hub.publish(event_type, data, team_id=team_id, part_type_id=part_type_id, site=site)
+        record_event(event_type, data, team_id, site, user_id)
+
+    on_site_commit(publish)
+
+
+def publish_stock_deltas(deltas):
+    """{(part_type_id, aircraft_id): değişim} sözlüğündeki stok değişimlerini yayınlar."""
+    for (part_type_id, aircraft_id), delta in deltas.items():
+        if delta:
+            publish_on_commit(
+                'stock',
+                {'part_type': part_type_id, 'aircraft': aircraft_id, 'delta': delta},
+                part_type_id=part_type_id
+            )
+
+
+class EventScope:
+    """
+    Kullanıcının görebileceği olaylar. Kullanıcı sadece kendi sahasının
+    olaylarını görür. Montaj takımı sahanın tüm olaylarını, diğer takımlar
+    kendi parçalarının ve sorumlu oldukları parça tipinin olaylarını görür.
+    Takım bilgisi taşımayan olaylar sahadaki herkese açıktır.
+    """
+
+    def __init__(self, personnel):
+        self.all = personnel.team.name == ASSEMBLY_TEAM_NAME
+        self.team_id = personnel.team_id
+        self.part_type_id = personnel.team.responsible_part_id
+        self.site = personnel.team.site
+
+    def allows(self, event):
+        if event.site is not None and event.site != self.site:
+            return False
+        if self.all:
+            return True
+        if event.team_id is not None:
+            return event.team_id == self.team_id
+        if event.part_type_id is not None:
+            return event.part_type_id == self.part_type_id
+        return True
+
+
+def authenticate_scope(request):
+    """
+    EventSource özel header gönderemediği için token `Authorization`
+    header'ından veya `token` parametresinden okunur.
+    """
+    authentication = JWTAuthentication()
+    raw_token = request.GET.get('token')
+    if not raw_token:
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+        return EventScope(Personnel.objects.select_related('team').get(user=user))
+    except (APIException, Personnel.DoesNotExist):
+        return None
+
+
+async def event_stream(request):
+    """
+    GET /api/events/ - stok, parça ve üretilen uçak olaylarını
+    text/event-stream olarak yayınlar.
+    """
+    scope = await sync_to_async(authenticate_scope)(request)
+    if scope is None:
+        return JsonResponse({'error': 'Geçersiz veya eksik token'}, status=401)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    subscription, backlog = hub.subscribe(asyncio.get_running_loop(), last_event_id)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            if backlog is None:
+                # Kaçırılan olaylar artık bellekte değil, istemci verisini yeniden yüklemeli
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                for event in backlog:
+                    if scope.allows(event):
+                        yield event.encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                if scope.allows(event):
+                    yield event.encode()
+        finally:
+            hub.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,157 @@
+"""
+Liste ve detay uç noktaları için `?fields=` ve `?expand=` desteği.
+
+`fields` döndürülecek alanları, `expand` ise serializer'ın
+Meta.expandable_fields ile tanımladığı ilişki alanlarını (ör. üretilen
+uçağın parçaları) seçer. İki parametreden biri gönderildiğinde genişletilebilir
+alanlar sadece istenirse döner ve sorgu seçilen alanlara göre kurulur:
+sadece gereken kolonlar yüklenir (`only`), join'ler sadece seçilen ilişki
+alanları için, prefetch'ler sadece genişletilen alanlar için yapılır.
+Parametresiz istekler önceki çıktıyı aynen alır.
+"""
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+DISPLAY_METHOD = re.compile(r'get_(\w+)_display')
+
+
+def parse_field_list(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_field_selection(request, serializer):
+    """
+    İstekte seçilen alan adları; parametre yoksa None. Bilinmeyen alanlar
+    için ValidationError (400) fırlatılır.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None
+
+    available = {name for name, field in serializer.fields.items() if not field.write_only}
+    expandable = set(getattr(serializer.Meta, 'expandable_fields', ()))
+    fields = parse_field_list(params.get('fields', ''))
+    expand = parse_field_list(params.get('expand', ''))
+
+    errors = {}
+    if fields - available:
+        errors['fields'] = f"Geçersiz alanlar: {', '.join(sorted(fields - available))}"
+    if expand - expandable:
+        errors['expand'] = (
+            f"Genişletilemeyen alanlar: {', '.join(sorted(expand - expandable))}"
+            f" (genişletilebilir: {', '.join(sorted(expandable)) or '-'})"
+        )
+    if errors:
+        raise serializers.ValidationError(errors)
+    return (fields or available - expandable) | expand
+
+
+class DynamicFieldsMixin:
+    """İstekteki `fields` ve `expand` parametrelerine göre serializer alanlarını kırpar."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected_fields = get_field_selection(self.context.get('request'), self)
+        if self.selected_fields is not None:
+            for name in [name for name in self.fields if name not in self.selected_fields]:
+                self.fields.pop(name)
+
+
+def get_model_field(opts, name):
+    """Alan adı veya ters ilişki erişimcisi (ör. aircraftpart_set) ile model alanı."""
+    try:
+        return opts.get_field(name)
+    except FieldDoesNotExist:
+        return next(
+            (relation for relation in opts.related_objects if relation.get_accessor_name() == name), None
+        )
+
+
+def plan_fields(model, fields, prefix=''):
+    """
+    Serializer alanlarının ihtiyaç duyduğu kolonlar (only), join'ler
+    (select_related) ve ters ilişkiler. Kaynağı modelden çözülemeyen bir
+    alan (property, metot) varsa None döner.
+    """
+    only, joins, reverse = set(), set(), {}
+    for name, field in fields.items():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            return None
+        path, opts = [], model._meta
+        attrs = field.source.split('.')
+        for index, attr in enumerate(attrs):
+            match = DISPLAY_METHOD.fullmatch(attr)
+            model_field = get_model_field(opts, match.group(1) if match else attr)
+            if model_field is None:
+                return None
+            path.append(model_field.name)
+            lookup = prefix + '__'.join(path)
+            if model_field.is_relation and not (model_field.concrete and (model_field.many_to_one or model_field.one_to_one)):
+                # Ters ilişki veya many-to-many: sadece genişletilirse prefetch ile yüklenir
+                if index != len(attrs) - 1:
+                    return None
+                reverse[name] = lookup
+                break
+            only.add(lookup)
+            if not model_field.is_relation:
+                break
+            if index == len(attrs) - 1:
+                if isinstance(field, serializers.BaseSerializer):
+                    # İç içe serializer: ilişkili kaydın alanları da aynı sorguda yüklenir
+                    nested = plan_fields(model_field.related_model, field.fields, lookup + '__')
+                    if nested is None or nested[2]:
+                        return None
+                    only |= nested[0]
+                    joins |= nested[1] | {lookup}
+                break
+            joins.add(lookup)
+            opts = model_field.related_model._meta
+    return only, joins, reverse
+
+
+def optimize_queryset(queryset, serializer, expand_prefetches):
+    """
+    Sorguyu seçilen alanlara göre daraltır. `expand_prefetches`, genişletilebilir
+    alanların prefetch lookup'larıdır: {'parts': ('aircraftpart_set__part', ...)}.
+    """
+    if serializer.selected_fields is None:
+        return queryset
+    fields = serializer.child.fields if isinstance(serializer, serializers.ListSerializer) else serializer.fields
+
+    queryset = queryset.prefetch_related(None)
+    for name in fields:
+        if name in expand_prefetches:
+            queryset = queryset.prefetch_related(*expand_prefetches[name])
+
+    plan = plan_fields(queryset.model, fields)
+    if plan is None or set(plan[2]) - set(expand_prefetches):
+        return queryset
+    only, joins, _ = plan
+    queryset = queryset.select_related(None)
+    if joins:
+        queryset = queryset.select_related(*joins)
+    return queryset.only(queryset.model._meta.pk.name, *only)
+
+
+class FieldSelectionMixin:
+    """
+    ViewSet'lerin liste ve detay sorgularını `fields`/`expand` seçimine göre
+    daraltır. Genişletilebilir alanların prefetch'leri `expand_prefetches`
+    ile tanımlanır.
+    """
+    expand_prefetches = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, 'swagger_fake_view', False) or self.action not in ('list', 'retrieve'):
+            return queryset
+        serializer = self.get_serializer()
+        if not hasattr(serializer, 'selected_fields'):
+            return queryset
+        return optimize_queryset(queryset, serializer, self.expand_prefetches)
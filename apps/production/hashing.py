@@ -0,0 +1,148 @@
+"""
+Parola özetlerinin (PBKDF2) süreç havuzunda hesaplanması.
+
+Özet hesaplama CPU'ya bağlıdır ve GIL'i bırakmaz; toplu personel aktarımında
+yüzlerce parolanın web sürecinde sırayla özetlenmesi dakikalar sürer. Çok
+sayıda parola tüm çekirdeklere dağıtılır, az sayıda parola için süreç
+başlatma maliyetine girilmez.
+
+Giriş sırasındaki parola doğrulaması da kalıcı ve sınırlı bir süreç
+havuzunda yapılır: bekleyen iş parçacığı GIL'i bırakır, böylece aynı
+süreçteki diğer istekler (ASGI olay döngüsü dahil) doğrulama süresince
+çalışmaya devam eder. Aynı anda bekleyebilecek doğrulama sayısı
+sınırlıdır; giriş fırtınasında fazlası kısa bir beklemeden sonra
+HashingBusy ile reddedilir. Giriş doğrulaması PooledPasswordBackend ile
+authenticate() üzerinden yapılır; AUTHENTICATION_BACKENDS ve
+user_login_failed sinyali korunur.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+
+
+class HashingBusy(Exception):
+    """Parola doğrulama kuyruğu dolu."""
+
+
+def get_config():
+    return {
+        'WORKERS': None,
+        'MIN_PARALLEL': 16,
+        'VERIFY_WORKERS': None,
+        'VERIFY_MAX_PENDING': 64,
+        'VERIFY_WAIT_TIMEOUT': 5,
+        **getattr(settings, 'PASSWORD_HASHING', {}),
+    }
+
+
+def init_worker():
+    # spawn/forkserver ile başlayan süreçlerde Django ayarları yüklenmemiştir
+    import django
+    django.setup()
+
+
+def hash_passwords(passwords):
+    """Parolaların özetlerini aynı sırayla döner."""
+    passwords = list(passwords)
+    config = get_config()
+    workers = min(config['WORKERS'] or os.cpu_count() or 1, len(passwords))
+    if workers <= 1 or len(passwords) < config['MIN_PARALLEL']:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+class VerifyPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self._slots = None
+
+    def _get(self, config):
+        with self._lock:
+            if self._pid != os.getpid():
+                # fork sonrası üst sürecin havuzu bu sürece ait değildir
+                self._pid = os.getpid()
+                self._slots = threading.BoundedSemaphore(config['VERIFY_MAX_PENDING'])
+                workers = config['VERIFY_WORKERS']
+                self._executor = None if workers == 0 else ProcessPoolExecutor(
+                    max_workers=workers or os.cpu_count() or 1, initializer=init_worker
+                )
+            return self._executor, self._slots
+
+    def run(self, func, *args):
+        config = get_config()
+        executor, slots = self._get(config)
+        if not slots.acquire(timeout=config['VERIFY_WAIT_TIMEOUT']):
+            raise HashingBusy()
+        try:
+            if executor is None:
+                return func(*args)
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool:
+            # Çöken havuz sonraki çağrıda yeniden oluşturulur
+            with self._lock:
+                self._pid = None
+            raise
+        finally:
+            slots.release()
+
+
+verify_pool = VerifyPool()
+
+
+def verify_password(password, encoded):
+    """
+    Parolayı özet ile karşılaştırır. Kullanıcı bulunamadığında (`encoded`
+    None) kullanıcı adlarının yanıt süresinden anlaşılmaması için yine de
+    bir özet hesaplanır.
+    """
+    if encoded is None:
+        verify_pool.run(make_password, password)
+        return False
+    return verify_pool.run(check_password, password, encoded)
+
+
+def needs_rehash(encoded):
+    """Özet varsayılan algoritma veya güncel iterasyon sayısı ile üretilmemişse True."""
+    preferred = get_hasher('default')
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+class PooledPasswordBackend(ModelBackend):
+    """
+    ModelBackend ile aynı kuralları uygular; parola doğrulaması süreç
+    havuzunda yapılır ve eski algoritma/iterasyonla üretilmiş özetler
+    girişte güncellenir. Havuz doluysa HashingBusy authenticate() dışına
+    taşınır.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            verify_password(password, None)
+            return None
+        encoded = user.password if user.has_usable_password() else None
+        if verify_password(password, encoded) and self.user_can_authenticate(user):
+            if needs_rehash(user.password):
+                user.set_password(password)
+                user.save(update_fields=['password'])
+            return user
+        return None
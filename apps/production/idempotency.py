@@ -0,0 +1,133 @@
+"""
+POST/DELETE uç noktaları için Idempotency-Key desteği.
+
+İstemci aynı `Idempotency-Key` header'ı ile isteği tekrar gönderdiğinde
+işlem yeniden çalıştırılmaz; ilk isteğin saklanan yanıtı döndürülür.
+Aynı anahtarla eşzamanlı gelen istekler ilk isteğin bitmesini bekler.
+"""
+import functools
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAY_HEADER = 'Idempotent-Replayed'
+POLL_INTERVAL = 0.05
+
+
+def get_config(name):
+    defaults = {'TTL': None, 'WAIT_TIMEOUT': 10, 'STALE_AFTER': 300}
+    return getattr(settings, 'IDEMPOTENCY', {}).get(name, defaults[name])
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode('utf-8')).hexdigest()
+
+
+def claim(request, key, fingerprint):
+    """
+    Anahtarı bu istek adına kaydeder. Kayıt transaction dışında hemen
+    commit edilir, böylece eşzamanlı istekler tarafından görülür.
+    (kayıt, yeni_mi) döner.
+    """
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=request.user, key=key, method=request.method,
+                    path=request.path, request_hash=fingerprint
+                )
+            return record, True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+            if record is None:
+                continue
+            if is_expired(record):
+                # Süresi dolmuş veya yarıda kalmış kayıt yeni istek için serbest bırakılır
+                IdempotencyKey.objects.filter(pk=record.pk).delete()
+                continue
+            return record, False
+    raise IntegrityError("Idempotency anahtarı kaydedilemedi")
+
+
+def is_expired(record):
+    age = timezone.now() - record.created_at
+    if record.status_code is None:
+        return age.total_seconds() > get_config('STALE_AFTER')
+    ttl = get_config('TTL')
+    return ttl is not None and age > ttl
+
+
+def wait_for_completion(record):
+    """İlk istek tamamlanana kadar bekler; süre dolarsa None döner."""
+    deadline = time.monotonic() + get_config('WAIT_TIMEOUT')
+    while record is not None and record.status_code is None:
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(POLL_INTERVAL)
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+    return record
+
+
+def idempotent(view_method):
+    """
+    ViewSet metotları için dekoratör. `Idempotency-Key` header'ı yoksa
+    metot olduğu gibi çalışır. @action dekoratörünün altında kullanılmalıdır.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response(
+                {'error': 'Idempotency-Key en fazla 255 karakter olabilir'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        record, created = claim(request, key, fingerprint)
+
+        if not created:
+            if record.request_hash != fingerprint:
+                return Response(
+                    {'error': 'Bu Idempotency-Key farklı bir istek için kullanılmış'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            record = wait_for_completion(record)
+            if record is None:
+                return Response(
+                    {'error': 'Aynı Idempotency-Key ile gönderilen istek hala işleniyor'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            return Response(
+                record.response_body,
+                status=record.status_code,
+                headers={REPLAY_HEADER: 'true'}
+            )
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        # Sunucu hataları saklanmaz, istemci isteği tekrar deneyebilir
+        if response.status_code >= 500 or not hasattr(response, 'data'):
+            record.delete()
+        else:
+            record.status_code = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['status_code', 'response_body'])
+        return response
+
+    return wrapper
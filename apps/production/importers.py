@@ -0,0 +1,399 @@
+"""
+CSV dosyalarından toplu veri aktarımı.
+
+Dosya satır satır okunur ve parçalar (chunk) halinde yazılır; böylece
+bellek kullanımı dosya boyutundan bağımsızdır. Ad -> id dönüşümleri ve
+takım sorumluluk kuralları aktarım başında bir kez yüklenen sözlüklerden
+yapılır, satır başına sorgu atılmaz. Hatalı satırlar atlanır ve satır
+numarası ile raporlanır.
+"""
+import csv
+import io
+
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Q
+
+from .models import (
+    Aircraft, AircraftPartRequirement, Part, PartStock, PartType, Personnel, Team, STATUS_CHOICES
+)
+from .audit import get_actor, record_event
+from .changes import record_reset
+from .hashing import hash_passwords
+from .catalog import bump_catalog_version
+from .sites import get_current_site, on_site_commit, replicate_reference_data, site_atomic
+from .stock import apply_stock_deltas
+
+
+class ImportRowError(Exception):
+    """Bir CSV satırının doğrulanamadığını belirtir."""
+
+
+class BaseImporter:
+    """
+    Aktarım sınıfları için temel sınıf. Alt sınıflar `required_columns`,
+    `parse_row` ve `write_chunk` tanımlar.
+    """
+    required_columns = ()
+    chunk_size = 5000
+    max_reported_errors = 1000
+    # Sadece staff kullanıcıların API üzerinden çalıştırabildiği aktarımlar
+    staff_only = False
+
+    def __init__(self, chunk_size=None):
+        if chunk_size:
+            self.chunk_size = chunk_size
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, stream):
+        """`stream` metin modunda açılmış bir CSV dosyasıdır."""
+        reader = csv.DictReader(stream)
+        missing = set(self.required_columns) - set(reader.fieldnames or [])
+        if missing:
+            raise ImportRowError(f"Eksik kolonlar: {', '.join(sorted(missing))}")
+
+        self.load_lookups()
+        chunk = []
+        chunk_weight = 0
+        # Başlık satırı 1. satır olduğu için veri satırları 2'den başlar
+        for line_number, row in enumerate(reader, start=2):
+            self.line_number = line_number
+            try:
+                item = self.parse_row(row)
+            except ImportRowError as e:
+                self.add_error(line_number, str(e))
+                continue
+            chunk.append(item)
+            chunk_weight += self.item_weight(item)
+            if chunk_weight >= self.chunk_size:
+                self.flush(chunk)
+                chunk = []
+                chunk_weight = 0
+        if chunk:
+            self.flush(chunk)
+        return self.summary()
+
+    def flush(self, chunk):
+        with site_atomic():
+            self.imported += self.write_chunk(chunk)
+
+    def add_error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def summary(self):
+        return {
+            'imported': self.imported,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+    def item_weight(self, item):
+        return 1
+
+    def load_lookups(self):
+        self.aircrafts = self.name_lookup(Aircraft)
+        self.part_types = self.name_lookup(PartType)
+
+    @staticmethod
+    def name_lookup(model):
+        return {
+            name.strip().casefold(): pk
+            for pk, name in model.objects.filter(is_deleted=False).values_list('id', 'name')
+        }
+
+    @staticmethod
+    def resolve(lookup, row, column, label):
+        value = (row.get(column) or '').strip()
+        try:
+            return lookup[value.casefold()]
+        except KeyError:
+            raise ImportRowError(f"Bilinmeyen {label}: '{value}'")
+
+    @staticmethod
+    def positive_int(row, column, default=None):
+        value = (row.get(column) or '').strip()
+        if not value and default is not None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise ImportRowError(f"{column} bir tam sayı olmalıdır: '{value}'")
+        if number < 1:
+            raise ImportRowError(f"{column} en az 1 olmalıdır")
+        return number
+
+    def parse_row(self, row):
+        raise NotImplementedError
+
+    def write_chunk(self, chunk):
+        raise NotImplementedError
+
+
+class PartRequirementImporter(BaseImporter):
+    """
+    `aircraft,part_type,required_quantity` kolonlarını içeren CSV'den
+    AircraftPartRequirement kayıtları oluşturur. Var olan gereksinimlerin
+    miktarı güncellenir.
+    """
+    required_columns = ('aircraft', 'part_type', 'required_quantity')
+
+    def run(self, stream):
+        result = super().run(stream)
+        if self.imported:
+            # bulk_create sinyal tetiklemediği için saha kopyaları ve
+            # planlama kataloğu burada güncellenir
+            replicate_reference_data(['AircraftPartRequirement'])
+            bump_catalog_version()
+        return result
+
+    def parse_row(self, row):
+        return (
+            self.resolve(self.aircrafts, row, 'aircraft', 'uçak'),
+            self.resolve(self.part_types, row, 'part_type', 'parça tipi'),
+            self.positive_int(row, 'required_quantity'),
+        )
+
+    def write_chunk(self, chunk):
+        # Aynı parça içinde tekrar eden satırlarda son satır geçerlidir
+        requirements = {(aircraft_id, part_type_id): quantity for aircraft_id, part_type_id, quantity in chunk}
+        AircraftPartRequirement.objects.bulk_create(
+            [
+                AircraftPartRequirement(aircraft_id=aircraft_id, part_type_id=part_type_id, required_quantity=quantity)
+                for (aircraft_id, part_type_id), quantity in requirements.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['aircraft', 'part_type'],
+            update_fields=['required_quantity'],
+        )
+        return len(requirements)
+
+
+class PartInventoryImporter(BaseImporter):
+    """
+    `aircraft,part_type,team[,status][,quantity]` kolonlarını içeren CSV'den
+    Part kayıtları oluşturur ve stoktaki parçalar için PartStock sayaçlarını
+    günceller. PostgreSQL üzerinde COPY, diğer veritabanlarında bulk_create
+    kullanılır. Oluşturulan parçalar için aktarımı yapan kullanıcı adına
+    `part.produced` denetim kaydı yazılır; olaylar canlı yayına gönderilmez.
+    """
+    required_columns = ('aircraft', 'part_type', 'team')
+    staff_only = True
+    max_quantity_per_row = 10000
+    copy_columns = ('id', 'part_type_id', 'aircraft_id', 'team_id', 'status', 'is_deleted', 'site', 'version')
+
+    def load_lookups(self):
+        super().load_lookups()
+        self.teams = self.name_lookup(Team)
+        self.team_responsibilities = dict(
+            Team.objects.filter(is_deleted=False).values_list('id', 'responsible_part_id')
+        )
+        self.statuses = dict(STATUS_CHOICES)
+
+    def parse_row(self, row):
+        aircraft_id = self.resolve(self.aircrafts, row, 'aircraft', 'uçak')
+        part_type_id = self.resolve(self.part_types, row, 'part_type', 'parça tipi')
+        team_id = self.resolve(self.teams, row, 'team', 'takım')
+        if self.team_responsibilities[team_id] != part_type_id:
+            raise ImportRowError(f"{row['team'].strip()} takımı {row['part_type'].strip()} üretemez")
+
+        part_status = (row.get('status') or '').strip() or 'stock'
+        if part_status not in self.statuses:
+            raise ImportRowError(f"Geçersiz status değeri: '{part_status}'")
+
+        quantity = self.positive_int(row, 'quantity', default=1)
+        if quantity > self.max_quantity_per_row:
+            raise ImportRowError(f"quantity en fazla {self.max_quantity_per_row} olabilir")
+        return (part_type_id, aircraft_id, team_id, part_status, quantity)
+
+    def run(self, stream):
+        result = super().run(stream)
+        if self.imported:
+            # Aktarılan parçalar tek tek günlüğe yazılmaz, istemciler tam senkronizasyon yapar
+            record_reset()
+        return result
+
+    def item_weight(self, item):
+        return item[4]
+
+    def write_chunk(self, chunk):
+        connection = connections[router.db_for_write(Part)]
+        if connection.vendor == 'postgresql':
+            part_ids = self.copy_parts(connection, chunk)
+        else:
+            part_ids = [part.id for part in Part.objects.bulk_create(
+                [
+                    Part(part_type_id=part_type_id, aircraft_id=aircraft_id, team_id=team_id, status=part_status)
+                    for part_type_id, aircraft_id, team_id, part_status, quantity in chunk
+                    for _ in range(quantity)
+                ],
+                batch_size=1000
+            )]
+        self.record_produced(chunk, part_ids)
+
+        deltas = {}
+        for part_type_id, aircraft_id, team_id, part_status, quantity in chunk:
+            if part_status == 'stock':
+                key = (part_type_id, aircraft_id)
+                deltas[key] = deltas.get(key, 0) + quantity
+        PartStock.objects.bulk_create(
+            [PartStock(part_type_id=part_type_id, aircraft_id=aircraft_id) for part_type_id, aircraft_id in deltas],
+            ignore_conflicts=True
+        )
+        apply_stock_deltas(deltas)
+        return sum(item[4] for item in chunk)
+
+    def copy_parts(self, connection, chunk):
+        """Parçaları COPY ile yazar ve id'lerini satır sırasıyla döner."""
+        table = Part._meta.db_table
+        with connection.cursor() as cursor:
+            # COPY id döndürmediği için id'ler sekanstan önceden ayrılır
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [table, sum(item[4] for item in chunk)]
+            )
+            part_ids = [row[0] for row in cursor.fetchall()]
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            site = get_current_site()
+            ids = iter(part_ids)
+            for part_type_id, aircraft_id, team_id, part_status, quantity in chunk:
+                for _ in range(quantity):
+                    writer.writerow((next(ids), part_type_id, aircraft_id, team_id, part_status, 'f', site, 1))
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(self.copy_columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        return part_ids
+
+    def record_produced(self, chunk, part_ids):
+        """
+        Parçaların denetim kayıtlarını commit sonrası tampona ekler.
+        `part_ids` parçaların chunk'taki satır sırasıyla id'leridir.
+        """
+        groups = {}
+        ids = iter(part_ids)
+        for part_type_id, aircraft_id, team_id, part_status, quantity in chunk:
+            group = groups.setdefault((team_id, part_type_id, aircraft_id), [])
+            group.extend(next(ids) for _ in range(quantity))
+
+        site = get_current_site()
+        user_id = get_actor()
+
+        def record():
+            for (team_id, part_type_id, aircraft_id), group_ids in groups.items():
+                record_event('part.created', {
+                    'ids': group_ids, 'part_type': part_type_id, 'aircraft': aircraft_id, 'source': 'import',
+                }, team_id, site, user_id)
+
+        on_site_commit(record)
+
+
+class PersonnelImporter(BaseImporter):
+    """
+    `username,email,password,team` kolonlarını içeren CSV'den kullanıcı
+    hesapları ve Personnel kayıtları oluşturur.
+
+    Kullanıcı adı ve e-posta çakışmaları tüm dosya için tek sorgu ile
+    kontrol edilir, parolalar süreç havuzunda özetlenir ve geçerli tüm
+    satırlar tek transaction içinde toplu olarak yazılır.
+    """
+    required_columns = ('username', 'email', 'password', 'team')
+    staff_only = True
+    username_validator = UnicodeUsernameValidator()
+    username_max_length = User._meta.get_field('username').max_length
+
+    def load_lookups(self):
+        self.teams = self.name_lookup(Team)
+        self.rows = []
+        self.usernames = set()
+        self.emails = set()
+
+    def parse_row(self, row):
+        username = (row.get('username') or '').strip()
+        email = (row.get('email') or '').strip()
+        password = row.get('password') or ''
+        if not username or len(username) > self.username_max_length:
+            raise ImportRowError(f"username 1-{self.username_max_length} karakter olmalıdır")
+        try:
+            self.username_validator(username)
+            validate_email(email)
+        except ValidationError:
+            raise ImportRowError(f"Geçersiz kullanıcı adı veya e-posta: '{username}', '{email}'")
+        if not password:
+            raise ImportRowError("password boş olamaz")
+        team_id = self.resolve(self.teams, row, 'team', 'takım')
+        if username in self.usernames:
+            raise ImportRowError(f"Kullanıcı adı dosyada tekrar ediyor: '{username}'")
+        if email in self.emails:
+            raise ImportRowError(f"E-posta dosyada tekrar ediyor: '{email}'")
+        self.usernames.add(username)
+        self.emails.add(email)
+        return (self.line_number, username, email, password, team_id)
+
+    def flush(self, chunk):
+        # Satırlar dosyanın tamamı doğrulandıktan sonra tek transaction ile yazılır
+        self.rows.extend(chunk)
+
+    def run(self, stream):
+        super().run(stream)
+        if self.rows:
+            self.write_rows(self.rows)
+        self.errors.sort(key=lambda error: error['line'])
+        return self.summary()
+
+    def write_rows(self, rows):
+        taken = list(User.objects.filter(
+            Q(username__in=self.usernames) | Q(email__in=self.emails)
+        ).values_list('username', 'email'))
+        taken_usernames = {username for username, _ in taken}
+        taken_emails = {email for _, email in taken}
+
+        valid = []
+        for line_number, username, email, password, team_id in rows:
+            if username in taken_usernames:
+                self.add_error(line_number, f"Bu kullanıcı adı zaten kullanımda: '{username}'")
+            elif email in taken_emails:
+                self.add_error(line_number, f"Bu e-posta adresi zaten kullanımda: '{email}'")
+            else:
+                valid.append((username, email, password, team_id))
+        if not valid:
+            return
+
+        hashes = hash_passwords(password for _, _, password, _ in valid)
+        try:
+            with transaction.atomic(using=router.db_for_write(User)):
+                users = User.objects.bulk_create(
+                    [
+                        User(username=username, email=email, password=password_hash, is_active=True)
+                        for (username, email, _, _), password_hash in zip(valid, hashes)
+                    ],
+                    batch_size=1000
+                )
+                if any(user.pk is None for user in users):
+                    # Eklenen satırların id'sini döndürmeyen veritabanları
+                    ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'id'))
+                    for user in users:
+                        user.pk = ids[user.username]
+                Personnel.objects.bulk_create(
+                    [Personnel(user=user, team_id=team_id) for user, (_, _, _, team_id) in zip(users, valid)],
+                    batch_size=1000
+                )
+        except IntegrityError:
+            raise ImportRowError("Kullanıcılar aktarım sırasında başka bir istekle oluşturuldu, tekrar deneyin")
+        self.imported = len(valid)
+
+
+IMPORTERS = {
+    'requirements': PartRequirementImporter,
+    'parts': PartInventoryImporter,
+    'personnel': PersonnelImporter,
+}
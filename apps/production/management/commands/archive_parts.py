@@ -0,0 +1,115 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.production.models import AircraftPart, ArchivedPart, Part
+from apps.production.sites import site_atomic, site_context
+
+# Part tablosunda montaj bağlantısını tutan alanlar; arşivde tek alanda birleşir
+ASSEMBLY_FIELDS = ('assembled_into_id', 'archived_assembly_id')
+
+
+class Command(BaseCommand):
+    help = (
+        "Tüketilmiş ve silinmiş parçaları, belirtilen süreden eski olanlar "
+        "için küçük partiler halinde Part tablosundan ArchivedPart tablosuna taşır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=30,
+            help='Bu kadar günden daha önce silinmiş/kullanılmış parçalar arşivlenir (varsayılan: 30)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Her transaction içinde taşınacak parça sayısı (varsayılan: 1000)'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Partiler arasında beklenecek süre (saniye), canlı trafiğe nefes aldırmak için'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Sadece arşivlenecek parça sayısını göster'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size en az 1 olmalıdır')
+
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        # deleted_at alanından önce silinmiş kayıtların tarihi bilinmediği için
+        # her zaman eşikten eski kabul edilir
+        candidates = Part.objects.filter(is_deleted=True).filter(
+            Q(deleted_at__lt=cutoff) | Q(deleted_at__isnull=True)
+        )
+
+        # Her saha kendi veritabanında ayrı ayrı arşivlenir
+        for site in settings.SITE_DATABASES:
+            with site_context(site):
+                self.archive_site(site, candidates, batch_size, options)
+
+    def archive_site(self, site, candidates, batch_size, options):
+        if options['dry_run']:
+            self.stdout.write(f"[{site}] Arşivlenecek parça sayısı: {candidates.count()}")
+            return
+
+        total = 0
+        while True:
+            moved = self.archive_batch(candidates, batch_size)
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f"[{site}] {moved} parça arşivlendi (toplam {total})")
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f"[{site}] Arşivleme tamamlandı: {total} parça taşındı"))
+
+    def archive_batch(self, candidates, batch_size):
+        """
+        Tek bir partiyi kısa bir transaction içinde taşır. Kilitler sadece
+        partideki satırlar üzerinde ve sadece parti süresince tutulur.
+        """
+        with site_atomic():
+            ids = list(
+                candidates.order_by('id')
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0
+
+            rows = Part.objects.filter(id__in=ids).values(
+                'id', 'part_type_id', 'aircraft_id', 'team_id',
+                'status', 'is_deleted', 'deleted_at', 'site',
+                'assembled_into_id', 'archived_assembly_id'
+            )
+            ArchivedPart.objects.bulk_create(
+                [
+                    ArchivedPart(
+                        assembled_into=row['assembled_into_id'] or row['archived_assembly_id'],
+                        **{key: value for key, value in row.items() if key not in ASSEMBLY_FIELDS}
+                    )
+                    for row in rows
+                ],
+                ignore_conflicts=True
+            )
+
+            # İzlenebilirlik: uçak-parça bağlantılarını arşiv kaydına yönlendir
+            AircraftPart.objects.filter(part_id__in=ids).update(
+                archived_part_id=F('part_id'),
+                part=None
+            )
+            # Henüz arşivlenmemiş bileşenlerin montaj bağlantıları da arşiv kaydına yönlendirilir
+            Part.objects.filter(assembled_into_id__in=ids).exclude(id__in=ids).update(
+                archived_assembly_id=F('assembled_into_id'),
+                assembled_into=None
+            )
+            Part.objects.filter(id__in=ids).delete()
+            return len(ids)
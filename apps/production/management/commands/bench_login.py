@@ -0,0 +1,110 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.production.hashing import hash_passwords
+from apps.production.management.commands.soak import Client, percentile, start_server
+from apps.production.models import Personnel, Team
+
+BENCH_USER_PREFIX = 'bench-login-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Vardiya başlangıcındaki giriş fırtınasını taklit eder: N kullanıcı ile "
+        "eşzamanlı giriş yapar, ardından alınan refresh token'lar ile token "
+        "yeniler ve iki işlemin gecikme ve hız raporunu verir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Test kullanıcısı sayısı (varsayılan: 50)')
+        parser.add_argument('--logins', type=int, default=500, help='Toplam giriş isteği (varsayılan: 500)')
+        parser.add_argument('--concurrency', type=int, default=32, help='Eşzamanlı istek sayısı (varsayılan: 32)')
+        parser.add_argument('--password', default='bench-login', help='Test kullanıcılarının parolası')
+        parser.add_argument('--port', type=int, default=8766, help='Başlatılacak sunucunun portu (varsayılan: 8766)')
+        parser.add_argument(
+            '--base-url',
+            help='Sunucu başlatmak yerine çalışan bir sunucuya bağlan (ör. http://localhost:8000)'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['logins'], options['concurrency']) < 1:
+            raise CommandError('--users, --logins ve --concurrency en az 1 olmalıdır')
+        usernames = self.prepare(options['users'], options['password'])
+
+        server = None
+        base_url = options['base_url']
+        if not base_url:
+            base_url = f"http://127.0.0.1:{options['port']}"
+            server = start_server(options['port'])
+        try:
+            client = Client(base_url, None)
+            logins = [
+                {'username': usernames[index % len(usernames)], 'password': options['password']}
+                for index in range(options['logins'])
+            ]
+            login_results, elapsed = self.storm(client, '/api/auth/login/', logins, options['concurrency'])
+            self.report('login', login_results, elapsed)
+
+            refreshes = [
+                {'refresh': json.loads(body)['refresh']}
+                for status_code, body, _ in login_results if status_code == 200
+            ]
+            if refreshes:
+                refresh_results, elapsed = self.storm(client, '/api/auth/refresh/', refreshes, options['concurrency'])
+                self.report('refresh', refresh_results, elapsed)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+    def prepare(self, count, password):
+        """Eksik test kullanıcılarını toplu olarak oluşturur."""
+        team = Team.objects.filter(is_deleted=False).order_by('id').first()
+        if team is None:
+            raise CommandError('En az bir takım tanımlı olmalıdır (loaddata initial_data)')
+        usernames = [f'{BENCH_USER_PREFIX}{index}' for index in range(count)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        missing = [username for username in usernames if username not in existing]
+        if missing:
+            User.objects.bulk_create([
+                User(username=username, password=password_hash)
+                for username, password_hash in zip(missing, hash_passwords([password] * len(missing)))
+            ])
+        if existing:
+            # Önceki çalıştırmalardan kalan kullanıcılar da verilen parola ile giriş yapar
+            User.objects.filter(username__in=existing).update(password=hash_passwords([password])[0])
+        user_ids = User.objects.filter(username__in=usernames).values_list('id', flat=True)
+        Personnel.objects.bulk_create(
+            [Personnel(user_id=user_id, team=team) for user_id in user_ids],
+            update_conflicts=True, unique_fields=['user'], update_fields=['team']
+        )
+        return usernames
+
+    def storm(self, client, path, payloads, concurrency):
+        def send(payload):
+            started = time.perf_counter()
+            try:
+                status_code, body = client.request('POST', path, payload)
+            except OSError:
+                status_code, body = 0, b''
+            return status_code, body, time.perf_counter() - started
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(send, payloads))
+        return results, time.monotonic() - started
+
+    def report(self, name, results, elapsed):
+        latencies = sorted(latency for _, _, latency in results)
+        statuses = {}
+        for status_code, _, _ in results:
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+        self.stdout.write(
+            f"{name:<8}{len(results):>6} istek, {elapsed:.1f} sn, {len(results) / elapsed:.1f} istek/sn  "
+            + '  '.join(f"p{p}={percentile(latencies, p) * 1000:.1f}ms" for p in (50, 90, 99, 100))
+            + '  durum kodları: ' + ', '.join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+        )
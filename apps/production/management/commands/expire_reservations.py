@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.production.reservations import expire_reservations
+from apps.production.sites import site_context
+
+
+class Command(BaseCommand):
+    help = (
+        "Süresi (PART_RESERVATIONS['TTL']) dolmuş parça rezervasyonlarını her "
+        "sahada partiler halinde bırakır; parçalar stoğa geri döner."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            help="Her transaction içinde bırakılacak rezervasyon sayısı (varsayılan: PART_RESERVATIONS['SWEEP_BATCH_SIZE'])"
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size en az 1 olmalıdır')
+        for site in settings.SITE_DATABASES:
+            with site_context(site):
+                expired = expire_reservations(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"[{site}] {expired} rezervasyon bırakıldı"))
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.production.orders import fulfil_orders, get_pending_aircraft
+from apps.production.sites import site_context
+
+
+class Command(BaseCommand):
+    help = (
+        "Bekleyen montaj siparişlerini her sahada öncelik sırasıyla stoktan "
+        "karşılar. Stok artışında istek içinde ASSEMBLY_ORDERS['MAX_PER_TRIGGER'] "
+        "siparişten fazlası karşılanmadığı için periyodik olarak çalıştırılmalıdır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int,
+            help='Her sahada karşılanacak en fazla sipariş sayısı (varsayılan: sınırsız)'
+        )
+
+    def handle(self, *args, **options):
+        if options['limit'] is not None and options['limit'] < 1:
+            raise CommandError('--limit en az 1 olmalıdır')
+        for site in settings.SITE_DATABASES:
+            with site_context(site):
+                fulfilled = fulfil_orders(get_pending_aircraft(), limit=options['limit'])
+            self.stdout.write(self.style.SUCCESS(f"[{site}] {len(fulfilled)} sipariş karşılandı"))
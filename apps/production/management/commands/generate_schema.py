@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.production.schema import generate_schema, get_schema_version
+
+
+class Command(BaseCommand):
+    help = "OpenAPI şemasını mevcut kod sürümü için üretir ve OPENAPI['OUTPUT_DIR'] altına yazar."
+
+    def handle(self, *args, **options):
+        for path in generate_schema():
+            self.stdout.write(path)
+        self.stdout.write(self.style.SUCCESS(f"Şema sürümü: {get_schema_version()}"))
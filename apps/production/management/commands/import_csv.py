@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.production.importers import IMPORTERS, ImportRowError
+
+
+class Command(BaseCommand):
+    help = (
+        "CSV dosyasından uçak parça gereksinimlerini (requirements), "
+        "parça envanterini (parts) veya personeli (personnel) aktarır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS), help='Aktarım tipi')
+        parser.add_argument('path', help='CSV dosyasının yolu')
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Tek transaction içinde yazılacak kayıt sayısı'
+        )
+
+    def handle(self, *args, **options):
+        importer = IMPORTERS[options['kind']](chunk_size=options['chunk_size'])
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = importer.run(stream)
+        except (OSError, ImportRowError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"Satır {error['line']}: {error['error']}")
+        if result['error_count'] > len(result['errors']):
+            self.stderr.write(f"... ve {result['error_count'] - len(result['errors'])} hata daha")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['imported']} kayıt aktarıldı, {result['error_count']} satır hatalı"
+        ))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.production.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Geçerlilik süresi (IDEMPOTENCY['TTL']) dolmuş Idempotency-Key kayıtlarını siler."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - settings.IDEMPOTENCY['TTL']
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} kayıt silindi"))
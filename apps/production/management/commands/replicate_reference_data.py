@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.production.sites import get_shard_databases, replicate_reference_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Uçak, parça tipi, takım, gereksinim ve ürün ağacı kayıtlarını birincil veritabanından "
+        "tüm saha veritabanlarına kopyalar. Yeni bir saha eklendiğinde çalıştırılmalıdır."
+    )
+
+    def handle(self, *args, **options):
+        shards = get_shard_databases()
+        if not shards:
+            self.stdout.write("Tanımlı saha veritabanı yok")
+            return
+        for name, count in replicate_reference_data().items():
+            self.stdout.write(f"{name}: {count} kayıt")
+        self.stdout.write(self.style.SUCCESS(f"Kopyalanan veritabanları: {', '.join(shards)}"))
@@ -0,0 +1,355 @@
+import json
+import math
+import multiprocessing
+import queue
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.production.models import Aircraft, AircraftPart, Part, PartStock, Personnel, Team
+from apps.production.sites import site_context
+
+# Varsayılan işlem oranları (ağırlık)
+DEFAULT_MIX = {
+    'produce': 30,
+    'assemble': 5,
+    'delete': 10,
+    'status': 15,
+    'read': 40,
+}
+
+# 500 yanıtlarında kilitlenme olarak sayılan hata mesajları
+DEADLOCK_MARKERS = ('deadlock', 'database is locked', 'could not serialize')
+
+SOAK_USER_PREFIX = 'soak-'
+
+# Worker sonuçları için süreye eklenen bekleme payı (sn); son isteğin 30 sn'lik
+# zaman aşımını ve sonuçların kuyruğa yazılmasını kapsar
+RESULT_MARGIN = 60
+
+
+def parse_mix(value):
+    """'produce=30,read=40' biçimindeki oranları okur; belirtilmeyenler varsayılan kalır."""
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX:
+            raise CommandError(f"Geçersiz işlem: {name} (geçerli: {', '.join(DEFAULT_MIX)})")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise CommandError(f"Geçersiz oran: {item}")
+    if sum(mix.values()) <= 0:
+        raise CommandError('En az bir işlemin oranı sıfırdan büyük olmalıdır')
+    return mix
+
+
+def percentile(values, p):
+    """Sıralı listede en yakın sıra yöntemi ile yüzdelik."""
+    if not values:
+        return 0
+    rank = math.ceil(p / 100 * len(values))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+def check_invariants():
+    """
+    Geçerli sahanın veritabanında stok ve montaj tutarlılığını kontrol eder;
+    ihlal mesajlarının listesini döner.
+    """
+    violations = []
+    stocked = {
+        (row['part_type_id'], row['aircraft_id']): row['count']
+        # Rezerve edilen parçalar stok sayacından düşülmüştür
+        for row in Part.objects.filter(status='stock', is_deleted=False, reservation__isnull=True)
+        .values('part_type_id', 'aircraft_id').annotate(count=Count('id'))
+    }
+    for stock in PartStock.objects.filter(is_deleted=False).values(
+        'id', 'part_type_id', 'aircraft_id', 'stock_quantity'
+    ):
+        actual = stocked.pop((stock['part_type_id'], stock['aircraft_id']), 0)
+        if stock['stock_quantity'] < 0:
+            violations.append(f"PartStock #{stock['id']} negatif: {stock['stock_quantity']}")
+        if stock['stock_quantity'] != actual:
+            violations.append(
+                f"PartStock #{stock['id']} (parça tipi {stock['part_type_id']}, uçak {stock['aircraft_id']}): "
+                f"sayaç {stock['stock_quantity']}, stoktaki parça {actual}"
+            )
+    for (part_type_id, aircraft_id), count in stocked.items():
+        violations.append(f"Parça tipi {part_type_id}, uçak {aircraft_id}: {count} stok parçası için PartStock yok")
+
+    for field in ('part_id', 'archived_part_id'):
+        duplicates = (
+            AircraftPart.objects.filter(**{f'{field}__isnull': False})
+            .values(field).annotate(count=Count('id')).filter(count__gt=1)
+        )
+        for row in duplicates:
+            violations.append(f"Parça #{row[field]} {row['count']} uçakta kullanılmış")
+    return violations
+
+
+def start_server(port):
+    """Yerel geliştirme sunucusunu başlatır ve porta bağlanılabilene kadar bekler."""
+    server = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload'],
+        cwd=settings.BASE_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise CommandError('Sunucu başlatılamadı')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise CommandError('Sunucu 30 saniye içinde hazır olmadı')
+
+
+class Client:
+    """Worker süreçlerinin kullandığı basit JSON HTTP istemcisi."""
+
+    def __init__(self, base_url, token):
+        self.base_url = base_url
+        self.token = token
+
+    def request(self, method, path, data=None):
+        body = json.dumps(data).encode() if data is not None else None
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        request = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+
+
+def run_worker(index, base_url, plan, mix, duration, seed, results):
+    """
+    Süre dolana kadar oranlara göre rastgele işlemler yapar; her işlem için
+    durum kodlarını ve gecikmeleri ana sürece gönderir.
+    """
+    rng = random.Random(seed + index)
+    producers = [
+        (Client(base_url, token), part_type_id) for token, part_type_id in plan['producers']
+    ]
+    assembler = Client(base_url, plan['assembler'])
+    # Worker'ın ürettiği parçalar: (istemci, parça id)
+    own_parts = []
+    operations, weights = zip(*mix.items())
+    stats = {}
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        client, part_type_id = rng.choice(producers)
+        aircraft_id = rng.choice(plan['aircrafts'])
+
+        if operation in ('delete', 'status') and not own_parts:
+            operation = 'produce'
+        if operation == 'produce':
+            method, path, data = 'POST', '/api/parts/', {
+                'part_type': part_type_id, 'aircraft': aircraft_id, 'stock': rng.randint(1, 3)
+            }
+        elif operation == 'assemble':
+            client = assembler
+            method, path, data = 'POST', '/api/produced-aircrafts/', {'aircraft': aircraft_id}
+        elif operation == 'delete':
+            client, part_id = own_parts.pop(rng.randrange(len(own_parts)))
+            method, path, data = 'DELETE', f'/api/parts/{part_id}/', None
+        elif operation == 'status':
+            client, part_id = rng.choice(own_parts)
+            method, path, data = 'POST', f'/api/parts/{part_id}/update_status/', {
+                'status': rng.choice(('stock', 'used'))
+            }
+        elif own_parts and rng.random() < 0.5:
+            client, part_id = rng.choice(own_parts)
+            method, path, data = 'GET', f'/api/parts/{part_id}/', None
+        else:
+            method, path, data = 'GET', '/api/part-stock/', None
+
+        started = time.perf_counter()
+        try:
+            status_code, body = client.request(method, path, data)
+        except OSError:
+            status_code, body = 0, b''
+        latency = time.perf_counter() - started
+
+        entry = stats.setdefault(operation, {'latencies': [], 'statuses': {}, 'deadlocks': 0})
+        entry['latencies'].append(latency)
+        entry['statuses'][status_code] = entry['statuses'].get(status_code, 0) + 1
+        if status_code >= 500 and any(marker in body.decode(errors='replace').lower() for marker in DEADLOCK_MARKERS):
+            entry['deadlocks'] += 1
+        if operation == 'produce' and status_code == 201:
+            own_parts.extend((client, part['id']) for part in json.loads(body)['parts'])
+        # Bellek sınırlı kalsın diye sadece son parçalar tutulur
+        del own_parts[:-1000]
+
+    results.put((index, stats))
+
+
+class Command(BaseCommand):
+    help = (
+        "Yerel bir sunucu başlatıp N worker süreci ile parça üretimi, montaj, "
+        "silme, durum güncelleme ve okuma işlemlerini eşzamanlı olarak çalıştırır; "
+        "sonunda stok ve montaj tutarlılığını kontrol eder ve performans raporu verir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Worker süreç sayısı (varsayılan: 4)')
+        parser.add_argument('--duration', type=float, default=30, help='Test süresi, saniye (varsayılan: 30)')
+        parser.add_argument(
+            '--mix', default='',
+            help=f"İşlem oranları, ör. produce=30,read=40 (varsayılan: "
+                 f"{','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items())})"
+        )
+        parser.add_argument('--port', type=int, default=8765, help='Başlatılacak sunucunun portu (varsayılan: 8765)')
+        parser.add_argument(
+            '--base-url',
+            help='Sunucu başlatmak yerine çalışan bir sunucuya bağlan (ör. http://localhost:8000)'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Rastgelelik tohumu (varsayılan: 0)')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers en az 1 olmalıdır')
+        mix = parse_mix(options['mix'])
+        plan = self.prepare(options['duration'])
+
+        server = None
+        base_url = options['base_url']
+        if not base_url:
+            base_url = f"http://127.0.0.1:{options['port']}"
+            server = start_server(options['port'])
+        try:
+            stats, elapsed = self.run_workers(base_url, plan, mix, options)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        self.report(stats, elapsed)
+
+        violations = []
+        for site in settings.SITE_DATABASES:
+            with site_context(site):
+                violations.extend(f"[{site}] {message}" for message in check_invariants())
+        if violations:
+            for message in violations:
+                self.stdout.write(self.style.ERROR(message))
+            raise CommandError(f"{len(violations)} tutarlılık ihlali bulundu")
+        self.stdout.write(self.style.SUCCESS('Tüm tutarlılık kontrolleri geçti'))
+
+    def prepare(self, duration):
+        """Her takım için bir test kullanıcısı hazırlar ve token'larını üretir."""
+        aircrafts = list(Aircraft.objects.filter(is_deleted=False).values_list('id', flat=True))
+        teams = list(Team.objects.filter(is_deleted=False))
+        assembly_team = next((team for team in teams if team.name == 'Montaj Takımı'), None)
+        producers = [team for team in teams if team.responsible_part_id]
+        if not aircrafts or not producers or assembly_team is None:
+            raise CommandError('Uçak, üretim takımı ve Montaj Takımı tanımlı olmalıdır (loaddata initial_data)')
+
+        def token_for(team):
+            user, created = User.objects.get_or_create(username=f'{SOAK_USER_PREFIX}{team.id}')
+            if created:
+                user.set_unusable_password()
+                user.save()
+            Personnel.objects.update_or_create(user=user, defaults={'team': team, 'is_deleted': False})
+            token = AccessToken.for_user(user)
+            # Token test süresince geçerli kalmalı
+            token.set_exp(lifetime=timedelta(seconds=duration + 300))
+            token['site'] = team.site
+            return str(token)
+
+        return {
+            'aircrafts': aircrafts,
+            'producers': [(token_for(team), team.responsible_part_id) for team in producers],
+            'assembler': token_for(assembly_team),
+        }
+
+    def run_workers(self, base_url, plan, mix, options):
+        # Worker'lar veritabanına bağlanmaz; devralınan bağlantılar kapatılır
+        connections.close_all()
+        # Worker hedefi Django kurulumu gerektirmeden kopyalansın diye fork kullanılır
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=run_worker,
+                args=(index, base_url, plan, mix, options['duration'], options['seed'], results)
+            )
+            for index in range(options['workers'])
+        ]
+        started = time.monotonic()
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"{len(workers)} worker {options['duration']:g} saniye çalışıyor...")
+
+        stats = {}
+        reported = set()
+        for _ in workers:
+            try:
+                index, worker_stats = results.get(timeout=options['duration'] + RESULT_MARGIN)
+            except queue.Empty:
+                missing = [index for index in range(len(workers)) if index not in reported]
+                for worker in workers:
+                    if worker.is_alive():
+                        worker.terminate()
+                    worker.join()
+                raise CommandError(
+                    'Worker sonuç göndermedi: '
+                    + ', '.join(f"#{index} (çıkış kodu: {workers[index].exitcode})" for index in missing)
+                )
+            reported.add(index)
+            for operation, entry in worker_stats.items():
+                total = stats.setdefault(operation, {'latencies': [], 'statuses': {}, 'deadlocks': 0})
+                total['latencies'].extend(entry['latencies'])
+                total['deadlocks'] += entry['deadlocks']
+                for status_code, count in entry['statuses'].items():
+                    total['statuses'][status_code] = total['statuses'].get(status_code, 0) + count
+        for worker in workers:
+            worker.join()
+        for index, worker in enumerate(workers):
+            if worker.exitcode != 0:
+                raise CommandError(f"Worker #{index} {worker.exitcode} çıkış koduyla sonlandı")
+        return stats, time.monotonic() - started
+
+    def report(self, stats, elapsed):
+        total = sum(len(entry['latencies']) for entry in stats.values())
+        errors = sum(
+            count for entry in stats.values()
+            for status_code, count in entry['statuses'].items() if status_code == 0 or status_code >= 500
+        )
+        deadlocks = sum(entry['deadlocks'] for entry in stats.values())
+        self.stdout.write(
+            f"Toplam {total} istek, {elapsed:.1f} sn, {total / elapsed:.1f} istek/sn, "
+            f"{errors} hata, {deadlocks} kilitlenme"
+        )
+        self.stdout.write(f"{'işlem':<10}{'adet':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}  durum kodları")
+        for operation in DEFAULT_MIX:
+            entry = stats.get(operation)
+            if not entry:
+                continue
+            latencies = sorted(entry['latencies'])
+            self.stdout.write(
+                f"{operation:<10}{len(latencies):>8}"
+                + ''.join(f"{percentile(latencies, p) * 1000:>10.1f}" for p in (50, 90, 99, 100))
+                + '  ' + ', '.join(f"{code}: {count}" for code, count in sorted(entry['statuses'].items()))
+            )
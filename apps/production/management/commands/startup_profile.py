@@ -0,0 +1,148 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+RESULT_MARKER = 'STARTUP_PROFILE_RESULT '
+
+# Yeni bir Python sürecinde çalışır: Django'yu başlatır, URL'leri yükler ve
+# WSGI uygulamasına ilk isteği gönderir. Sonuç tek satır JSON olarak yazılır.
+BOOTSTRAP = '''
+import io, json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls_done = time.perf_counter()
+hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+statuses = []
+application = WSGIHandler()
+response = application({
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+    'HTTP_HOST': hosts[0] if hosts else 'localhost', 'REMOTE_ADDR': '127.0.0.1',
+    'wsgi.input': io.BytesIO(b''), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+}, lambda status, headers, exc_info=None: statuses.append(status))
+b''.join(response)
+response.close()
+done = time.perf_counter()
+print(%r + json.dumps({
+    'setup_ms': (setup_done - started) * 1000,
+    'urls_ms': (urls_done - setup_done) * 1000,
+    'first_response_ms': (done - urls_done) * 1000,
+    'total_ms': (done - started) * 1000,
+    'status': statuses[0].split()[0] if statuses else None,
+    'modules': sorted(sys.modules),
+}))
+''' % RESULT_MARKER
+
+
+def get_config():
+    return {
+        'BUDGET_MS': 1500,
+        'LAZY_MODULES': (),
+        **getattr(settings, 'STARTUP_PROFILE', {}),
+    }
+
+
+def parse_importtime(output):
+    """`-X importtime` çıktısından paket bazında toplam içe aktarma süresi (ms)."""
+    packages = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us) / 1000
+    return packages
+
+
+class Command(BaseCommand):
+    help = (
+        "Yeni bir süreçte Django açılışını ölçer: django.setup, URL yükleme ve "
+        "ilk yanıt süreleri ile -X importtime çıktısından en pahalı paketleri "
+        "raporlar. --check ile bütçe aşılırsa veya ertelenmesi gereken "
+        "modüller açılışta yüklenirse hata ile çıkar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', choices=['api', 'full'], default='api',
+            help='Ölçülecek uygulama profili (APP_PROFILE, varsayılan: api)'
+        )
+        parser.add_argument('--path', default='/api/', help='İlk isteğin yolu (varsayılan: /api/)')
+        parser.add_argument('--top', type=int, default=15, help='Raporlanacak paket sayısı (varsayılan: 15)')
+        parser.add_argument(
+            '--budget-ms', type=float,
+            help="Açılış bütçesi (varsayılan: STARTUP_PROFILE['BUDGET_MS'])"
+        )
+        parser.add_argument('--check', action='store_true', help='Bütçe veya ertelenen modül ihlalinde hata ver')
+        parser.add_argument('--json', action='store_true', help='Sonucu JSON olarak yaz')
+
+    def handle(self, *args, **options):
+        config = get_config()
+        budget = options['budget_ms'] or config['BUDGET_MS']
+        result = self.measure(options['profile'], options['path'])
+
+        packages = parse_importtime(result.pop('importtime'))
+        modules = set(result.pop('modules'))
+        result.update({
+            'profile': options['profile'],
+            'path': options['path'],
+            'budget_ms': budget,
+            'packages': dict(sorted(packages.items(), key=lambda item: -item[1])[:options['top']]),
+            'eager_lazy_modules': [name for name in config['LAZY_MODULES'] if name in modules],
+        })
+
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+        else:
+            self.report(result)
+
+        if options['check']:
+            if result['total_ms'] > budget:
+                raise CommandError(f"Açılış süresi {result['total_ms']:.0f} ms, bütçe {budget:.0f} ms")
+            if result['eager_lazy_modules']:
+                raise CommandError(
+                    'Açılışta yüklenmemesi gereken modüller yüklendi: ' + ', '.join(result['eager_lazy_modules'])
+                )
+
+    def measure(self, profile, path):
+        env = {**os.environ, 'APP_PROFILE': profile}
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOTSTRAP, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=120
+        )
+        process_ms = (time.perf_counter() - started) * 1000
+        for line in completed.stdout.splitlines():
+            if line.startswith(RESULT_MARKER):
+                result = json.loads(line[len(RESULT_MARKER):])
+                break
+        else:
+            raise CommandError(f"Açılış ölçülemedi:\n{completed.stderr[-2000:]}")
+        return {**result, 'process_ms': process_ms, 'importtime': completed.stderr}
+
+    def report(self, result):
+        self.stdout.write(
+            f"Profil: {result['profile']}  django.setup: {result['setup_ms']:.1f} ms  "
+            f"URL yükleme: {result['urls_ms']:.1f} ms  "
+            f"ilk yanıt (GET {result['path']} -> {result['status']}): {result['first_response_ms']:.1f} ms"
+        )
+        self.stdout.write(
+            f"Toplam: {result['total_ms']:.1f} ms (bütçe {result['budget_ms']:.0f} ms), "
+            f"yorumlayıcı dahil süreç: {result['process_ms']:.1f} ms"
+        )
+        self.stdout.write('En pahalı paketler (-X importtime, ms):')
+        for package, elapsed in result['packages'].items():
+            self.stdout.write(f"  {package:<32}{elapsed:>8.1f}")
+        eager = result['eager_lazy_modules']
+        self.stdout.write('Açılışta yüklenen ertelenmiş modüller: ' + (', '.join(eager) if eager else 'yok'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='part',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='aircraftpart',
+            name='part',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, to='production.part'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedPart',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('stock', 'Stokta'), ('used', 'Kullanılmış')], max_length=10)),
+                ('is_deleted', models.BooleanField(default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='production.aircraft')),
+                ('part_type', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='production.parttype')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='production.team')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='aircraftpart',
+            name='archived_part',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='production.archivedpart'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:53
+
+import apps.production.sites
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0004_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aircraftpart',
+            name='site',
+            field=models.CharField(db_index=True, default=apps.production.sites.get_current_site, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='archivedpart',
+            name='site',
+            field=models.CharField(db_index=True, default=apps.production.sites.get_current_site, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='part',
+            name='site',
+            field=models.CharField(db_index=True, default=apps.production.sites.get_current_site, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='partstock',
+            name='site',
+            field=models.CharField(db_index=True, default=apps.production.sites.get_current_site, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='producedaircraft',
+            name='site',
+            field=models.CharField(db_index=True, default=apps.production.sites.get_current_site, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='site',
+            field=models.CharField(db_index=True, default=apps.production.sites.get_current_site, max_length=20),
+        ),
+    ]
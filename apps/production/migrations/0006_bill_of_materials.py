@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0005_site_sharding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='part',
+            name='assembled_into',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='components', to='production.part'),
+        ),
+        migrations.CreateModel(
+            name='PartTypeComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='used_in', to='production.parttype')),
+                ('parent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='components', to='production.parttype')),
+            ],
+            options={
+                'unique_together': {('parent', 'component')},
+            },
+        ),
+    ]
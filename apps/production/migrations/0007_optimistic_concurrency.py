@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0006_bill_of_materials'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='part',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='partstock',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='producedaircraft',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:13
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0007_optimistic_concurrency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.UUIDField(unique=True)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('action', models.CharField(max_length=30)),
+                ('part_id', models.BigIntegerField(null=True)),
+                ('produced_aircraft_id', models.BigIntegerField(null=True)),
+                ('user_id', models.IntegerField(null=True)),
+                ('team_id', models.IntegerField(null=True)),
+                ('site', models.CharField(max_length=20)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['part_id', 'created_at'], name='production__part_id_916340_idx'), models.Index(fields=['user_id', 'created_at'], name='production__user_id_08d023_idx'), models.Index(fields=['team_id', 'created_at'], name='production__team_id_75c188_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:46
+
+import apps.production.sites
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0008_audit_trail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssemblyOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.SmallIntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('fulfilled', 'Karşılandı'), ('cancelled', 'İptal edildi')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('fulfilled_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('site', models.CharField(db_index=True, default=apps.production.sites.get_current_site, max_length=20)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='production.aircraft')),
+                ('produced_aircraft', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='production.producedaircraft')),
+                ('requested_by', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'aircraft', '-priority', 'id'], name='assemblyorder_backlog_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:51
+
+import apps.production.sites
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0009_assembly_orders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('active', 'Aktif'), ('converted', 'Üretildi'), ('released', 'Bırakıldı'), ('expired', 'Süresi doldu')], default='active', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('site', models.CharField(db_index=True, default=apps.production.sites.get_current_site, max_length=20)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='production.aircraft')),
+                ('produced_aircraft', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='production.producedaircraft')),
+                ('reserved_by', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='part',
+            name='reservation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='parts', to='production.partreservation'),
+        ),
+        migrations.AddIndex(
+            model_name='partreservation',
+            index=models.Index(fields=['status', 'expires_at'], name='partreservation_expiry_idx'),
+        ),
+    ]
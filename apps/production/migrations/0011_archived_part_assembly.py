@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0010_part_reservations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpart',
+            name='assembled_into',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='part',
+            name='archived_assembly',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='live_components', to='production.archivedpart'),
+        ),
+    ]
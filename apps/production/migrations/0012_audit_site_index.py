@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0011_archived_part_assembly'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auditentry',
+            name='production__part_id_916340_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auditentry',
+            index=models.Index(fields=['site', 'part_id', 'created_at'], name='production__site_c8b933_idx'),
+        ),
+    ]
@@ -1,5 +1,85 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .concurrency import VersionConflict
+from .sites import get_current_site
+
+
+class VersionedModel(models.Model):
+    """
+    İyimser eşzamanlılık kontrollü model (bkz. concurrency.py).
+    Kayıtlı bir nesnenin save() çağrısı sadece veritabanından okunduğundan
+    beri değişen alanları update_fields olarak Model.save'e verir; UPDATE
+    sorgusu _do_update içinde okunan sürümle koşullanır ve sürümü artırır.
+    Okunan sürüm artık geçerli değilse VersionConflict fırlatılır. Sinyaller
+    ve alanların pre_save adımları (ör. auto_now) normal şekilde çalışır.
+    Toplu .update() çağrıları sürümü F('version') + 1 ile kendisi
+    artırmalıdır.
+    """
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_changed_fields(self):
+        """Okunduğundan beri değişen alanlar; bilinmiyorsa tüm alanlar."""
+        loaded = getattr(self, '_loaded_values', {})
+        deferred = self.get_deferred_fields()
+        return [
+            field for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname != 'version' and field.attname not in deferred
+            and (
+                field.attname not in loaded or getattr(self, field.attname) != loaded[field.attname]
+                or getattr(field, 'auto_now', False)
+            )
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or kwargs.get('force_insert'):
+            super().save(*args, **kwargs)
+            self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+            return
+
+        fields = self.get_changed_fields()
+        if kwargs.get('update_fields') is not None:
+            fields = [field for field in fields if field.name in kwargs['update_fields']]
+        # Değişiklik olmasa da sürüm artırılır; sinyaller her save() için çalışır
+        kwargs['update_fields'] = [field.name for field in fields] + ['version']
+        using = kwargs.get('using') or self._state.db
+        if transaction.get_connection(using).in_atomic_block:
+            # Sürüm çakışması dış transaction'ı geri alınacak olarak işaretlemesin
+            with transaction.atomic(using=using):
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self.version += 1
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{field.attname: getattr(self, field.attname) for field in fields},
+            'version': self.version,
+        }
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # Ham kayıtlar (loaddata, replika aktarımı) save() üzerinden gelmez; sürüm denetlenmez
+        if update_fields is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        version_field = self._meta.get_field('version')
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, F('version') + 1))
+        if not super()._do_update(
+            base_qs.filter(version=self.version), using, pk_val, values, update_fields, forced_update
+        ):
+            raise VersionConflict(self)
+        return True
+
 
 class Aircraft(models.Model):
     name = models.CharField(max_length=50)
@@ -20,6 +100,8 @@ class Team(models.Model):
     name = models.CharField(max_length=50)
     responsible_part = models.ForeignKey(PartType, on_delete=models.CASCADE,null=True)
     is_deleted = models.BooleanField(default=False)
+    # Takımın bulunduğu üretim sahası; personelin sahası buradan belirlenir (bkz. sites.py)
+    site = models.CharField(max_length=20, default=get_current_site, db_index=True)
 
     def __str__(self):
         return self.name
@@ -50,15 +132,52 @@ class AircraftPartRequirement(models.Model):
     def __str__(self):
         return f"{self.aircraft.name} - {self.part_type.name}: {self.required_quantity}"
 
-class Part(models.Model):
+class PartTypeComponent(models.Model):
+    """
+    Alt montaj ürün ağacı: `parent` parça tipinin bir adedi `component`
+    parça tipinden `quantity` adet içerir (ör. kanat = 2 kiriş + 12 sinir).
+    Gereksinimler bir alt montajı gösterdiğinde ağaç bom.py ile açılır.
+    """
+    parent = models.ForeignKey(PartType, on_delete=models.CASCADE, related_name='components')
+    component = models.ForeignKey(PartType, on_delete=models.CASCADE, related_name='used_in')
+    quantity = models.PositiveIntegerField()
+    is_deleted = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ['parent', 'component']
+
+    def __str__(self):
+        return f"{self.parent.name} <- {self.component.name} x{self.quantity}"
+
+class Part(VersionedModel):
     part_type = models.ForeignKey(PartType, on_delete=models.CASCADE, null=True)
     aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE)
     team = models.ForeignKey(Team, on_delete=models.CASCADE)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='stock')
     is_deleted = models.BooleanField(default=False)
+    # Parçanın silindiği veya uçakta kullanıldığı an (arşivleme için)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    site = models.CharField(max_length=20, default=get_current_site, db_index=True)
+    # Parça bir alt montajda kullanıldıysa, kullanıldığı montaj parçası
+    assembled_into = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='components'
+    )
+    # Montaj parçası arşive taşındığında assembled_into boşaltılır ve bu alan doldurulur
+    archived_assembly = models.ForeignKey(
+        'ArchivedPart', on_delete=models.PROTECT, null=True, blank=True, related_name='live_components'
+    )
+    # Parça bir montaj için ayrıldıysa, rezervasyon bitene kadar başka işlemlerde kullanılamaz
+    reservation = models.ForeignKey(
+        'PartReservation', on_delete=models.SET_NULL, null=True, blank=True, related_name='parts'
+    )
 
     def __str__(self):
         return f"{self.part_type.name} ({self.aircraft.name})"
+
+    @property
+    def assembly(self):
+        """Kullanıldığı montaj parçasını, arşive taşınmış olsa bile döndürür."""
+        return self.assembled_into if self.assembled_into_id is not None else self.archived_assembly
     
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -68,18 +187,125 @@ class Part(models.Model):
                 f"{self.team.name} takımı {self.part_type.name} üretemez."
             )
     
-class ProducedAircraft(models.Model):
+class ProducedAircraft(VersionedModel):
     aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE)
     parts = models.ManyToManyField(Part,through='AircraftPart' )
     date = models.DateTimeField(auto_now_add=True)
     is_deleted = models.BooleanField(default=False)
+    site = models.CharField(max_length=20, default=get_current_site, db_index=True)
 
     def __str__(self):
         return f"{self.aircraft.name} - {self.date.strftime('%Y-%m-%d %H:%M:%S')}"
 
+RESERVATION_STATUS_CHOICES = [
+    ('active', 'Aktif'),
+    ('converted', 'Üretildi'),
+    ('released', 'Bırakıldı'),
+    ('expired', 'Süresi doldu'),
+]
+
+class PartReservation(models.Model):
+    """
+    Planlanan bir uçak için önceden ayrılmış stok parçaları. Rezervasyondaki
+    parçalar stok sayacından düşülür ve süre dolana kadar parça listelerinde
+    ve diğer montajlarda görünmez (bkz. reservations.py).
+    """
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=RESERVATION_STATUS_CHOICES, default='active')
+    # Kullanıcılar varsayılan veritabanında, rezervasyonlar saha veritabanında tutulur
+    reserved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, db_constraint=False, related_name='+')
+    produced_aircraft = models.ForeignKey(ProducedAircraft, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    is_deleted = models.BooleanField(default=False)
+    site = models.CharField(max_length=20, default=get_current_site, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Süresi dolan aktif rezervasyonları bulan temizlik sorgusu için
+            models.Index(fields=['status', 'expires_at'], name='partreservation_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.aircraft.name} rezervasyonu #{self.id} ({self.get_status_display()})"
+
+ORDER_STATUS_CHOICES = [
+    ('pending', 'Bekliyor'),
+    ('fulfilled', 'Karşılandı'),
+    ('cancelled', 'İptal edildi'),
+]
+
+class AssemblyOrder(models.Model):
+    """
+    Stok yetersizken sıraya alınan uçak üretim siparişi. Bekleyen
+    siparişler, uçağın gerektirdiği parça tiplerinin stoğu arttığında
+    öncelik sırasıyla karşılanır (bkz. orders.py).
+    """
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE)
+    # Büyük değer önce karşılanır; eşitlikte önce verilen sipariş
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=ORDER_STATUS_CHOICES, default='pending')
+    # Kullanıcılar varsayılan veritabanında, siparişler saha veritabanında tutulur
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, db_constraint=False, related_name='+')
+    produced_aircraft = models.ForeignKey(ProducedAircraft, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    fulfilled_at = models.DateTimeField(null=True, blank=True)
+    is_deleted = models.BooleanField(default=False)
+    site = models.CharField(max_length=20, default=get_current_site, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Stok artışında sadece ilgili uçağın bekleyen siparişleri öncelik sırasıyla okunur
+            models.Index(fields=['status', 'aircraft', '-priority', 'id'], name='assemblyorder_backlog_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.aircraft.name} siparişi #{self.id} ({self.get_status_display()})"
+
+class ArchivedPart(models.Model):
+    """
+    Tüketilmiş veya silinmiş parçaların arşiv tablosu.
+    Kayıtlar `archive_parts` komutu ile Part tablosundan taşınır ve
+    orijinal id'lerini korur.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    part_type = models.ForeignKey(PartType, on_delete=models.CASCADE, null=True)
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    is_deleted = models.BooleanField(default=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    site = models.CharField(max_length=20, default=get_current_site, db_index=True)
+    # Parça bir alt montajda kullanıldıysa montaj parçasının id'si. Arşivleme
+    # id'leri koruduğu için montaj parçası Part veya ArchivedPart tablosunda
+    # bu id ile bulunur.
+    assembled_into = models.BigIntegerField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.part_type.name} ({self.aircraft.name}) [arşiv]"
+
+    @property
+    def assembly(self):
+        """Kullanıldığı montaj parçasını, arşive taşınmış olsa bile döndürür."""
+        if self.assembled_into is None:
+            return None
+        return (
+            Part.objects.filter(id=self.assembled_into).first()
+            or ArchivedPart.objects.filter(id=self.assembled_into).first()
+        )
+
 class AircraftPart(models.Model):
     produced_aircraft = models.ForeignKey(ProducedAircraft, on_delete=models.CASCADE)
-    part = models.ForeignKey(Part, on_delete=models.CASCADE)
+    # Parça arşive taşındığında part boşaltılır ve archived_part doldurulur
+    part = models.ForeignKey(Part, on_delete=models.PROTECT, null=True)
+    archived_part = models.ForeignKey(ArchivedPart, on_delete=models.PROTECT, null=True, blank=True)
+    site = models.CharField(max_length=20, default=get_current_site, db_index=True)
+
+    @property
+    def source_part(self):
+        """Bağlı parçayı, arşive taşınmış olsa bile döndürür."""
+        return self.part if self.part_id is not None else self.archived_part
 
     def save(self, *args, **kwargs):
         if self.part.status != 'stock':
@@ -89,7 +315,7 @@ class AircraftPart(models.Model):
         super().save(*args, **kwargs)
         Part.objects.filter(id=self.part.id).update(status='used')
 
-class PartStock(models.Model):
+class PartStock(VersionedModel):
     part_type = models.ForeignKey(PartType, on_delete=models.CASCADE)
     stock_quantity = models.PositiveIntegerField(default=0)
     is_deleted = models.BooleanField(default=False)
@@ -99,6 +325,7 @@ class PartStock(models.Model):
         null=True,  # Geçici olarak null'a izin ver
         default=None  # Varsayılan değer None
     )
+    site = models.CharField(max_length=20, default=get_current_site, db_index=True)
 
     class Meta:
         unique_together = ['part_type', 'aircraft']
@@ -107,3 +334,83 @@ class PartStock(models.Model):
         return f"{self.part_type.name} - {self.stock_quantity}"
 
 
+class IdempotencyKey(models.Model):
+    """
+    Idempotency-Key header'ı ile gelen isteklerin yanıtlarını saklar.
+    status_code boş ise istek hala işlenmektedir.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ['user', 'key']
+
+    def __str__(self):
+        return f"{self.method} {self.path} [{self.key}]"
+
+
+CHANGE_MODELS = [
+    ('part', 'Parça'),
+    ('stock', 'Stok'),
+    ('produced_aircraft', 'Üretilen Uçak'),
+    ('reset', 'Tam Senkronizasyon'),
+]
+
+class ChangeLog(models.Model):
+    """
+    Delta senkronizasyonu için değişiklik günlüğü.
+    Her yazma işleminde, sürekli artan `seq` ile bir kayıt eklenir.
+    `deleted` kayıtları silinen nesneler için tombstone'dur.
+    """
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=20, choices=CHANGE_MODELS)
+    object_id = models.BigIntegerField(null=True)
+    team = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, db_constraint=False, related_name='+')
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.seq} {self.model}:{self.object_id}"
+
+
+class AuditEntry(models.Model):
+    """
+    Parça ve uçak üretim işlemlerinin değiştirilemez denetim kaydı.
+    Kayıtlar transaction commit edildikten sonra bellekte biriktirilir ve
+    toplu olarak eklenir (bkz. audit.py); `event_id` tekrar denemelerde
+    aynı kaydın iki kez eklenmesini önler. Tüm sahaların kayıtları varsayılan
+    veritabanında tutulur.
+    """
+    event_id = models.UUIDField(unique=True)
+    created_at = models.DateTimeField(db_index=True)
+    action = models.CharField(max_length=30)
+    part_id = models.BigIntegerField(null=True)
+    produced_aircraft_id = models.BigIntegerField(null=True)
+    user_id = models.IntegerField(null=True)
+    team_id = models.IntegerField(null=True)
+    site = models.CharField(max_length=20)
+    data = models.JSONField(encoder=DjangoJSONEncoder, default=dict)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['site', 'part_id', 'created_at']),
+            models.Index(fields=['user_id', 'created_at']),
+            models.Index(fields=['team_id', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M:%S} {self.action} #{self.part_id or self.produced_aircraft_id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Denetim kayıtları değiştirilemez")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Denetim kayıtları silinemez")
@@ -0,0 +1,133 @@
+"""
+Montaj siparişi kuyruğu ve stok geldiğinde otomatik karşılama.
+
+Stokla hemen karşılanamayan siparişler `pending` durumunda bekler. Stok
+sayaçları arttığında (apply_stock_deltas) sadece artan (parça tipi, uçak)
+çiftlerine bağlı uçakların bekleyen siparişleri değerlendirilir: bağımlılık
+parça gereksinimlerinden tek sorgu ile bulunur, her uçağın siparişleri
+(status, aircraft, -priority, id) indeksinden öncelik sırasıyla okunur.
+Böylece her stok artışında tüm kuyruk taranmaz.
+
+Karşılama, stoğu artıran transaction commit edildikten sonra ayrı
+transaction'larda yapılır; her sipariş kilitlenerek işlendiği için aynı
+siparişi iki süreç birden karşılayamaz. Karşılama stoğu artıran isteğin
+içinde çalıştığı için tek seferde en fazla ASSEMBLY_ORDERS['MAX_PER_TRIGGER']
+sipariş karşılanır; kalanlar ve hata nedeniyle karşılanamayanlar
+fulfil_orders komutu ile periyodik olarak karşılanır.
+"""
+import logging
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .assembly import assemble_aircraft
+from .models import AircraftPartRequirement, AssemblyOrder
+from .sites import get_current_site, on_site_commit, site_atomic, site_context
+
+logger = logging.getLogger(__name__)
+
+
+def get_config():
+    return {
+        'MAX_PER_TRIGGER': 5,
+        **getattr(settings, 'ASSEMBLY_ORDERS', {}),
+    }
+
+
+def get_dependent_aircraft(pairs):
+    """
+    Stoğu artan {(part_type_id, aircraft_id)} çiftlerinden, bekleyen
+    siparişi olan ve bu parça tiplerini gerektiren uçakların id'leri.
+    """
+    condition = Q()
+    for part_type_id, aircraft_id in pairs:
+        condition |= Q(part_type_id=part_type_id, aircraft_id=aircraft_id)
+    if not condition:
+        return []
+    aircraft_ids = set(
+        AircraftPartRequirement.objects.filter(condition).values_list('aircraft_id', flat=True)
+    )
+    if not aircraft_ids:
+        return []
+    return sorted(set(
+        AssemblyOrder.objects.filter(
+            status='pending', is_deleted=False, aircraft_id__in=aircraft_ids
+        ).values_list('aircraft_id', flat=True)
+    ))
+
+
+def get_pending_aircraft():
+    """Bekleyen siparişi olan tüm uçakların id'leri."""
+    return sorted(set(
+        AssemblyOrder.objects.filter(status='pending', is_deleted=False).values_list('aircraft_id', flat=True)
+    ))
+
+
+def fulfil_next(aircraft_id):
+    """
+    Uçağın en öncelikli bekleyen siparişini stoktan karşılamayı dener.
+    Karşılanan siparişi, sipariş yoksa veya stok yetmiyorsa None döner.
+    """
+    with site_atomic():
+        order = (
+            AssemblyOrder.objects.filter(status='pending', is_deleted=False, aircraft_id=aircraft_id)
+            .select_related('aircraft')
+            .order_by('-priority', 'id')
+            .select_for_update(of=('self',))
+            .first()
+        )
+        if order is None:
+            return None
+        produced_aircraft, missing_parts = assemble_aircraft(order.aircraft)
+        if missing_parts:
+            return None
+        order.status = 'fulfilled'
+        order.produced_aircraft = produced_aircraft
+        order.fulfilled_at = timezone.now()
+        order.save(update_fields=['status', 'produced_aircraft', 'fulfilled_at'])
+        return order
+
+
+def fulfil_orders(aircraft_ids, limit=None):
+    """
+    Uçakların bekleyen siparişlerini öncelik sırasıyla karşılar. Aynı
+    uçağın siparişleri aynı parçaları gerektirdiği için ilk karşılanamayan
+    siparişte o uçak için durulur. `limit` verilirse en fazla bu kadar
+    sipariş karşılanır. Karşılanan siparişlerin listesi döner.
+    """
+    fulfilled = []
+    for aircraft_id in aircraft_ids:
+        while limit is None or len(fulfilled) < limit:
+            try:
+                order = fulfil_next(aircraft_id)
+            except Exception:
+                logger.exception("Montaj siparişleri karşılanamadı (uçak %s)", aircraft_id)
+                break
+            if order is None:
+                break
+            fulfilled.append(order)
+    return fulfilled
+
+
+def fulfil_triggered(aircraft_ids):
+    """
+    Bir istek içinden tetiklenen karşılama: en fazla MAX_PER_TRIGGER
+    sipariş karşılanır, kalanlar fulfil_orders komutuna bırakılır.
+    """
+    return fulfil_orders(aircraft_ids, limit=get_config()['MAX_PER_TRIGGER'])
+
+
+def schedule_fulfilment(pairs):
+    """
+    Stoğu artan çiftlere bağlı siparişleri, geçerli transaction commit
+    edildikten sonra aynı sahada karşılar (bkz. fulfil_triggered).
+    """
+    pairs = list(pairs)
+    site = get_current_site()
+
+    def run():
+        with site_context(site):
+            fulfil_triggered(get_dependent_aircraft(pairs))
+
+    on_site_commit(run)
@@ -0,0 +1,218 @@
+"""
+Mevcut stok üzerinden üretim kapasitesi planlaması.
+
+Gereksinim matrisi (uçak x parça tipi) katalog değiştiğinde bir kez
+oluşturulur ve süreç içinde saklanır; katalog sürümü paylaşımlı cache'te
+tutulur ve uçak, parça tipi, gereksinim veya ürün ağacı kayıtları değiştiğinde
+artırılır. Stok matrisi her istekte tek sorgu ile yüklenir.
+
+Stok uçak modeline özel olduğu için (PartStock (part_type, aircraft)
+bazındadır) uçak modelleri aynı parçalar için yarışmaz; tamsayı atama
+problemi her uçak için ayrışır ve en iyi çözüm
+min(hedef, min_p floor(stok[a, p] / gereksinim[a, p])) olur. Tüm hesaplar
+matrisler üzerinde vektörel yapılır.
+
+Gereksinimlerinden biri alt montaj olan uçaklarda stoktaki alt montajlar
+yetmezse bileşenlerinden üretilecekleri kabul edilir (bkz.
+bom.check_feasibility): bu uçakların kapasitesi aynı stok matrisi ile
+ürün ağacı üzerinden hesaplanır, eksikler bileşen parça tiplerine yazılır.
+
+numpy'nin yüklenmesi worker açılışını yavaşlattığı için bu modül sadece
+planlama uç noktasının ilk isteğinde içe aktarılır.
+"""
+import threading
+
+import numpy as np
+
+from .bom import get_bom, get_capacity, net_requirements
+from .catalog import get_catalog_version
+from .models import Aircraft, AircraftPartRequirement, PartStock, PartType, PartTypeComponent, Team
+
+# Gereksinimi olmayan uçaklar için kapasite sınırı yoktur
+UNLIMITED = np.iinfo(np.int64).max
+
+_lock = threading.Lock()
+_catalog = None
+
+
+class Catalog:
+    """Gereksinim matrisi ve satır/sütun id eşlemeleri."""
+
+    def __init__(self, version):
+        self.version = version
+        aircrafts = list(Aircraft.objects.filter(is_deleted=False).order_by('id').values_list('id', 'name'))
+        part_types = list(PartType.objects.filter(is_deleted=False).order_by('id').values_list('id', 'name'))
+        self.aircraft_ids = np.array([row[0] for row in aircrafts], dtype=np.int64)
+        self.part_type_ids = np.array([row[0] for row in part_types], dtype=np.int64)
+        self.aircraft_names = dict(aircrafts)
+        self.part_type_names = dict(part_types)
+        self.part_type_columns = {part_type_id: column for column, (part_type_id, _) in enumerate(part_types)}
+
+        self.requirements = np.zeros((len(aircrafts), len(part_types)), dtype=np.int64)
+        rows = np.array(
+            AircraftPartRequirement.objects.filter(
+                aircraft__is_deleted=False, part_type__is_deleted=False
+            ).values_list('aircraft_id', 'part_type_id', 'required_quantity'),
+            dtype=np.int64
+        ).reshape(-1, 3)
+        self.requirements[self.aircraft_index(rows[:, 0]), self.part_type_index(rows[:, 1])] = rows[:, 2]
+
+        # Gereksinimlerinden biri alt montaj olan uçaklar
+        assemblies = np.isin(self.part_type_ids, list(
+            PartTypeComponent.objects.filter(is_deleted=False).values_list('parent_id', flat=True).distinct()
+        ))
+        self.has_assemblies = (self.requirements[:, assemblies] > 0).any(axis=1)
+
+    def aircraft_index(self, ids):
+        return np.searchsorted(self.aircraft_ids, ids)
+
+    def part_type_index(self, ids):
+        return np.searchsorted(self.part_type_ids, ids)
+
+    def load_stock(self, aircraft_ids):
+        """
+        Geçerli sahanın, sıralı `aircraft_ids` uçakları için stok matrisini
+        tek sorgu ile yükler.
+        """
+        stock = np.zeros((len(aircraft_ids), len(self.part_type_ids)), dtype=np.int64)
+        rows = np.array(
+            PartStock.objects.filter(
+                is_deleted=False,
+                aircraft_id__in=aircraft_ids.tolist(),
+                part_type_id__in=self.part_type_ids.tolist(),
+            ).values_list('aircraft_id', 'part_type_id', 'stock_quantity'),
+            dtype=np.int64
+        ).reshape(-1, 3)
+        np.add.at(stock, (np.searchsorted(aircraft_ids, rows[:, 0]), self.part_type_index(rows[:, 1])), rows[:, 2])
+        return stock
+
+
+def get_catalog():
+    global _catalog
+    version = get_catalog_version()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _lock:
+            if _catalog is None or _catalog.version != version:
+                _catalog = Catalog(version)
+            catalog = _catalog
+    return catalog
+
+
+def split_evenly(total, count):
+    """`total` miktarını `count` takım arasında tamsayı olarak böler."""
+    base, remainder = divmod(int(total), count)
+    return [base + (1 if index < remainder else 0) for index in range(count)]
+
+
+def optimize(targets, site):
+    """
+    `targets`: {aircraft_id: hedef adet}. Her uçak için üretilebilecek
+    adedi, darboğaz parça tiplerini ve hedefe ulaşmak için takımların
+    üretmesi gereken parça sayılarını döner.
+    """
+    catalog = get_catalog()
+    unknown = sorted(set(targets) - set(catalog.aircraft_names))
+    if unknown:
+        raise ValueError(f"Geçersiz uçak id: {', '.join(map(str, unknown))}")
+
+    target_ids = np.array(sorted(targets), dtype=np.int64)
+    rows = catalog.aircraft_index(target_ids)
+    target = np.array([targets[aircraft_id] for aircraft_id in target_ids.tolist()], dtype=np.int64)
+    requirements = catalog.requirements[rows]
+    stock = catalog.load_stock(target_ids)
+
+    required = requirements > 0
+    ratio = np.where(required, stock // np.maximum(requirements, 1), UNLIMITED)
+    capacity = ratio.min(axis=1, initial=UNLIMITED)
+    build = np.minimum(target, capacity)
+    bottleneck = required & (ratio == capacity[:, None])
+    # Hedefe ulaşmak için eksik parçalar (uçak x parça tipi)
+    shortage = np.maximum(target[:, None] * requirements - stock, 0)
+    for index in np.flatnonzero(catalog.has_assemblies[rows]).tolist():
+        bom = get_bom(int(target_ids[index]))
+        net_assemblies(catalog, bom, index, stock, target, capacity, build, bottleneck, shortage)
+
+    plan = []
+    for index, aircraft_id in enumerate(target_ids.tolist()):
+        plan.append({
+            'aircraft': aircraft_id,
+            'aircraft_name': catalog.aircraft_names[aircraft_id],
+            'target': int(target[index]),
+            'buildable': None if capacity[index] == UNLIMITED else int(capacity[index]),
+            'build': int(build[index]),
+            'bottlenecks': catalog.part_type_ids[bottleneck[index]].tolist(),
+        })
+
+    return {
+        'catalog_version': catalog.version,
+        'plan': plan,
+        'team_targets': get_team_targets(catalog, target_ids, shortage, site),
+    }
+
+
+def net_assemblies(catalog, bom, index, stock, target, capacity, build, bottleneck, shortage):
+    """
+    Alt montaj içeren uçağın satırlarını ürün ağacı üzerinden yeniden
+    hesaplar: darboğazlar bir fazla uçak için eksik kalan, eksikler hedef
+    için eksik kalan (bileşen) parça tipleridir.
+    """
+    columns = catalog.part_type_columns
+    row_stock = {
+        part_type_id: int(stock[index, columns[part_type_id]])
+        for part_type_id in bom['totals'] if part_type_id in columns
+    }
+    buildable = get_capacity(bom, row_stock)
+    capacity[index] = UNLIMITED if buildable is None else buildable
+    build[index] = min(target[index], capacity[index])
+
+    bottleneck[index] = False
+    shortage[index] = 0
+    if buildable is None:
+        return
+    for part_type_id in net_requirements(bom, row_stock, buildable + 1)[2]:
+        if part_type_id in columns:
+            bottleneck[index, columns[part_type_id]] = True
+    for part_type_id, quantity in net_requirements(bom, row_stock, int(target[index]))[2].items():
+        if part_type_id in columns:
+            shortage[index, columns[part_type_id]] = quantity
+
+
+def get_team_targets(catalog, target_ids, shortage, site):
+    """Eksik parçaları, parça tipinden sorumlu sahadaki takımlara dağıtır."""
+    totals = shortage.sum(axis=0)
+    needed = np.flatnonzero(totals)
+    if not len(needed):
+        return []
+
+    teams = {}
+    for team_id, team_name, part_type_id in Team.objects.filter(
+        is_deleted=False, site=site, responsible_part_id__in=catalog.part_type_ids[needed].tolist()
+    ).order_by('id').values_list('id', 'name', 'responsible_part_id'):
+        teams.setdefault(part_type_id, []).append((team_id, team_name))
+
+    result = []
+    for column in needed.tolist():
+        part_type_id = int(catalog.part_type_ids[column])
+        responsible = teams.get(part_type_id, [(None, None)])
+        by_aircraft = [
+            (int(aircraft_id), int(quantity))
+            for aircraft_id, quantity in zip(target_ids.tolist(), shortage[:, column].tolist()) if quantity
+        ]
+        shares = {aircraft_id: split_evenly(quantity, len(responsible)) for aircraft_id, quantity in by_aircraft}
+        for index, (team_id, team_name) in enumerate(responsible):
+            team_aircraft = [
+                {'aircraft': aircraft_id, 'quantity': shares[aircraft_id][index]}
+                for aircraft_id, _ in by_aircraft if shares[aircraft_id][index]
+            ]
+            if not team_aircraft:
+                continue
+            result.append({
+                'team': team_id,
+                'team_name': team_name,
+                'part_type': part_type_id,
+                'part_type_name': catalog.part_type_names[part_type_id],
+                'quantity': sum(item['quantity'] for item in team_aircraft),
+                'by_aircraft': team_aircraft,
+            })
+    return result
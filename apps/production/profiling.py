@@ -0,0 +1,150 @@
+"""
+İstek bazlı profil çıkarma (profiling) araçları.
+
+İki çalışma biçimi vardır:
+- İsteğe bağlı: staff yetkili bir kullanıcı `X-Profile: 1` header'ı veya
+  `?_profile=1` parametresi gönderdiğinde yalnızca o istek profillenir.
+- Örnekleme: her N istekten biri profillenir ve süresi eşik değerini
+  aşarsa sonuç diske yazılır.
+
+Her profil için cProfile çıktısı (`.prof`, snakeviz/flameprof ile açılabilir)
+ve istekte çalışan SQL ifadelerinin süre ve kaynak satırlarını içeren bir
+`.sql.json` dosyası üretilir. PROFILING['ENABLED'] kapalıyken middleware
+zincirden tamamen çıkarılır, yani hiçbir ek maliyet oluşmaz.
+"""
+import cProfile
+import itertools
+import json
+import os
+import re
+import time
+import traceback
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = '_profile'
+
+
+class QueryCollector:
+    """
+    `connection.execute_wrapper` olarak kullanılır. Çalışan her SQL ifadesini,
+    süresini ve ifadeyi tetikleyen uygulama kod satırlarını kaydeder.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.source_root = os.path.join(str(settings.BASE_DIR), 'apps')
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+                'many': many,
+                'database': context['connection'].alias,
+                'stack': self._origin(),
+            })
+
+    def _origin(self):
+        # En içteki çağrı başta olacak şekilde uygulama kodundaki satırlar
+        origin = []
+        for frame in reversed(traceback.extract_stack()):
+            if frame.filename == __file__ or not frame.filename.startswith(self.source_root):
+                continue
+            path = os.path.relpath(frame.filename, settings.BASE_DIR)
+            origin.append(f"{path}:{frame.lineno} in {frame.name}")
+        return origin
+
+
+class ProfilingMiddleware:
+    """
+    İsteğe bağlı ve örneklemeli profil çıkarma middleware'i.
+    Ayarlar `settings.PROFILING` sözlüğünden okunur.
+    """
+
+    def __init__(self, get_response):
+        config = getattr(settings, 'PROFILING', {})
+        if not config.get('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.output_dir = config.get('OUTPUT_DIR') or os.path.join(settings.BASE_DIR, 'profiles')
+        self.sample_rate = int(config.get('SAMPLE_RATE') or 0)
+        self.slow_threshold_ms = float(config.get('SLOW_THRESHOLD_MS') or 0)
+        self._counter = itertools.count(1)
+
+    def __call__(self, request):
+        if self._is_requested(request):
+            if self._is_staff(request):
+                return self._profile(request, reason='on-demand', threshold_ms=0)
+        elif self.sample_rate and next(self._counter) % self.sample_rate == 0:
+            return self._profile(request, reason='sampled', threshold_ms=self.slow_threshold_ms)
+        return self.get_response(request)
+
+    def _is_requested(self, request):
+        flag = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_PARAM)
+        return flag in ('1', 'true', 'True')
+
+    def _is_staff(self, request):
+        """
+        Middleware DRF kimlik doğrulamasından önce çalıştığı için JWT token
+        burada ayrıca çözülür. Sadece profil istendiğinde çalışır.
+        """
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except APIException:
+            return False
+        return result is not None and result[0].is_staff
+
+    def _profile(self, request, reason, threshold_ms):
+        profiler = cProfile.Profile()
+        collector = QueryCollector()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(collector))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if duration_ms >= threshold_ms:
+            profile_id = self._dump(request, response, profiler, collector, reason, duration_ms)
+            response['X-Profile-Id'] = profile_id
+        return response
+
+    def _dump(self, request, response, profiler, collector, reason, duration_ms):
+        os.makedirs(self.output_dir, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method.lower()}-{slug}-{uuid.uuid4().hex[:8]}"
+        base_path = os.path.join(self.output_dir, profile_id)
+
+        profiler.dump_stats(f"{base_path}.prof")
+        with open(f"{base_path}.sql.json", 'w', encoding='utf-8') as fp:
+            json.dump({
+                'id': profile_id,
+                'reason': reason,
+                'method': request.method,
+                'path': request.path,
+                'query_string': request.META.get('QUERY_STRING', ''),
+                'status_code': response.status_code,
+                'duration_ms': round(duration_ms, 3),
+                'query_count': len(collector.queries),
+                'query_time_ms': round(sum(q['duration_ms'] for q in collector.queries), 3),
+                'queries': collector.queries,
+            }, fp, ensure_ascii=False, indent=2)
+        return profile_id
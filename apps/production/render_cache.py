@@ -0,0 +1,77 @@
+"""
+Üretilen uçakların JSON çıktısı için kalıcı önbellek.
+
+Üretilen uçak ve parça bağlantıları oluşturulduktan sonra değişmez
+(montajda kullanılan parçalar silinmiş sayılır ve parça uç noktalarından
+değiştirilemez); bu yüzden ProducedAircraftSerializer çıktısı kayıt başına
+JSON baytları olarak bir kez üretilip saklanır. Detay istekleri önbellekteyse veritabanına hiç
+gitmez, liste sayfaları önbellekteki parçaların birleştirilmesiyle oluşur.
+
+Anahtar saha ve katalog sürümünü içerir: saha veritabanlarında id'ler
+çakışabilir, uçak ve parça tipi adlarının değişmesi (katalog sürümü) tüm
+kayıtları geçersiz kılar. Kayıt soft delete veya güncelleme ile commit
+sonrası önbellekten silinir. Replikadan okunan kayıtlar, gecikmeli
+veriyle silinmiş bir kaydı geri yazmamak için önbelleğe alınmaz.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from .catalog import get_catalog_version
+from .sites import get_current_site, on_site_commit
+
+KEY_PREFIX = 'render:produced_aircraft'
+
+
+def get_config():
+    return {
+        'TIMEOUT': 7 * 86400,
+        **getattr(settings, 'RENDER_CACHE', {}),
+    }
+
+
+def get_keys(ids):
+    prefix = f"{KEY_PREFIX}:{get_current_site()}:{get_catalog_version()}"
+    return {pk: f"{prefix}:{pk}" for pk in ids}
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+def get_many(ids):
+    """{id: (sürüm, JSON baytları)} olarak önbellekteki kayıtlar."""
+    keys = get_keys(ids)
+    found = cache.get_many(keys.values())
+    return {pk: found[key] for pk, key in keys.items() if key in found}
+
+
+def render_entries(items):
+    """Serializer çıktılarını {id: (sürüm, JSON baytları)} olarak hazırlar."""
+    return {item['id']: (item['version'], render(item)) for item in items}
+
+
+def store(entries):
+    """{id: (sürüm, JSON baytları)} kayıtlarını saklar."""
+    if entries:
+        keys = get_keys(entries)
+        cache.set_many({keys[pk]: entry for pk, entry in entries.items()}, get_config()['TIMEOUT'])
+
+
+def store_on_commit(entries):
+    """Yeni oluşturulan kayıtları transaction commit edildikten sonra saklar."""
+    keys = get_keys(entries)
+    items = {keys[pk]: entry for pk, entry in entries.items()}
+    timeout = get_config()['TIMEOUT']
+    on_site_commit(lambda: cache.set_many(items, timeout))
+
+
+def invalidate(ids):
+    """Kayıtları geçerli transaction commit edildikten sonra önbellekten siler."""
+    keys = list(get_keys(set(ids)).values())
+    if keys:
+        on_site_commit(lambda: cache.delete_many(keys))
+
+
+def is_cacheable_read(queryset):
+    return queryset.db not in getattr(settings, 'REPLICA_DATABASES', [])
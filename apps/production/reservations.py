@@ -0,0 +1,174 @@
+"""
+Montaj için parça rezervasyonu.
+
+Montaj takımı planlanan bir uçağın parçalarını önceden ayırır; arama,
+gereksinim kontrolü ve kilitleme rezervasyon sırasında yapılır. Ayrılan
+parçalar stok sayacından düşülür, parça listelerinde ve diğer montajlarda
+(reserve_parts) görünmez. Rezervasyonun uçağa dönüştürülmesi parça
+sayısından bağımsız, sabit sayıda sorgu ile yapılır.
+
+Süresi dolan rezervasyonlar expire_reservations ile (status, expires_at)
+indeksi üzerinden partiler halinde bırakılır; parçalar stoğa geri döner ve
+bekleyen montaj siparişleri değerlendirilir. expire_reservations dışındaki
+fonksiyonlar sahanın transaction'ı içinde çağrılmalıdır.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .assembly import reserve_parts
+from .changes import record_changes, record_team_changes
+from .events import publish_on_commit
+from .models import AircraftPart, AircraftPartRequirement, Part, PartReservation, ProducedAircraft
+from .sites import site_atomic
+from .stock import apply_stock_deltas, count_stock_deltas
+
+
+class ReservationError(Exception):
+    def __init__(self, message, missing_parts=None):
+        super().__init__(message)
+        self.missing_parts = missing_parts
+
+
+def get_config():
+    return {
+        'TTL': timedelta(minutes=30),
+        'SWEEP_BATCH_SIZE': 500,
+        **getattr(settings, 'PART_RESERVATIONS', {}),
+    }
+
+
+def create_reservation(aircraft, user, part_ids=None):
+    """
+    Uçağın gereksinimlerini karşılayan parçaları ayırır. `part_ids` verilirse
+    tam olarak bu parçalar ayrılır ve gereksinimlerle birebir eşleşmeleri
+    gerekir; verilmezse stoktaki ilk uygun parçalar seçilir.
+    """
+    requirements = list(
+        AircraftPartRequirement.objects.filter(aircraft=aircraft).select_related('part_type')
+    )
+    quantities = {requirement.part_type_id: requirement.required_quantity for requirement in requirements}
+    if not quantities:
+        raise ReservationError('Uçak için parça gereksinimi tanımlı değil')
+
+    if part_ids is None:
+        reserved, missing_parts = reserve_parts(
+            aircraft, {requirement.part_type_id: requirement.part_type for requirement in requirements}, quantities
+        )
+        if missing_parts:
+            raise ReservationError('Stokta yeterli parça bulunmuyor', missing_parts)
+        parts = [part for part_list in reserved.values() for part in part_list]
+    else:
+        part_ids = set(part_ids)
+        parts = list(
+            Part.objects.filter(
+                id__in=part_ids, aircraft=aircraft, status='stock', is_deleted=False, reservation__isnull=True
+            ).order_by('id').select_for_update()
+        )
+        if len(parts) != len(part_ids):
+            unavailable = sorted(part_ids - {part.id for part in parts})
+            raise ReservationError(f"Parçalar stokta değil veya başka bir montaja ayrılmış: {unavailable}")
+        if Counter(part.part_type_id for part in parts) != Counter(quantities):
+            raise ReservationError('Parçalar uçağın parça gereksinimleriyle eşleşmiyor')
+
+    reservation = PartReservation.objects.create(
+        aircraft=aircraft,
+        reserved_by=user,
+        expires_at=timezone.now() + get_config()['TTL']
+    )
+    # Parçalar yukarıda kilitlendiği için tek UPDATE ile ayrılır
+    Part.objects.filter(id__in=[part.id for part in parts]).update(
+        reservation=reservation, version=F('version') + 1
+    )
+    apply_stock_deltas(count_stock_deltas(
+        [{'part_type_id': part.part_type_id, 'aircraft_id': part.aircraft_id} for part in parts], -1
+    ))
+    # Parçalar kapsamdan çıktığı için istemciler silinmiş olarak görür
+    record_team_changes('part', [(part.id, part.team_id) for part in parts], deleted=True)
+    publish_on_commit('part_reservation.created', {
+        'id': reservation.id,
+        'aircraft': aircraft.id,
+        'parts': [part.id for part in parts],
+    })
+    return reservation
+
+
+def convert_reservation(reservation):
+    """
+    Kilitlenmiş aktif rezervasyonu üretilen uçağa dönüştürür. Parçalar
+    rezervasyonda kontrol edildiği için tekrar aranmaz; sorgu sayısı parça
+    sayısından bağımsızdır.
+    """
+    now = timezone.now()
+    if reservation.status != 'active':
+        raise ReservationError('Rezervasyon aktif değil')
+    if reservation.expires_at <= now:
+        raise ReservationError('Rezervasyonun süresi dolmuş')
+
+    parts = list(Part.objects.filter(reservation=reservation).values_list('id', 'team_id'))
+    produced_aircraft = ProducedAircraft.objects.create(aircraft_id=reservation.aircraft_id)
+    Part.objects.filter(reservation=reservation).update(
+        status='used', is_deleted=True, deleted_at=now, version=F('version') + 1
+    )
+    AircraftPart.objects.bulk_create([
+        AircraftPart(produced_aircraft=produced_aircraft, part_id=part_id)
+        for part_id, _ in parts
+    ])
+    reservation.status = 'converted'
+    reservation.produced_aircraft = produced_aircraft
+    reservation.save(update_fields=['status', 'produced_aircraft'])
+
+    record_changes('produced_aircraft', [produced_aircraft.id])
+    publish_on_commit('produced_aircraft.created', {
+        'id': produced_aircraft.id,
+        'aircraft': reservation.aircraft_id,
+    })
+    consumed_by_team = {}
+    for part_id, team_id in parts:
+        consumed_by_team.setdefault(team_id, []).append(part_id)
+    for team_id, part_ids in consumed_by_team.items():
+        publish_on_commit('part.consumed', {'ids': part_ids}, team_id=team_id)
+    return produced_aircraft
+
+
+def release_reservations(reservations, new_status):
+    """
+    Kilitlenmiş rezervasyonların parçalarını stoğa geri verir ve
+    rezervasyonları `new_status` durumuna alır.
+    """
+    reservation_ids = [reservation.id for reservation in reservations]
+    parts = list(
+        Part.objects.filter(reservation_id__in=reservation_ids)
+        .values('id', 'team_id', 'part_type_id', 'aircraft_id')
+    )
+    Part.objects.filter(reservation_id__in=reservation_ids).update(reservation=None, version=F('version') + 1)
+    PartReservation.objects.filter(id__in=reservation_ids).update(status=new_status)
+    # Stok artışı bekleyen montaj siparişlerini de tetikler
+    apply_stock_deltas(count_stock_deltas(parts, 1))
+    record_team_changes('part', [(part['id'], part['team_id']) for part in parts])
+
+
+def expire_reservations(now=None, batch_size=None):
+    """
+    Süresi dolan aktif rezervasyonları partiler halinde bırakır ve bırakılan
+    rezervasyon sayısını döner. Başka bir işlemin kilitlediği rezervasyonlar
+    (ör. o anda dönüştürülen) atlanır.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or get_config()['SWEEP_BATCH_SIZE']
+    total = 0
+    while True:
+        with site_atomic():
+            expired = list(
+                PartReservation.objects.filter(status='active', expires_at__lte=now)
+                .order_by('expires_at')
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            if expired:
+                release_reservations(expired, 'expired')
+        total += len(expired)
+        if len(expired) < batch_size:
+            return total
@@ -0,0 +1,158 @@
+"""
+Önceden üretilmiş OpenAPI şeması.
+
+drf_yasg şemayı her istekte tüm ViewSet ve serializer'ları inceleyerek
+üretir. Burada şema kod sürümü başına bir kez üretilir (`generate_schema`
+komutu ile ya da ilk istekte), OPENAPI['OUTPUT_DIR'] altına dosya olarak
+yazılır ve sonraki istekler bu dosyadan ETag ile sunulur.
+
+Sürüm APP_VERSION ortam değişkeninden, tanımlı değilse proje kaynak
+dosyalarının özetinden alınır; kod değişmedikçe şema yeniden üretilmez.
+
+drf_yasg'ın şema üretici, codec ve arayüz modülleri (jsonschema dahil)
+worker açılışını belirgin şekilde yavaşlattığı için ilk kullanımda
+içe aktarılır.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+import drf_yasg
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_safe
+from drf_yasg import openapi
+from rest_framework import permissions
+
+API_INFO = openapi.Info(
+    title="Aircraft Production API",
+    default_version='v1',
+    description="API documentation",
+    license=openapi.License(name="BSD License"),
+)
+
+# Biçim: (drf_yasg.codecs içindeki codec sınıfı, içerik tipi)
+FORMATS = {
+    '.json': ('OpenAPICodecJson', 'application/json'),
+    '.yaml': ('OpenAPICodecYaml', 'application/yaml'),
+}
+SOURCE_DIRS = ('apps', 'config')
+
+_lock = threading.Lock()
+_version = None
+_artifacts = {}
+
+
+def get_schema_version():
+    """Şema sürümü: APP_VERSION veya kaynak dosyaların ve drf_yasg sürümünün özeti."""
+    global _version
+    if _version is None:
+        version = getattr(settings, 'APP_VERSION', None)
+        if not version:
+            digest = hashlib.sha256(drf_yasg.__version__.encode())
+            for directory in SOURCE_DIRS:
+                for root, dirs, files in os.walk(settings.BASE_DIR / directory):
+                    dirs.sort()
+                    for name in sorted(files):
+                        if name.endswith('.py'):
+                            path = os.path.join(root, name)
+                            digest.update(os.path.relpath(path, settings.BASE_DIR).encode())
+                            with open(path, 'rb') as fp:
+                                digest.update(fp.read())
+            version = digest.hexdigest()[:16]
+        _version = version
+    return _version
+
+
+def get_artifact_path(version, fmt):
+    return os.path.join(settings.OPENAPI['OUTPUT_DIR'], f"schema-{version}{fmt}")
+
+
+def generate_schema(version=None):
+    """
+    Şemayı üretir, tüm formatlarda dosyaya yazar ve eski sürümlerin
+    dosyalarını siler. Yazılan dosyaların yollarını döner.
+    """
+    from drf_yasg import codecs
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    version = version or get_schema_version()
+    output_dir = settings.OPENAPI['OUTPUT_DIR']
+    os.makedirs(output_dir, exist_ok=True)
+
+    schema = OpenAPISchemaGenerator(API_INFO).get_schema(request=None, public=True)
+    paths = []
+    for fmt, (codec_name, _) in FORMATS.items():
+        codec_class = getattr(codecs, codec_name)
+        path = get_artifact_path(version, fmt)
+        # Diğer süreçler yarım yazılmış dosya görmesin diye önce geçici dosyaya yazılır
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(codec_class(validators=[]).encode(schema))
+        os.replace(tmp_path, path)
+        paths.append(path)
+
+    current = {os.path.basename(path) for path in paths}
+    for name in os.listdir(output_dir):
+        if name.startswith('schema-') and name not in current:
+            os.remove(os.path.join(output_dir, name))
+    _artifacts.clear()
+    return paths
+
+
+def get_artifact(fmt):
+    """(içerik, etag) döner. Dosya yoksa şema bu istekte üretilir."""
+    artifact = _artifacts.get(fmt)
+    if artifact is None:
+        with _lock:
+            artifact = _artifacts.get(fmt)
+            if artifact is None:
+                path = get_artifact_path(get_schema_version(), fmt)
+                if not os.path.exists(path):
+                    generate_schema()
+                with open(path, 'rb') as fp:
+                    content = fp.read()
+                artifact = (content, f'"{hashlib.sha256(content).hexdigest()[:32]}"')
+                _artifacts[fmt] = artifact
+    return artifact
+
+
+def get_etag(request, format):
+    if format not in FORMATS:
+        return None
+    return get_artifact(format)[1]
+
+
+@require_safe
+@condition(etag_func=get_etag)
+def schema_file_view(request, format):
+    """GET /swagger.json, /swagger.yaml - önceden üretilmiş şemayı döner."""
+    if format not in FORMATS:
+        raise Http404
+    content, etag = get_artifact(format)
+    response = HttpResponse(content, content_type=FORMATS[format][1])
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def schema_ui_view(renderer):
+    """
+    Swagger UI / ReDoc görünümü. drf_yasg görünümü ilk istekte oluşturulur;
+    arayüzler şemayı schema_file_view üzerinden yükler.
+    """
+    view = None
+
+    def lazy_view(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from drf_yasg.views import get_schema_view
+            view = get_schema_view(
+                API_INFO,
+                public=True,
+                permission_classes=[permissions.AllowAny],
+            ).with_ui(renderer, cache_timeout=0)
+        return view(request, *args, **kwargs)
+
+    return lazy_view
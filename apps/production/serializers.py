@@ -2,28 +2,32 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import (
     Aircraft, Part, Team, Personnel, ProducedAircraft, PartStock,
-    PartType, AircraftPartRequirement, AircraftPart
+    PartType, AircraftPartRequirement, AircraftPart, PartTypeComponent, AuditEntry, AssemblyOrder,
+    PartReservation
 )
 from django.db import models, transaction 
 
+from .fieldsets import DynamicFieldsMixin
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email')
 
-class PartTypeSerializer(serializers.ModelSerializer):
+class PartTypeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = PartType
         fields = ('id', 'name', 'is_deleted')
 
-class PartStockSerializer(serializers.ModelSerializer):
+class PartStockSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     part_type = PartTypeSerializer()
     aircraft_name = serializers.CharField(source='aircraft.name', read_only=True)
     class Meta:
         model = PartStock
-        fields = ['part_type', 'stock_quantity','aircraft_name']
+        fields = ['id', 'part_type', 'stock_quantity','aircraft_name', 'version']
+        read_only_fields = ['version']
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     responsible_part = PartTypeSerializer(read_only=True)
     responsible_part_id = serializers.PrimaryKeyRelatedField(
         queryset=PartType.objects.all(),
@@ -33,14 +37,14 @@ class TeamSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Team
-        fields = ('id', 'name', 'responsible_part', 'responsible_part_id', 'is_deleted')
+        fields = ('id', 'name', 'responsible_part', 'responsible_part_id', 'site', 'is_deleted')
 
-class AircraftSerializer(serializers.ModelSerializer):
+class AircraftSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Aircraft
         fields = ('id', 'name', 'is_deleted')
 
-class AircraftPartRequirementSerializer(serializers.ModelSerializer):
+class AircraftPartRequirementSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     part_type_name = serializers.CharField(source='part_type.name', read_only=True)
     aircraft_name = serializers.CharField(source='aircraft.name', read_only=True)
 
@@ -55,7 +59,39 @@ class AircraftPartRequirementSerializer(serializers.ModelSerializer):
             )
         ]
 
-class PartSerializer(serializers.ModelSerializer):
+class PartTypeComponentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    parent_name = serializers.CharField(source='parent.name', read_only=True)
+    component_name = serializers.CharField(source='component.name', read_only=True)
+
+    class Meta:
+        model = PartTypeComponent
+        fields = ('id', 'parent', 'parent_name', 'component',
+                 'component_name', 'quantity')
+        validators = [
+            serializers.UniqueTogetherValidator(
+                queryset=PartTypeComponent.objects.all(),
+                fields=['parent', 'component']
+            )
+        ]
+
+    def validate_quantity(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Adet en az 1 olmalıdır")
+        return value
+
+    def validate(self, data):
+        from .bom import get_descendants
+
+        parent = data.get('parent', getattr(self.instance, 'parent', None))
+        component = data.get('component', getattr(self.instance, 'component', None))
+        # Bileşenin alt ağacında montajın kendisi varsa ağaç döngüye girer
+        if parent.id in get_descendants(component.id):
+            raise serializers.ValidationError({
+                'component': f"{component.name} zaten {parent.name} montajını içeriyor"
+            })
+        return data
+
+class PartSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     part_type_name = serializers.CharField(source='part_type.name', read_only=True)
     aircraft_name = serializers.CharField(source='aircraft.name', read_only=True)
     team_name = serializers.CharField(source='team.name', read_only=True)
@@ -65,24 +101,25 @@ class PartSerializer(serializers.ModelSerializer):
         model = Part
         fields = ('id', 'part_type', 'part_type_name', 'aircraft', 
                  'aircraft_name', 'team', 'team_name', 'status', 
-                 'status_display',  'is_deleted')
-        read_only_fields = ('team',)  # team alanını read-only yap
+                 'status_display',  'is_deleted', 'version')
+        read_only_fields = ('team', 'version')  # team alanını read-only yap
 
     def validate(self, data):
-        # Team bilgisi context'ten al
-        team = self.context.get('team')
+        # Team bilgisi context'ten, güncellemede kaydın kendisinden al
+        team = self.context.get('team') or getattr(self.instance, 'team', None)
         if not team:
             raise serializers.ValidationError("Takım bilgisi bulunamadı")
 
         # Üretim takımının sorumlu olduğu parça tipini kontrol et
-        if team.responsible_part != data['part_type']:
+        part_type = data.get('part_type', getattr(self.instance, 'part_type', None))
+        if team.responsible_part != part_type:
             raise serializers.ValidationError(
-                f"{team.name} takımı {data['part_type'].name} üretemez."
+                f"{team.name} takımı {part_type.name} üretemez."
             )
         return data
 
 
-class PersonnelSerializer(serializers.ModelSerializer):
+class PersonnelSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     team_name = serializers.CharField(source='team.name', read_only=True)
 
@@ -137,27 +174,66 @@ class PersonnelRegisterSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(f"Kullanıcı oluşturma hatası: {str(e)}")
 
 
-class AircraftPartSerializer(serializers.ModelSerializer):
-    part_type_name = serializers.CharField(source='part.part_type.name', read_only=True)
-    status = serializers.CharField(source='part.status', read_only=True)
+class AircraftPartSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    part_type_name = serializers.CharField(source='source_part.part_type.name', read_only=True)
+    status = serializers.CharField(source='source_part.status', read_only=True)
 
     class Meta:
         model = AircraftPart
         fields = ('id', 'produced_aircraft', 'part', 'part_type_name', 'status')
+        extra_kwargs = {'part': {'required': True, 'allow_null': False}}
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Arşive taşınmış parçalar orijinal id'leri ile gösterilir
+        if instance.part_id is None:
+            data['part'] = instance.archived_part_id
+        return data
 
     def validate(self, data):
         if data['part'].status != 'stock':
             raise serializers.ValidationError("Bu parça zaten kullanılmış.")
         return data
 
-class ProducedAircraftSerializer(serializers.ModelSerializer):
+class ProducedAircraftSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     aircraft_name = serializers.CharField(source='aircraft.name', read_only=True)
     parts = AircraftPartSerializer(many=True, read_only=True, source='aircraftpart_set')
 
     class Meta:
         model = ProducedAircraft
-        fields = ('id', 'aircraft', 'aircraft_name', 'parts', 'date', 'is_deleted')
-        read_only_fields = ('date',)
+        fields = ('id', 'aircraft', 'aircraft_name', 'parts', 'date', 'is_deleted', 'version')
+        read_only_fields = ('date', 'version')
+        # ?fields= veya ?expand= kullanıldığında sadece expand=parts ile döner
+        expandable_fields = ('parts',)
+
+class AssemblyOrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    aircraft_name = serializers.CharField(source='aircraft.name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = AssemblyOrder
+        fields = (
+            'id', 'aircraft', 'aircraft_name', 'priority', 'status', 'status_display',
+            'requested_by', 'produced_aircraft', 'created_at', 'fulfilled_at'
+        )
+        read_only_fields = ('status', 'requested_by', 'produced_aircraft', 'created_at', 'fulfilled_at')
+
+class PartReservationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    aircraft_name = serializers.CharField(source='aircraft.name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    parts = serializers.ListField(
+        child=serializers.IntegerField(), required=False, write_only=True,
+        help_text='Ayrılacak parça id\'leri; verilmezse stoktan otomatik seçilir'
+    )
+    reserved_parts = serializers.PrimaryKeyRelatedField(source='parts', many=True, read_only=True)
+
+    class Meta:
+        model = PartReservation
+        fields = (
+            'id', 'aircraft', 'aircraft_name', 'status', 'status_display', 'parts', 'reserved_parts',
+            'reserved_by', 'produced_aircraft', 'created_at', 'expires_at'
+        )
+        read_only_fields = ('status', 'reserved_by', 'produced_aircraft', 'created_at', 'expires_at')
 
 class LoginSerializer(serializers.Serializer):
     username = serializers.CharField()
@@ -168,14 +244,25 @@ class LoginResponseSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username')
     team_name = serializers.CharField(source='team.name')
     token = serializers.CharField(read_only=True)
+    refresh = serializers.CharField(read_only=True)
 
     class Meta:
         model = Personnel
-        fields = ('username', 'email', 'team_name', 'token')
+        fields = ('username', 'email', 'team_name', 'token', 'refresh')
+
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+    token = serializers.CharField(read_only=True)
 
 class TeamMateSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     team_name = serializers.CharField(source='team.name', read_only=True)
     class Meta:
         model = Personnel
-        fields = ('id', 'username', 'team_name')
\ No newline at end of file
+        fields = ('id', 'username', 'team_name')
+
+class AuditEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuditEntry
+        fields = ('id', 'created_at', 'action', 'part_id', 'produced_aircraft_id',
+                 'user_id', 'team_id', 'site', 'data')
@@ -0,0 +1,169 @@
+"""
+Üretim sahalarına göre veri bölümleme (sharding).
+
+Her sahanın işlem verisi (parça, stok, üretilen uçak, uçak-parça
+bağlantıları, montaj siparişleri, parça rezervasyonları, arşiv ve
+değişiklik günlüğü) settings.SITE_DATABASES ile eşlenen kendi
+veritabanında tutulur. Bir veritabanı tek bir sahaya aittir.
+Uçak, parça tipi, gereksinim, ürün ağacı ve takım kayıtları referans veridir: birincil
+(default) veritabanına yazılır ve tüm saha veritabanlarına kopyalanır;
+böylece saha veritabanındaki yabancı anahtarlar yerel olarak çözülür.
+
+İsteğin sahası JWT içindeki `site` claim'inden, yoksa kullanıcının
+takımından belirlenir. Parça üretimi ve montaj sadece kendi sahasının
+veritabanında, tek bir transaction içinde çalışır.
+"""
+import contextlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+SITE_MODELS = {
+    'part', 'partstock', 'producedaircraft', 'aircraftpart', 'archivedpart', 'changelog',
+    'assemblyorder', 'partreservation',
+}
+REFERENCE_MODELS = ('Aircraft', 'PartType', 'Team', 'AircraftPartRequirement', 'PartTypeComponent')
+
+_current_site = contextvars.ContextVar('current_site', default=None)
+
+
+def get_current_site():
+    return _current_site.get() or settings.DEFAULT_SITE
+
+
+def get_site_database(site=None):
+    return settings.SITE_DATABASES.get(site or get_current_site(), DEFAULT_DB_ALIAS)
+
+
+def get_shard_databases():
+    """Birincil veritabanı dışındaki saha veritabanları."""
+    return sorted(set(settings.SITE_DATABASES.values()) - {DEFAULT_DB_ALIAS})
+
+
+@contextlib.contextmanager
+def site_context(site):
+    token = _current_site.set(site)
+    try:
+        yield
+    finally:
+        _current_site.reset(token)
+
+
+def site_atomic():
+    """Geçerli sahanın veritabanında transaction açar."""
+    return transaction.atomic(using=get_site_database())
+
+
+def on_site_commit(func):
+    """`func`'ı geçerli sahanın transaction'ı commit edildikten sonra çalıştırır."""
+    transaction.on_commit(func, using=get_site_database())
+
+
+def resolve_site(request):
+    """
+    İsteğin sahası: JWT `site` claim'i, yoksa kullanıcının takımının sahası.
+    Tanımsız sahalar için varsayılan saha kullanılır.
+    """
+    site = None
+    token = getattr(request, 'auth', None)
+    if token is not None and hasattr(token, 'get'):
+        site = token.get('site')
+    if site is None and request.user and request.user.is_authenticated:
+        Personnel = apps.get_model('production', 'Personnel')
+        site = Personnel.objects.filter(user=request.user).values_list('team__site', flat=True).first()
+    return site if site in settings.SITE_DATABASES else settings.DEFAULT_SITE
+
+
+class SiteMixin:
+    """İsteği, kimlik doğrulamasından sonra kullanıcının sahasına bağlar."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        request.site = resolve_site(request)
+        self._site_token = _current_site.set(request.site)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_site_token', None)
+        if token is not None:
+            _current_site.reset(token)
+            self._site_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def replicate_reference_data(model_names=REFERENCE_MODELS):
+    """
+    Referans tabloları birincil veritabanından tüm saha veritabanlarına
+    kopyalar. Var olan kayıtlar güncellenir.
+    """
+    shards = get_shard_databases()
+    copied = {}
+    for name in model_names:
+        model = apps.get_model('production', name)
+        fields = model._meta.concrete_fields
+        rows = list(model.objects.using(DEFAULT_DB_ALIAS).values(*[field.attname for field in fields]))
+        for alias in shards:
+            model.objects.using(alias).bulk_create(
+                [model(**row) for row in rows],
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=[field.name for field in fields if not field.primary_key],
+            )
+        copied[name] = len(rows)
+    return copied
+
+
+def replicate_instance(sender, instance, created=False, raw=False, **kwargs):
+    """Referans kaydındaki değişikliği commit sonrası saha veritabanlarına yansıtır."""
+    if raw or sender.__name__ not in REFERENCE_MODELS:
+        return
+    shards = get_shard_databases()
+    if not shards:
+        return
+
+    fields = sender._meta.concrete_fields
+    values = {field.attname: getattr(instance, field.attname) for field in fields}
+
+    def replicate():
+        for alias in shards:
+            # bulk_create nesnenin veritabanı bilgisini değiştirdiği için kopyası yazılır
+            sender.objects.using(alias).bulk_create(
+                [sender(**values)],
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=[field.name for field in fields if not field.primary_key],
+            )
+
+    transaction.on_commit(replicate, using=instance._state.db or DEFAULT_DB_ALIAS)
+
+
+def remove_instance(sender, instance, **kwargs):
+    if sender.__name__ not in REFERENCE_MODELS:
+        return
+    for alias in get_shard_databases():
+        sender.objects.using(alias).filter(pk=instance.pk).delete()
+
+
+def scatter_gather(func, sites=None):
+    """
+    `func(site)` fonksiyonunu her saha için, kendi saha bağlamında paralel
+    çalıştırır ve {saha: sonuç} döner. Her iş parçacığı kendi veritabanı
+    bağlantısını açar ve iş bitince kapatır.
+    """
+    sites = sites or list(settings.SITE_DATABASES)
+
+    def run(site):
+        with site_context(site):
+            try:
+                return func(site)
+            finally:
+                connections.close_all()
+
+    if len(sites) == 1:
+        with site_context(sites[0]):
+            return {sites[0]: func(sites[0])}
+    with ThreadPoolExecutor(max_workers=len(sites)) as executor:
+        return dict(zip(sites, executor.map(run, sites)))
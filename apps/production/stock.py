@@ -0,0 +1,57 @@
+"""
+PartStock sayaçları üzerinde toplu işlemler.
+"""
+from collections import Counter
+
+from django.db import models
+from django.db.models import Case, F, Q, When
+from django.db.models.functions import Greatest
+
+from .changes import record_changes
+from .events import publish_stock_deltas
+from .models import PartStock
+
+
+def count_stock_deltas(parts, sign):
+    """
+    `part_type_id` ve `aircraft_id` anahtarlarını içeren parça kayıtlarını
+    (part_type_id, aircraft_id) bazında sayar ve `sign` ile çarpar.
+    """
+    deltas = Counter()
+    for part in parts:
+        deltas[(part['part_type_id'], part['aircraft_id'])] += sign
+    return deltas
+
+
+def apply_stock_deltas(deltas):
+    """
+    {(part_type_id, aircraft_id): değişim} sözlüğündeki tüm değişiklikleri
+    tek bir UPDATE ifadesi ile PartStock sayaçlarına uygular.
+    Sayaçlar sıfırın altına düşürülmez. Değişiklikler commit sonrası
+    olay akışına yayınlanır ve değişiklik günlüğüne yazılır; artan
+    sayaçlara bağlı bekleyen montaj siparişleri commit sonrası karşılanır.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+    publish_stock_deltas(deltas)
+
+    condition = Q()
+    whens = []
+    for (part_type_id, aircraft_id), delta in deltas.items():
+        match = Q(part_type_id=part_type_id, aircraft_id=aircraft_id)
+        condition |= match
+        whens.append(When(match, then=Greatest(F('stock_quantity') + delta, 0)))
+
+    record_changes('stock', PartStock.objects.filter(condition).values_list('id', flat=True))
+    updated = PartStock.objects.filter(condition).update(
+        stock_quantity=Case(*whens, default=F('stock_quantity'), output_field=models.IntegerField()),
+        version=F('version') + 1
+    )
+
+    increased = [key for key, delta in deltas.items() if delta > 0]
+    if increased:
+        # orders -> assembly -> stock döngüsel içe aktarımını önlemek için
+        from .orders import schedule_fulfilment
+        schedule_fulfilment(increased)
+    return updated
@@ -1,5 +1,45 @@
-from django.test import TestCase
-from .models import Aircraft
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import LiveServerTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .models import (
+    Aircraft, AircraftPart, AircraftPartRequirement, ArchivedPart, AssemblyOrder, AuditEntry, IdempotencyKey, Part,
+    PartReservation, PartStock, PartType, PartTypeComponent, Personnel, ProducedAircraft, Team
+)
+from . import audit, coalescing, render_cache, schema, throttling, tokens
+from .management.commands.soak import check_invariants
+from .concurrency import VersionConflict
+from .db_routers import PrimaryReplicaRouter, get_pin_key, replica_reads
+from .events import EventHub, EventScope, hub
+from .hashing import HashingBusy
+from .profiling import ProfilingMiddleware
+from .views import AssemblyOrderViewSet, PartReservationViewSet
+
 
 class AircraftModelTest(TestCase):
     def setUp(self):
@@ -7,3 +47,1438 @@ class AircraftModelTest(TestCase):
 
     def test_aircraft_str(self):
         self.assertEqual(str(self.aircraft), 'TB2')
+
+
+class ProductionTestMixin:
+    """
+    Kanat takımı, montaj takımı ve TB2 için 2 kanat gereksinimi içeren
+    ortak test verisi.
+    """
+
+    def setUp(self):
+        # Denetim kayıtları testlerde arka plan thread'i olmadan, açıkça boşaltılır
+        audit_settings = override_settings(AUDIT={**settings.AUDIT, 'FLUSH_INTERVAL': None, 'SPOOL_DIR': None})
+        audit_settings.enable()
+        self.addCleanup(audit_settings.disable)
+        self.addCleanup(audit.buffer.flush)
+        self.wing = PartType.objects.create(name='Kanat')
+        self.aircraft = Aircraft.objects.create(name='TB2')
+        self.wing_team = Team.objects.create(name='Kanat Takımı', responsible_part=self.wing)
+        self.assembly_team = Team.objects.create(name='Montaj Takımı')
+        AircraftPartRequirement.objects.create(aircraft=self.aircraft, part_type=self.wing, required_quantity=2)
+        self.wing_user = self.create_personnel('kanatci', self.wing_team)
+        self.assembly_user = self.create_personnel('montajci', self.assembly_team)
+
+    def create_personnel(self, username, team):
+        user = User.objects.create_user(username, password='x')
+        Personnel.objects.create(user=user, team=team)
+        return user
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def produce_parts(self, count, user=None):
+        response = self.client_for(user or self.wing_user).post('/api/parts/', {
+            'part_type': self.wing.id, 'aircraft': self.aircraft.id, 'stock': count
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return [part['id'] for part in response.data['parts']]
+
+    def produce_aircraft(self):
+        return self.client_for(self.assembly_user).post(
+            '/api/produced-aircrafts/', {'aircraft': self.aircraft.id}, format='json'
+        )
+
+    def stock_quantity(self):
+        return PartStock.objects.get(part_type=self.wing, aircraft=self.aircraft).stock_quantity
+
+
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.user = User.objects.create_user('user', password='x')
+        self.staff_token = str(AccessToken.for_user(self.staff))
+        self.user_token = str(AccessToken.for_user(self.user))
+        Aircraft.objects.create(name='TB2')
+
+    def _settings(self, **extra):
+        config = {'ENABLED': True, 'OUTPUT_DIR': self.output_dir, 'SAMPLE_RATE': 0, 'SLOW_THRESHOLD_MS': 0}
+        config.update(extra)
+        return override_settings(PROFILING=config)
+
+    def test_disabled_middleware_is_not_loaded(self):
+        with override_settings(PROFILING={'ENABLED': False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(lambda request: None)
+
+    def test_staff_request_is_profiled_with_sql_origins(self):
+        with self._settings():
+            response = self.client.get(
+                '/api/parts/',
+                HTTP_AUTHORIZATION=f'Bearer {self.staff_token}',
+                HTTP_X_PROFILE='1',
+            )
+        self.assertEqual(response.status_code, 200)
+        profile_id = response['X-Profile-Id']
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, f'{profile_id}.prof')))
+        with open(os.path.join(self.output_dir, f'{profile_id}.sql.json')) as fp:
+            report = json.load(fp)
+        self.assertGreater(report['query_count'], 0)
+        self.assertTrue(any(
+            'apps/production/views.py' in line
+            for query in report['queries'] for line in query['stack']
+        ))
+
+    def test_non_staff_request_is_not_profiled(self):
+        with self._settings():
+            response = self.client.get(
+                '/api/aircrafts/?_profile=1',
+                HTTP_AUTHORIZATION=f'Bearer {self.user_token}',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_sampled_request_below_threshold_is_discarded(self):
+        with self._settings(SAMPLE_RATE=1, SLOW_THRESHOLD_MS=60000):
+            response = self.client.get('/api/aircrafts/', HTTP_AUTHORIZATION=f'Bearer {self.user_token}')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+
+class ArchivePartsCommandTest(ProductionTestMixin, TestCase):
+    def test_consumed_parts_are_archived_and_still_resolved(self):
+        part_ids = self.produce_parts(3)
+        response = self.produce_aircraft()
+        self.assertEqual(response.status_code, 201)
+        produced_id = response.data['id']
+
+        call_command('archive_parts', older_than_days=0, batch_size=1, stdout=StringIO())
+
+        self.assertEqual(ArchivedPart.objects.count(), 2)
+        self.assertEqual(list(Part.objects.values_list('id', flat=True)), [part_ids[2]])
+        self.assertFalse(AircraftPart.objects.filter(part__isnull=False).exists())
+
+        response = self.client_for(self.assembly_user).get(f'/api/produced-aircrafts/{produced_id}/')
+        self.assertEqual(sorted(p['part'] for p in response.data['parts']), part_ids[:2])
+        self.assertEqual({p['part_type_name'] for p in response.data['parts']}, {'Kanat'})
+
+    def test_recently_deleted_parts_are_kept(self):
+        part_id = self.produce_parts(1)[0]
+        Part.objects.filter(id=part_id).update(is_deleted=True, deleted_at=timezone.now())
+
+        call_command('archive_parts', older_than_days=1, stdout=StringIO())
+        self.assertTrue(Part.objects.filter(id=part_id).exists())
+
+        Part.objects.filter(id=part_id).update(deleted_at=timezone.now() - timedelta(days=2))
+        call_command('archive_parts', older_than_days=1, stdout=StringIO())
+        self.assertFalse(Part.objects.filter(id=part_id).exists())
+        self.assertTrue(ArchivedPart.objects.filter(id=part_id).exists())
+
+
+class BulkPartOperationsTest(ProductionTestMixin, TestCase):
+    def test_bulk_status_updates_parts_and_stock(self):
+        part_ids = self.produce_parts(3)
+        other_team_part = Part.objects.create(
+            part_type=self.wing, aircraft=self.aircraft, team=self.assembly_team
+        )
+        response = self.client_for(self.wing_user).post('/api/parts/bulk_status/', {
+            'status': 'used', 'ids': part_ids[:2] + [other_team_part.id]
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], part_ids[:2])
+        self.assertEqual(response.data['not_found'], [other_team_part.id])
+        self.assertEqual(self.stock_quantity(), 1)
+        self.assertEqual(Part.objects.get(id=other_team_part.id).status, 'stock')
+
+    def test_bulk_delete_by_filter(self):
+        self.produce_parts(3)
+        response = self.client_for(self.wing_user).post('/api/parts/bulk_delete/', {
+            'filters': {'aircraft': self.aircraft.id, 'status': 'stock'}
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['deleted']), 3)
+        self.assertEqual(self.stock_quantity(), 0)
+        self.assertFalse(Part.objects.filter(is_deleted=False).exists())
+
+    def test_bulk_request_requires_targets(self):
+        response = self.client_for(self.wing_user).post('/api/parts/bulk_delete/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        for filters in ({'part_type': 'abc'}, {'aircraft': [1]}, {'status': 'kayıp'}, {'status': ['stock']}):
+            response = self.client_for(self.wing_user).post(
+                '/api/parts/bulk_delete/', {'filters': filters}, format='json'
+            )
+            self.assertEqual(response.status_code, 400, filters)
+
+
+class CsvImportTest(ProductionTestMixin, TestCase):
+    def upload(self, user, kind, content):
+        return self.client_for(user).post(
+            f'/api/import/{kind}/',
+            {'file': SimpleUploadedFile('data.csv', content.encode('utf-8'), content_type='text/csv')},
+            format='multipart'
+        )
+
+    def test_requirements_import_upserts_and_reports_errors(self):
+        response = self.upload(self.wing_user, 'requirements', (
+            "aircraft,part_type,required_quantity\n"
+            "TB2,Kanat,4\n"
+            "TB3,Kanat,2\n"
+            "TB2,Kanat,x\n"
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual([e['line'] for e in response.data['errors']], [3, 4])
+        self.assertEqual(AircraftPartRequirement.objects.get(aircraft=self.aircraft).required_quantity, 4)
+
+    def test_parts_import_checks_team_rules_and_updates_stock(self):
+        self.wing_user.is_staff = True
+        self.wing_user.save()
+        path = os.path.join(tempfile.mkdtemp(), 'parts.csv')
+        with open(path, 'w', encoding='utf-8') as fp:
+            fp.write(
+                "aircraft,part_type,team,status,quantity\n"
+                "TB2,Kanat,Kanat Takımı,stock,3\n"
+                "TB2,Kanat,Kanat Takımı,used,\n"
+                "TB2,Kanat,Montaj Takımı,stock,1\n"
+            )
+        stderr = StringIO()
+        call_command('import_csv', 'parts', path, chunk_size=2, stdout=StringIO(), stderr=stderr)
+
+        self.assertEqual(Part.objects.count(), 4)
+        self.assertEqual(self.stock_quantity(), 3)
+        self.assertIn('Satır 4', stderr.getvalue())
+
+    def test_parts_import_requires_staff(self):
+        response = self.upload(self.wing_user, 'parts', "aircraft,part_type,team\n")
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(PASSWORD_HASHING={'WORKERS': 2, 'MIN_PARALLEL': 2})
+    def test_personnel_import_validates_in_bulk_and_hashes_in_pool(self):
+        self.assertEqual(self.upload(self.wing_user, 'personnel', "username,email,password,team\n").status_code, 403)
+        self.wing_user.is_staff = True
+        self.wing_user.save()
+        User.objects.filter(pk=self.assembly_user.pk).update(email='montaj@example.com')
+
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.upload(self.wing_user, 'personnel', (
+                "username,email,password,team\n"
+                "ali,ali@example.com,parola1,Kanat Takımı\n"
+                "kanatci,yeni@example.com,parola2,Kanat Takımı\n"
+                "veli,montaj@example.com,parola3,Montaj Takımı\n"
+                "ali,ali2@example.com,parola4,Montaj Takımı\n"
+                "ayse,ayse@example.com,parola5,Gövde Takımı\n"
+                "fatma,fatma@example.com,parola6,Montaj Takımı\n"
+            ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual([e['line'] for e in response.data['errors']], [3, 4, 5, 6])
+        # Çakışma kontrolü tüm dosya için tek sorgu
+        lookups = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'FROM "auth_user"' in q['sql']]
+        self.assertEqual(len(lookups), 1)
+
+        fatma = Personnel.objects.select_related('user', 'team').get(user__username='fatma')
+        self.assertEqual(fatma.team, self.assembly_team)
+        self.assertTrue(fatma.user.check_password('parola6'))
+        self.assertTrue(User.objects.get(username='ali').check_password('parola1'))
+
+
+class IdempotencyKeyTest(ProductionTestMixin, TestCase):
+    def post_parts(self, key, count=2):
+        return self.client_for(self.wing_user).post('/api/parts/', {
+            'part_type': self.wing.id, 'aircraft': self.aircraft.id, 'stock': count
+        }, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        first = self.post_parts('batch-1')
+        retry = self.post_parts('batch-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data['parts'], first.data['parts'])
+        self.assertEqual(Part.objects.count(), 2)
+        self.assertEqual(self.stock_quantity(), 2)
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        self.post_parts('batch-1')
+        response = self.post_parts('batch-1', count=3)
+        self.assertEqual(response.status_code, 422)
+
+    def test_expired_keys_are_purged(self):
+        self.post_parts('batch-1')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class EventHubTest(ProductionTestMixin, TestCase):
+    def test_resume_from_last_event_id(self):
+        hub = EventHub()
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        first = hub.publish('stock', {'delta': 1})
+        second = hub.publish('stock', {'delta': 2})
+
+        subscription, backlog = hub.subscribe(loop, first.id)
+        self.assertEqual([event.id for event in backlog], [second.id])
+        self.assertIsNone(hub.subscribe(loop, 'eski-epoch-1')[1])
+
+        third = hub.publish('stock', {'delta': 3})
+        received = loop.run_until_complete(asyncio.wait_for(subscription.queue.get(), 1))
+        self.assertEqual(received.id, third.id)
+
+    def test_writes_publish_scoped_events_after_commit(self):
+        start = len(hub._history)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.produce_parts(2)
+        events = list(hub._history)[start:]
+
+        self.assertEqual([event.type for event in events], ['part.created', 'stock'])
+        wing_scope = EventScope(Personnel.objects.get(user=self.wing_user))
+        other_team = Team.objects.create(name='Gövde Takımı', responsible_part=PartType.objects.create(name='Gövde'))
+        other_scope = EventScope(Personnel.objects.get(user=self.create_personnel('govdeci', other_team)))
+        self.assertTrue(all(wing_scope.allows(event) for event in events))
+        self.assertFalse(any(other_scope.allows(event) for event in events))
+
+    async def test_stream_requires_token(self):
+        response = await self.async_client.get('/api/events/')
+        self.assertEqual(response.status_code, 401)
+
+
+class DeltaSyncTest(ProductionTestMixin, TestCase):
+    def sync(self, user, since):
+        response = self.client_for(user).get('/api/sync/', {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_changes_since_cursor_with_tombstones(self):
+        part_ids = self.produce_parts(3)
+        cursor = self.sync(self.wing_user, 0)['cursor']
+
+        self.client_for(self.wing_user).delete(f'/api/parts/{part_ids[0]}/')
+        data = self.sync(self.wing_user, cursor)
+
+        self.assertGreater(data['cursor'], cursor)
+        self.assertEqual(data['parts'], {'updated': [], 'deleted': [part_ids[0]]})
+        self.assertEqual([row['stock_quantity'] for row in data['stock']['updated']], [2])
+        self.assertEqual(self.sync(self.wing_user, data['cursor'])['parts'], {'updated': [], 'deleted': []})
+
+    def test_assembly_consumes_parts_and_adds_aircraft(self):
+        part_ids = self.produce_parts(2)
+        cursor = self.sync(self.assembly_user, 0)['cursor']
+        produced_id = self.produce_aircraft().data['id']
+
+        data = self.sync(self.assembly_user, cursor)
+        self.assertEqual(sorted(data['parts']['deleted']), part_ids)
+        self.assertEqual([row['id'] for row in data['produced_aircrafts']['updated']], [produced_id])
+
+    def test_other_teams_do_not_see_foreign_tombstones(self):
+        part_ids = self.produce_parts(1)
+        other_team = Team.objects.create(name='Gövde Takımı')
+        other_user = self.create_personnel('govdeci', other_team)
+
+        data = self.sync(other_user, 0)
+        self.assertEqual(data['parts'], {'updated': [], 'deleted': []})
+        self.assertNotIn(part_ids[0], data['parts']['deleted'])
+
+
+@override_settings(ADMISSION_CONTROL={
+    'ENABLED': True, 'USER_RATE': '2/min', 'USER_BURST': 2,
+    'USER_CONCURRENCY': 1, 'GLOBAL_READ_CONCURRENCY': 10,
+})
+class AdmissionControlTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_expensive_reads_are_rate_limited_with_retry_after(self):
+        client = self.client_for(self.wing_user)
+        self.assertEqual(client.get('/api/parts/').status_code, 200)
+        self.assertEqual(client.get('/api/parts/').status_code, 200)
+
+        response = client.get('/api/parts/')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+        # Diğer kullanıcıların ve kritik yazma işlemlerinin kapasitesi etkilenmez
+        self.assertEqual(self.client_for(self.assembly_user).get('/api/parts/').status_code, 200)
+        self.produce_parts(1)
+
+    def test_concurrency_slots_are_capped_and_released(self):
+        client = self.client_for(self.wing_user)
+        cache.set(f'admission:slots:user:{self.wing_user.pk}', 1)
+        self.assertEqual(client.get('/api/parts/').status_code, 429)
+
+        cache.delete(f'admission:slots:user:{self.wing_user.pk}')
+        self.assertEqual(client.get('/api/parts/').status_code, 200)
+        self.assertEqual(cache.get(f'admission:slots:user:{self.wing_user.pk}'), 0)
+
+    def test_concurrent_token_takes_never_exceed_burst(self):
+        barrier = threading.Barrier(20)
+        results = []
+
+        def take():
+            barrier.wait()
+            results.append(throttling.take_token('admission:bucket:test', 1, 5, time.time()))
+
+        threads = [threading.Thread(target=take) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(0), 5)
+        self.assertTrue(all(0 < wait <= 5 for wait in results if wait))
+
+
+class ReplicaRoutingTest(ProductionTestMixin, TransactionTestCase):
+    """
+    Replika olarak ayrı bir SQLite dosyası kullanılır. Replikaya sadece
+    `replicate` çağrıldığında veri kopyalanır; aradaki yazmalar replika
+    gecikmesini taklit eder.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        # Ayarlarda tanımlı olmayan bağlantıya test sırasında izin verilir
+        connections['replica'] = DatabaseWrapper(connections.configure_settings({
+            'default': connections.settings['default'],
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path},
+        })['replica'], 'replica')
+        self.addCleanup(self.remove_replica, path)
+        call_command('migrate', database='replica', verbosity=0)
+        settings_override = override_settings(REPLICA_DATABASES=['replica'])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def remove_replica(self, path):
+        connections['replica'].close()
+        del connections['replica']
+        os.remove(path)
+
+    def replicate(self):
+        with tempfile.NamedTemporaryFile('w+', suffix='.json') as fixture:
+            call_command('dumpdata', 'auth.user', 'production', output=fixture.name, verbosity=0)
+            call_command('loaddata', fixture.name, database='replica', verbosity=0)
+
+    def part_count(self, user):
+        response = self.client_for(user).get('/api/parts/')
+        self.assertEqual(response.status_code, 200)
+        return len(response.data)
+
+    def test_reads_use_replica_and_writes_pin_user_to_primary(self):
+        self.produce_parts(2)
+        self.replicate()
+        self.produce_parts(1)
+
+        # Yazan kullanıcı kendi yazdığını görür, diğerleri gecikmeli replikadan okur
+        self.assertEqual(self.part_count(self.wing_user), 3)
+        self.assertEqual(self.part_count(self.assembly_user), 2)
+
+        cache.delete(get_pin_key(self.wing_user))
+        self.assertEqual(self.part_count(self.wing_user), 2)
+
+    def test_atomic_blocks_and_writes_stay_on_primary(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Part), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Part), 'replica')
+            self.assertEqual(router.db_for_write(Part), 'default')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Part), 'default')
+
+
+class SchemaArtifactTest(TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        settings_override = override_settings(OPENAPI={'OUTPUT_DIR': self.output_dir}, APP_VERSION='1.0')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        version_patch = mock.patch.object(schema, '_version', None)
+        version_patch.start()
+        self.addCleanup(version_patch.stop)
+        schema._artifacts.clear()
+        self.addCleanup(schema._artifacts.clear)
+
+    def test_schema_is_generated_once_and_served_with_etag(self):
+        response = self.client.get('/swagger.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/parts/', json.loads(response.content)['paths'])
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'schema-1.0.json')))
+
+        with mock.patch.object(schema, 'generate_schema') as generate:
+            cached = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        generate.assert_not_called()
+
+    def test_new_version_replaces_old_artifacts(self):
+        call_command('generate_schema', stdout=StringIO())
+        with override_settings(APP_VERSION='2.0'):
+            schema._version = None
+            schema._artifacts.clear()
+            self.assertEqual(self.client.get('/swagger.yaml').status_code, 200)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ['schema-2.0.json', 'schema-2.0.yaml'])
+
+    def test_filtered_viewsets_build_queryset_without_request(self):
+        # Şema üretimi görünümleri istek olmadan oluşturur
+        for viewset in (AssemblyOrderViewSet, PartReservationViewSet):
+            view = viewset(swagger_fake_view=True, request=None, action='list', kwargs={}, format_kwarg=None)
+            self.assertIs(view.get_queryset().model, viewset.queryset.model)
+
+
+@override_settings(SITE_DATABASES={'MERKEZ': 'default', 'IZM': 'site_izm'})
+class SiteShardingTest(ProductionTestMixin, TransactionTestCase):
+    """İzmir sahası ayrı bir SQLite dosyasında tutulur."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Saha bağlantısı ayarlarda tanımlı olmadığı için test sırasında eklenir
+        cls.databases = {'default', 'site_izm'}
+        fd, cls.shard_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        connections.settings['site_izm'] = connections.configure_settings({
+            'default': connections.settings['default'],
+            'site_izm': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': cls.shard_path},
+        })['site_izm']
+        call_command('migrate', database='site_izm', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['site_izm'].close()
+        del connections['site_izm']
+        del connections.settings['site_izm']
+        os.remove(cls.shard_path)
+
+    def setUp(self):
+        super().setUp()
+        self.izm_team = Team.objects.create(name='Kanat Takımı', responsible_part=self.wing, site='IZM')
+        self.izm_user = self.create_personnel('kanatci_izm', self.izm_team)
+
+    def test_site_data_is_written_to_its_own_database(self):
+        self.produce_parts(2)
+        self.produce_parts(3, user=self.izm_user)
+
+        # Referans veri commit sonrası saha veritabanına kopyalanmış olmalı
+        self.assertTrue(Team.objects.using('site_izm').filter(id=self.izm_team.id).exists())
+        self.assertEqual(Part.objects.using('default').count(), 2)
+        self.assertEqual(
+            list(Part.objects.using('site_izm').values_list('site', flat=True).distinct()), ['IZM']
+        )
+        self.assertEqual(PartStock.objects.using('site_izm').get().stock_quantity, 3)
+        self.assertEqual(len(self.client_for(self.izm_user).get('/api/parts/').data), 3)
+
+    def test_login_token_carries_site_and_report_gathers_all_sites(self):
+        response = APIClient().post('/api/auth/login/', {'username': 'kanatci_izm', 'password': 'x'}, format='json')
+        self.assertEqual(AccessToken(response.data['token'])['site'], 'IZM')
+
+        self.produce_parts(2)
+        self.produce_parts(3, user=self.izm_user)
+        admin = User.objects.create_user('admin', password='x', is_staff=True)
+        data = self.client_for(admin).get('/api/reports/sites/').data
+
+        self.assertEqual(data['sites']['MERKEZ']['stock'][0]['total'], 2)
+        self.assertEqual(data['sites']['IZM']['stock'][0]['total'], 3)
+        self.assertEqual(data['totals']['stock'], [{'id': self.wing.id, 'name': 'Kanat', 'total': 5}])
+
+
+class CapacityPlanningTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.body = PartType.objects.create(name='Gövde')
+        self.body_team = Team.objects.create(name='Gövde Takımı', responsible_part=self.body)
+        AircraftPartRequirement.objects.create(aircraft=self.aircraft, part_type=self.body, required_quantity=1)
+        self.akinci = Aircraft.objects.create(name='AKINCI')
+        AircraftPartRequirement.objects.create(aircraft=self.akinci, part_type=self.wing, required_quantity=4)
+        self.body_user = self.create_personnel('govdeci', self.body_team)
+
+    def optimize(self, targets):
+        return self.client_for(self.assembly_user).post('/api/planning/optimize/', {
+            'targets': [{'aircraft': aircraft.id, 'quantity': quantity} for aircraft, quantity in targets]
+        }, format='json')
+
+    def test_plan_uses_bottlenecks_and_assigns_team_targets(self):
+        self.produce_parts(5)
+        self.client_for(self.body_user).post('/api/parts/', {
+            'part_type': self.body.id, 'aircraft': self.aircraft.id, 'stock': 1
+        }, format='json')
+
+        response = self.optimize([(self.aircraft, 3), (self.akinci, 1)])
+        self.assertEqual(response.status_code, 200, response.data)
+        plan = {row['aircraft']: row for row in response.data['plan']}
+        self.assertEqual(plan[self.aircraft.id]['buildable'], 1)
+        self.assertEqual(plan[self.aircraft.id]['bottlenecks'], [self.body.id])
+        self.assertEqual(plan[self.akinci.id]['build'], 0)
+
+        targets = {row['part_type']: row for row in response.data['team_targets']}
+        self.assertEqual(targets[self.wing.id]['team'], self.wing_team.id)
+        self.assertEqual(targets[self.wing.id]['quantity'], 1 + 4)
+        self.assertEqual(targets[self.body.id]['by_aircraft'], [{'aircraft': self.aircraft.id, 'quantity': 2}])
+
+    def test_catalog_changes_invalidate_cached_matrix(self):
+        version = self.optimize([(self.aircraft, 1)]).data['catalog_version']
+        AircraftPartRequirement.objects.filter(aircraft=self.aircraft, part_type=self.body).update(required_quantity=3)
+        self.assertEqual(self.optimize([(self.aircraft, 1)]).data['catalog_version'], version)
+
+        requirement = AircraftPartRequirement.objects.get(aircraft=self.aircraft, part_type=self.body)
+        requirement.save()
+        response = self.optimize([(self.aircraft, 1)])
+        self.assertGreater(response.data['catalog_version'], version)
+        self.assertEqual(response.data['team_targets'][1]['quantity'], 3)
+
+    def test_invalid_targets_are_rejected(self):
+        self.assertEqual(self.optimize([(self.aircraft, -1)]).status_code, 400)
+        response = self.client_for(self.assembly_user).post(
+            '/api/planning/optimize/', {'targets': [{'aircraft': 999, 'quantity': 1}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class BillOfMaterialsTest(ProductionTestMixin, TestCase):
+    """Kanat = 2 kiriş + 3 sinir, sinir = 4 perçin."""
+
+    def setUp(self):
+        super().setUp()
+        self.spar = PartType.objects.create(name='Kiriş')
+        self.rib = PartType.objects.create(name='Sinir')
+        self.rivet = PartType.objects.create(name='Perçin')
+        PartTypeComponent.objects.create(parent=self.wing, component=self.spar, quantity=2)
+        PartTypeComponent.objects.create(parent=self.wing, component=self.rib, quantity=3)
+        PartTypeComponent.objects.create(parent=self.rib, component=self.rivet, quantity=4)
+        self.spar_user = self.create_personnel(
+            'kirisci', Team.objects.create(name='Kiriş Takımı', responsible_part=self.spar)
+        )
+        self.rib_user = self.create_personnel(
+            'sinirci', Team.objects.create(name='Sinir Takımı', responsible_part=self.rib)
+        )
+
+    def produce(self, user, part_type, count):
+        response = self.client_for(user).post('/api/parts/', {
+            'part_type': part_type.id, 'aircraft': self.aircraft.id, 'stock': count
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def assemble_wing(self):
+        return self.client_for(self.wing_user).post('/api/parts/assemble/', {
+            'part_type': self.wing.id, 'aircraft': self.aircraft.id, 'quantity': 1
+        }, format='json')
+
+    def test_bom_is_flattened_with_levels(self):
+        response = self.client_for(self.assembly_user).get(f'/api/aircrafts/{self.aircraft.id}/bom/')
+        self.assertEqual(response.status_code, 200)
+        rows = {row['part_type']: row for row in response.data}
+        self.assertEqual(
+            {part_type: row['quantity'] for part_type, row in rows.items()},
+            {self.wing.id: 2, self.spar.id: 4, self.rib.id: 6, self.rivet.id: 24}
+        )
+        self.assertEqual(rows[self.rivet.id]['level'], 2)
+        self.assertTrue(rows[self.rib.id]['is_assembly'])
+        self.assertFalse(rows[self.rivet.id]['is_assembly'])
+
+    def test_feasibility_nets_stock_through_levels_with_flat_query_count(self):
+        self.produce_parts(1)
+        self.produce(self.spar_user, self.spar, 2)
+        client = self.client_for(self.assembly_user)
+        url = f'/api/aircrafts/{self.aircraft.id}/feasibility/?quantity=1'
+        response = client.get(url)
+        self.assertFalse(response.data['feasible'])
+        self.assertEqual(response.data['from_stock'], {self.wing.id: 1, self.spar.id: 2})
+        self.assertEqual(response.data['assemble'], {self.wing.id: 1, self.rib.id: 3})
+        self.assertEqual(response.data['missing'], {self.rivet.id: 12})
+
+        flat = Aircraft.objects.create(name='AKINCI')
+        AircraftPartRequirement.objects.create(aircraft=flat, part_type=self.spar, required_quantity=1)
+        # Katalog sürümü değiştiği için ağaçlar yeniden cache'lenir
+        client.get(f'/api/aircrafts/{flat.id}/feasibility/')
+        client.get(url)
+        with CaptureQueriesContext(connections['default']) as flat_queries:
+            client.get(f'/api/aircrafts/{flat.id}/feasibility/')
+        with CaptureQueriesContext(connections['default']) as deep_queries:
+            client.get(url)
+        self.assertEqual(len(deep_queries), len(flat_queries))
+
+    def test_assembly_consumes_components_into_stock(self):
+        self.produce(self.spar_user, self.spar, 2)
+        self.produce(self.rib_user, self.rib, 3)
+
+        response = self.assemble_wing()
+        self.assertEqual(response.status_code, 201, response.data)
+        wing_id = response.data['parts'][0]['id']
+        self.assertEqual(self.stock_quantity(), 1)
+        self.assertEqual(
+            PartStock.objects.get(part_type=self.rib, aircraft=self.aircraft).stock_quantity, 0
+        )
+        self.assertEqual(Part.objects.filter(assembled_into_id=wing_id, status='used').count(), 5)
+
+        response = self.assemble_wing()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['missing_parts']), 2)
+        self.assertEqual(self.client_for(self.spar_user).post('/api/parts/assemble/', {
+            'part_type': self.wing.id, 'aircraft': self.aircraft.id
+        }, format='json').status_code, 403)
+
+    def test_archiving_keeps_component_assembly_links(self):
+        self.produce(self.spar_user, self.spar, 2)
+        self.produce(self.rib_user, self.rib, 3)
+        wing_id = self.assemble_wing().data['parts'][0]['id']
+        component_ids = list(Part.objects.filter(assembled_into_id=wing_id).values_list('id', flat=True))
+        # Bir bileşen henüz arşivlenmemişken montaj parçası arşivlenir
+        Part.objects.filter(id=component_ids[0]).update(is_deleted=False)
+        Part.objects.filter(id=wing_id).update(is_deleted=True, deleted_at=timezone.now())
+
+        call_command('archive_parts', older_than_days=0, stdout=StringIO())
+        self.assertEqual(
+            set(ArchivedPart.objects.filter(assembled_into=wing_id).values_list('id', flat=True)),
+            set(component_ids[1:])
+        )
+        live = Part.objects.get(id=component_ids[0])
+        self.assertIsNone(live.assembled_into_id)
+        self.assertEqual(live.assembly, ArchivedPart.objects.get(id=wing_id))
+
+        Part.objects.filter(id=live.id).update(is_deleted=True, deleted_at=timezone.now())
+        call_command('archive_parts', older_than_days=0, stdout=StringIO())
+        self.assertEqual(ArchivedPart.objects.get(id=live.id).assembly.id, wing_id)
+
+    def test_planning_builds_unstocked_assemblies_from_components(self):
+        self.produce(self.spar_user, self.spar, 4)
+        self.produce(self.rib_user, self.rib, 6)
+        response = self.client_for(self.assembly_user).post('/api/planning/optimize/', {
+            'targets': [{'aircraft': self.aircraft.id, 'quantity': 2}]
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        # Kanat stokta yok; bileşenler iki kanada, yani bir uçağa yeter
+        [plan] = response.data['plan']
+        self.assertEqual((plan['buildable'], plan['build']), (1, 1))
+        self.assertEqual(plan['bottlenecks'], [self.spar.id, self.rivet.id])
+        # 4 kanat = 8 kiriş + 12 sinir; stok düşülünce 4 kiriş ve 6 sinir (24 perçin) eksik
+        targets = {row['part_type']: row['quantity'] for row in response.data['team_targets']}
+        self.assertEqual(targets, {self.spar.id: 4, self.rivet.id: 24})
+
+    def test_cyclic_components_are_rejected(self):
+        response = self.client_for(self.assembly_user).post('/api/part-components/', {
+            'parent': self.rivet.id, 'component': self.wing.id, 'quantity': 1
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('component', response.data)
+
+
+class OptimisticConcurrencyTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.part_id = self.produce_parts(1)[0]
+        self.client = self.client_for(self.wing_user)
+
+    def test_stale_if_match_returns_conflict_with_current_state(self):
+        response = self.client.get(f'/api/parts/{self.part_id}/')
+        self.assertEqual(response['ETag'], '"1"')
+
+        url = f'/api/parts/{self.part_id}/update_status/'
+        response = self.client.post(url, {'status': 'used'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(url, {'status': 'stock'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['current']['version'], 2)
+        self.assertEqual(response.data['current']['status'], 'used')
+        self.assertEqual(response['ETag'], '"2"')
+
+        response = self.client.patch(
+            f'/api/parts/{self.part_id}/', {'status': 'stock'}, format='json', HTTP_IF_MATCH='"2"'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response['ETag'], '"3"')
+
+    def test_concurrent_saves_write_changed_fields_only(self):
+        first = Part.objects.get(id=self.part_id)
+        second = Part.objects.get(id=self.part_id)
+
+        first.status = 'used'
+        with CaptureQueriesContext(connections['default']) as queries:
+            first.save()
+        sql = next(query['sql'] for query in queries if query['sql'].startswith('UPDATE'))
+        self.assertIn('"status"', sql)
+        self.assertNotIn('"team_id" =', sql.split('WHERE')[0])
+        self.assertEqual(first.version, 2)
+
+        second.is_deleted = True
+        with self.assertRaises(VersionConflict):
+            second.save()
+        self.assertFalse(Part.objects.get(id=self.part_id).is_deleted)
+
+
+class TokenRefreshTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post('/api/auth/login/', {'username': 'kanatci', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/refresh/', {'refresh': token}, format='json')
+
+    def test_refresh_rotates_without_password_check_and_keeps_site(self):
+        tokens = self.login()
+        self.assertEqual(RefreshToken(tokens['refresh'])['site'], 'MERKEZ')
+
+        with mock.patch('apps.production.hashing.verify_password', side_effect=AssertionError):
+            response = self.refresh(tokens['refresh'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data['token'])['site'], 'MERKEZ')
+        self.assertNotEqual(response.data['refresh'], tokens['refresh'])
+        parts = self.client.get('/api/parts/', HTTP_AUTHORIZATION=f"Bearer {response.data['token']}")
+        self.assertEqual(parts.status_code, 200)
+
+        # Rotasyon sonrası eski token tekrar kullanılamaz
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+        self.assertEqual(self.refresh(response.data['token']).status_code, 401)
+
+        self.assertEqual(
+            self.client.post('/api/auth/logout/', {'refresh': response.data['refresh']}, format='json').status_code, 204
+        )
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 401)
+
+    def test_inactive_users_and_busy_hashing_pool_are_rejected(self):
+        tokens = self.login()
+        User.objects.filter(pk=self.wing_user.pk).update(is_active=False)
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+        response = self.client.post('/api/auth/login/', {'username': 'kanatci', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+        with mock.patch('apps.production.hashing.verify_password', side_effect=HashingBusy):
+            response = self.client.post('/api/auth/login/', {'username': 'kanatci', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_login_goes_through_authentication_backends(self):
+        failed = []
+
+        def receiver(credentials, **kwargs):
+            failed.append(credentials['username'])
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        response = self.client.post('/api/auth/login/', {'username': 'kanatci', 'password': 'yanlış'}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(failed, ['kanatci'])
+
+        # Parola doğru olsa da tanımlı backend'ler kullanıcıyı doğrulamazsa giriş reddedilir
+        with override_settings(AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.RemoteUserBackend']):
+            self.assertEqual(self.client.post(
+                '/api/auth/login/', {'username': 'kanatci', 'password': 'x'}, format='json'
+            ).status_code, 401)
+
+    def test_deploy_check_requires_shared_blacklist_cache(self):
+        self.assertEqual([error.id for error in tokens.check_shared_blacklist(None)], ['production.E001'])
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://redis:6379/0'
+        }}):
+            self.assertEqual(tokens.check_shared_blacklist(None), [])
+
+
+class SoakTest(ProductionTestMixin, LiveServerTestCase):
+    # Canlı test sunucusu bellek içi SQLite bağlantısını thread'ler arasında
+    # paylaştığı için testler tek worker ile çalışır
+    def test_soak_run_reports_and_checks_invariants(self):
+        out = StringIO()
+        call_command(
+            'soak', workers=1, duration=1, base_url=self.live_server_url,
+            mix='produce=5,assemble=1,delete=2,status=2,read=2', stdout=out
+        )
+        output = out.getvalue()
+        self.assertIn('istek/sn', output)
+        self.assertIn('produce', output)
+        self.assertIn(' 0 hata', output)
+        self.assertIn('Tüm tutarlılık kontrolleri geçti', output)
+
+    def test_invariant_violations_are_reported(self):
+        self.produce_parts(2)
+        PartStock.objects.filter(part_type=self.wing).update(stock_quantity=5)
+        part = Part.objects.filter(part_type=self.wing).first()
+        for _ in range(2):
+            AircraftPart.objects.bulk_create([AircraftPart(
+                produced_aircraft=ProducedAircraft.objects.create(aircraft=self.aircraft), part=part
+            )])
+
+        violations = check_invariants()
+        self.assertEqual(len(violations), 2)
+        self.assertIn('sayaç 5, stoktaki parça 2', violations[0])
+        with self.assertRaises(CommandError):
+            call_command('soak', workers=1, duration=0, base_url=self.live_server_url, stdout=StringIO())
+
+    def test_dead_worker_fails_the_run_instead_of_hanging(self):
+        with mock.patch('apps.production.management.commands.soak.run_worker', lambda *args: os._exit(3)), \
+                mock.patch('apps.production.management.commands.soak.RESULT_MARGIN', 0):
+            with self.assertRaisesMessage(CommandError, '#0 (çıkış kodu: 3)'):
+                call_command('soak', workers=1, duration=1, base_url=self.live_server_url, stdout=StringIO())
+
+    def test_login_benchmark_reports_login_and_refresh(self):
+        out = StringIO()
+        call_command(
+            'bench_login', users=2, logins=3, concurrency=1, password='bench', base_url=self.live_server_url, stdout=out
+        )
+        login, refresh = out.getvalue().splitlines()
+        self.assertIn('durum kodları: 200: 3', login)
+        self.assertTrue(refresh.startswith('refresh'))
+        self.assertIn('durum kodları: 200: 3', refresh)
+
+
+class AuditTrailTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.spool_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(AUDIT={
+            'BATCH_SIZE': 500, 'FLUSH_INTERVAL': None, 'MAX_PENDING': 50000, 'SPOOL_DIR': self.spool_dir,
+        })
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        audit.buffer.flush()
+
+    def spool_files(self):
+        return os.listdir(self.spool_dir)
+
+    def test_committed_mutations_are_buffered_then_written_in_bulk(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            part_ids = self.produce_parts(2)
+        self.assertFalse(AuditEntry.objects.exists())
+        self.assertEqual(len(self.spool_files()), 1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(audit.buffer.flush(), 2)
+        self.assertEqual(self.spool_files(), [])
+
+        response = self.client_for(self.wing_user).get(f'/api/audit/?part={part_ids[0]}')
+        self.assertEqual(response.status_code, 200)
+        [entry] = response.data['results']
+        self.assertEqual(entry['action'], 'part.produced')
+        self.assertEqual(entry['user_id'], self.wing_user.id)
+        self.assertEqual(entry['team_id'], self.wing_team.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.produce_aircraft().status_code, 201)
+        audit.buffer.flush()
+        self.assertEqual(
+            AuditEntry.objects.filter(part_id__in=part_ids, action='part.consumed').count(), 2
+        )
+        # Montaj takımı sadece kendi takımının kayıtlarını görür
+        response = self.client_for(self.assembly_user).get('/api/audit/')
+        self.assertEqual([entry['action'] for entry in response.data['results']], ['aircraft.produced'])
+
+    def test_full_buffer_is_flushed_without_background_thread(self):
+        with override_settings(AUDIT={**settings.AUDIT, 'BATCH_SIZE': 3}):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.produce_parts(3)
+        self.assertEqual(AuditEntry.objects.filter(action='part.produced').count(), 3)
+
+    def test_spool_of_crashed_process_is_recovered_once(self):
+        record = {
+            'event_id': uuid.uuid4().hex, 'created_at': timezone.now().isoformat(), 'action': 'part.deleted',
+            'part_id': 42, 'produced_aircraft_id': None, 'user_id': None, 'team_id': None, 'site': 'MERKEZ',
+            'data': {},
+        }
+        for name in ('audit-4194305-1.jsonl', 'audit-4194306-1.jsonl'):
+            with open(os.path.join(self.spool_dir, name), 'w') as spool:
+                spool.write(json.dumps(record) + '\n{"yarım')
+
+        self.assertEqual(audit.recover_spool(), 2)
+        self.assertEqual(AuditEntry.objects.filter(part_id=42).count(), 1)
+        self.assertEqual(self.spool_files(), [])
+
+    def test_imported_parts_are_audited_for_importing_user(self):
+        self.wing_user.is_staff = True
+        self.wing_user.save()
+        upload = SimpleUploadedFile('parts.csv', (
+            "aircraft,part_type,team,status,quantity\n"
+            "TB2,Kanat,Kanat Takımı,stock,3\n"
+            "TB2,Kanat,Kanat Takımı,used,\n"
+        ).encode('utf-8'), content_type='text/csv')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client_for(self.wing_user).post('/api/import/parts/', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['imported'], 4)
+        audit.buffer.flush()
+
+        entries = AuditEntry.objects.filter(action='part.produced')
+        self.assertEqual(
+            sorted(entries.values_list('part_id', flat=True)), sorted(Part.objects.values_list('id', flat=True))
+        )
+        self.assertEqual(set(entries.values_list('user_id', 'team_id')), {(self.wing_user.id, self.wing_team.id)})
+
+    def test_pages_follow_created_at_not_id(self):
+        now = timezone.now()
+        # Geç eklenen (ör. spool'dan kurtarılan) eski kayıtlar daha büyük id alır
+        offsets = [0, 0, 5, 3, 5, 1]
+        AuditEntry.objects.bulk_create([
+            AuditEntry(event_id=uuid.uuid4(), created_at=now - timedelta(minutes=offset),
+                       action='part.deleted', part_id=offset, site='MERKEZ')
+            for offset in offsets
+        ])
+        expected = list(AuditEntry.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        self.wing_user.is_staff = True
+        self.wing_user.save()
+        client = self.client_for(self.wing_user)
+        seen, url = [], '/api/audit/?limit=2'
+        while url:
+            data = client.get(url).data
+            seen += [entry['id'] for entry in data['results']]
+            url = data['next_before'] and f"/api/audit/?limit=2&before={data['next_before']}"
+        self.assertEqual(seen, expected)
+        self.assertEqual(client.get('/api/audit/?before=abc').status_code, 400)
+        for limit in (0, -1):
+            self.assertEqual(client.get(f'/api/audit/?limit={limit}').status_code, 400)
+
+    @override_settings(SITE_DATABASES={'MERKEZ': 'default', 'IZM': 'default'})
+    def test_entries_are_filtered_by_site(self):
+        # Saha veritabanları ayrı olduğundan aynı parça id'si iki sahada bulunabilir
+        AuditEntry.objects.bulk_create([
+            AuditEntry(event_id=uuid.uuid4(), created_at=timezone.now(), action='part.produced', part_id=7,
+                       team_id=self.wing_team.id, site=site)
+            for site in ('MERKEZ', 'IZM')
+        ])
+        response = self.client_for(self.wing_user).get('/api/audit/?part=7&site=IZM')
+        self.assertEqual([entry['site'] for entry in response.data['results']], ['MERKEZ'])
+
+        self.wing_user.is_staff = True
+        self.wing_user.save()
+        client = self.client_for(self.wing_user)
+        response = client.get('/api/audit/?part=7&site=IZM')
+        self.assertEqual([entry['site'] for entry in response.data['results']], ['IZM'])
+        self.assertEqual(client.get('/api/audit/?site=ANK').status_code, 400)
+
+
+class FieldSelectionTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.produce_parts(2)
+        self.assertEqual(self.produce_aircraft().status_code, 201)
+
+    def get(self, user, url):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client_for(user).get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, [query['sql'] for query in queries]
+
+    def test_produced_aircraft_list_without_expand_is_one_query(self):
+        # Tam çıktı (render önbelleği henüz boş)
+        response, full_queries = self.get(self.assembly_user, '/api/produced-aircrafts/')
+        self.assertEqual(len(response.json()[0]['parts']), 2)
+
+        sparse, queries = self.get(self.assembly_user, '/api/produced-aircrafts/?fields=id,aircraft,date')
+        self.assertEqual(set(sparse.data[0]), {'id', 'aircraft', 'date'})
+        # Personel (saha) sorgusu dışında tek sorgu
+        data_queries = [sql for sql in queries if 'production_personnel' not in sql]
+        self.assertEqual(len(data_queries), 1)
+        self.assertGreater(len(full_queries), len(queries) + 2)
+        [query] = data_queries
+        self.assertNotIn('production_aircraft"."name', query)
+        self.assertNotIn('"version"', query)
+        self.assertLess(len(sparse.content), len(response.content) / 3)
+
+        expanded, _ = self.get(self.assembly_user, '/api/produced-aircrafts/?fields=id&expand=parts')
+        self.assertEqual(set(expanded.data[0]), {'id', 'parts'})
+        self.assertEqual(len(expanded.data[0]['parts']), 2)
+
+    def test_part_fields_drive_columns_and_joins(self):
+        part_id = self.produce_parts(1)[0]
+        response, queries = self.get(self.wing_user, f'/api/parts/{part_id}/?fields=id,status,part_type_name')
+        self.assertEqual(response.data, {'id': part_id, 'status': 'stock', 'part_type_name': 'Kanat'})
+        [query] = [sql for sql in queries if 'FROM "production_part"' in sql]
+        self.assertIn('JOIN "production_parttype"', query)
+        self.assertNotIn('production_team', query)
+        self.assertNotIn('"deleted_at"', query)
+
+        response = self.client_for(self.wing_user).get('/api/parts/?fields=id,unknown&expand=team')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'fields', 'expand'})
+
+
+@override_settings(BATCH={'MAX_REQUESTS': 5, 'MAX_WORKERS': 1})
+class BatchRequestTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.token = str(AccessToken.for_user(self.wing_user))
+
+    def batch(self, requests):
+        return self.client.post(
+            '/api/batch/', {'requests': requests}, content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+
+    def test_sub_requests_share_authentication_and_keep_order(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.batch([
+                {'id': 'aircrafts', 'path': '/api/aircrafts/'},
+                {'id': 'produce', 'method': 'POST', 'path': '/api/parts/',
+                 'body': {'part_type': self.wing.id, 'aircraft': self.aircraft.id, 'stock': 2}},
+                {'id': 'stock', 'path': '/api/part-stock/', 'params': {'fields': 'stock_quantity'}},
+                {'id': 'missing', 'path': '/api/parts/999999/'},
+                {'id': 'unknown', 'path': '/api/unknown/'},
+            ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([result['id'] for result in results], ['aircrafts', 'produce', 'stock', 'missing', 'unknown'])
+        self.assertEqual([result['status'] for result in results], [200, 201, 200, 404, 404])
+        self.assertEqual(results[0]['body'][0]['name'], 'TB2')
+        self.assertEqual(results[2]['body'], [{'stock_quantity': 2}])
+        # Kullanıcı kaydı toplu istek için bir kez yüklenir
+        user_queries = [query['sql'] for query in queries if 'FROM "auth_user"' in query['sql']]
+        self.assertEqual(len(user_queries), 1)
+
+    def test_invalid_batches_are_rejected(self):
+        self.assertEqual(self.batch([{'path': '/api/batch/', 'method': 'POST'}]).status_code, 400)
+        self.assertEqual(self.batch([{'path': '/api/aircrafts/'}] * 6).status_code, 400)
+        self.assertEqual(self.batch([{'path': 'http://example.com/'}]).status_code, 400)
+        self.assertEqual(self.client.post('/api/batch/', {'requests': []}, content_type='application/json').status_code, 401)
+
+
+class ConcurrentBatchRequestTest(ProductionTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        # Alt istekler hız sınırına tek tek dahil edilir; önceki testlerin sayaçları temizlenir
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @override_settings(BATCH={'MAX_REQUESTS': 20, 'MAX_WORKERS': 4})
+    def test_get_requests_run_on_thread_pool(self):
+        self.produce_parts(3)
+        client = self.client_for(self.wing_user)
+        paths = ['/api/aircrafts/', '/api/part-types/', '/api/part-stock/', '/api/teammates/', '/api/parts/']
+        response = client.post('/api/batch/', {'requests': [{'path': path} for path in paths]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([result['status'] for result in results], [200] * len(paths))
+        self.assertEqual(results[2]['body'][0]['stock_quantity'], 3)
+        self.assertEqual(len(results[4]['body']), 3)
+
+
+class RenderCacheTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.produce_parts(2)
+        # Önbellek commit sonrası doldurulur/silinir
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.produce_aircraft()
+        self.assertEqual(response.status_code, 201)
+        self.created = response.data
+        token = AccessToken.for_user(self.assembly_user)
+        token['site'] = 'MERKEZ'
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_detail_is_served_from_cache_without_relational_queries(self):
+        url = f"/api/produced-aircrafts/{self.created['id']}/"
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), json.loads(json.dumps(self.created, default=str)))
+        self.assertEqual(response['ETag'], '"1"')
+        self.assertFalse([query['sql'] for query in queries if 'production_' in query['sql']])
+
+        # Montajda kullanılan parçalar parça uç noktalarından değiştirilemez
+        part_id = self.created['parts'][0]['part']
+        response = self.client_for(self.wing_user).post(
+            '/api/parts/bulk_status/', {'status': 'stock', 'ids': [part_id]}, format='json'
+        )
+        self.assertEqual(response.data['not_found'], [part_id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_list_is_assembled_from_cached_fragments(self):
+        self.produce_parts(2)
+        self.assertEqual(self.produce_aircraft().status_code, 201)
+        cache.delete_many([key for key in render_cache.get_keys([self.created['id']]).values()])
+
+        first = self.client.get('/api/produced-aircrafts/')
+        self.assertEqual(first.status_code, 200)
+        with CaptureQueriesContext(connections['default']) as queries:
+            second = self.client.get('/api/produced-aircrafts/')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual([item['id'] for item in second.json()], [self.created['id'], self.created['id'] + 1])
+        # Sadece id listesi sorgulanır
+        self.assertEqual(len([query for query in queries if 'production_producedaircraft' in query['sql']]), 1)
+        self.assertFalse([query for query in queries if 'production_aircraftpart' in query['sql']])
+
+        sparse = self.client.get('/api/produced-aircrafts/?fields=id')
+        self.assertEqual(sparse.json(), [{'id': self.created['id']}, {'id': self.created['id'] + 1}])
+
+    def test_aircraft_part_links_are_read_only(self):
+        url = f"/api/produced-aircrafts/{self.created['id']}/"
+        part_id = self.produce_parts(1)[0]
+        link_id = self.created['parts'][0]['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            responses = [
+                self.client.post('/api/aircraft-parts/', {
+                    'produced_aircraft': self.created['id'], 'part': part_id
+                }, format='json'),
+                self.client.patch(f'/api/aircraft-parts/{link_id}/', {'part': part_id}, format='json'),
+                self.client.delete(f'/api/aircraft-parts/{link_id}/'),
+            ]
+        self.assertEqual([response.status_code for response in responses], [405, 405, 405])
+        self.assertEqual(AircraftPart.objects.filter(produced_aircraft_id=self.created['id']).count(), 2)
+        self.assertEqual(len(self.client.get(url).json()['parts']), 2)
+
+        response = self.client.get('/api/aircraft-parts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(link['id'] for link in response.data), sorted(p['id'] for p in self.created['parts']))
+
+
+class AssemblyOrderTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self.client_for(self.assembly_user)
+
+    def order(self, priority=0):
+        response = self.client.post(
+            '/api/assembly-orders/', {'aircraft': self.aircraft.id, 'priority': priority}, format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def test_order_is_fulfilled_immediately_when_stock_is_enough(self):
+        self.produce_parts(2)
+        order = self.order()
+        self.assertEqual(order['status'], 'fulfilled')
+        self.assertIsNotNone(order['produced_aircraft'])
+        self.assertEqual(self.stock_quantity(), 0)
+
+    def test_pending_orders_are_fulfilled_by_priority_when_stock_arrives(self):
+        low = self.order(priority=0)
+        high = self.order(priority=5)
+        self.assertEqual((low['status'], high['status']), ('pending', 'pending'))
+
+        # Tek uçaklık stok gelince daha öncelikli sipariş karşılanır
+        with self.captureOnCommitCallbacks(execute=True):
+            self.produce_parts(3)
+        self.assertEqual(AssemblyOrder.objects.get(id=high['id']).status, 'fulfilled')
+        self.assertEqual(AssemblyOrder.objects.get(id=low['id']).status, 'pending')
+        self.assertEqual(self.stock_quantity(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.produce_parts(1)
+        fulfilled = AssemblyOrder.objects.get(id=low['id'])
+        self.assertEqual(fulfilled.status, 'fulfilled')
+        self.assertEqual(fulfilled.produced_aircraft.aircraftpart_set.count(), 2)
+        self.assertEqual(self.stock_quantity(), 0)
+        self.assertEqual(ProducedAircraft.objects.count(), 2)
+
+    @override_settings(ASSEMBLY_ORDERS={'MAX_PER_TRIGGER': 1})
+    def test_fulfilment_per_trigger_is_capped_and_rest_left_to_command(self):
+        orders = [self.order(), self.order(), self.order()]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.produce_parts(6)
+        self.assertEqual(AssemblyOrder.objects.filter(status='fulfilled').count(), 1)
+
+        out = StringIO()
+        call_command('fulfil_orders', stdout=out)
+        self.assertIn('2 sipariş karşılandı', out.getvalue())
+        self.assertEqual(
+            set(AssemblyOrder.objects.filter(id__in=[order['id'] for order in orders]).values_list('status', flat=True)),
+            {'fulfilled'}
+        )
+        self.assertEqual(self.stock_quantity(), 0)
+
+    def test_unrelated_stock_does_not_touch_backlog(self):
+        self.order()
+        other = Aircraft.objects.create(name='AKINCI')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client_for(self.wing_user).post('/api/parts/', {
+                'part_type': self.wing.id, 'aircraft': other.id, 'stock': 2
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertFalse(AssemblyOrder.objects.filter(status='fulfilled').exists())
+
+    def test_cancel_and_team_check(self):
+        order = self.order()
+        response = self.client_for(self.wing_user).post(
+            '/api/assembly-orders/', {'aircraft': self.aircraft.id}, format='json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+        self.assertEqual(self.client.delete(f"/api/assembly-orders/{order['id']}/").status_code, 204)
+        self.assertEqual(AssemblyOrder.objects.get(id=order['id']).status, 'cancelled')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.produce_parts(2)
+        self.assertEqual(self.stock_quantity(), 2)
+
+    def test_update_writes_only_priority_and_aircraft_of_pending_order(self):
+        order = self.order()
+        url = f"/api/assembly-orders/{order['id']}/"
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.patch(url, {'priority': 3}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['priority'], 3)
+        # Eşzamanlı karşılamanın yazdığı durum üzerine yazılmaz
+        [sql] = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertNotIn('"status"', sql)
+
+        AssemblyOrder.objects.filter(id=order['id']).update(status='fulfilled')
+        self.assertEqual(self.client.patch(url, {'priority': 1}, format='json').status_code, 400)
+        self.assertEqual(AssemblyOrder.objects.get(id=order['id']).priority, 3)
+
+
+class PartReservationTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self.client_for(self.assembly_user)
+
+    def reserve(self, **data):
+        return self.client.post(
+            '/api/part-reservations/', {'aircraft': self.aircraft.id, **data}, format='json'
+        )
+
+    def test_reserved_parts_are_hidden_and_converted_with_constant_queries(self):
+        part_ids = self.produce_parts(3)
+        response = self.reserve(parts=part_ids[1:])
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(sorted(response.data['reserved_parts']), part_ids[1:])
+        self.assertEqual(self.stock_quantity(), 1)
+
+        # Ayrılan parçalar listelerde ve diğer montajlarda görünmez
+        visible = [part['id'] for part in self.client.get('/api/parts/').data]
+        self.assertEqual(visible, part_ids[:1])
+        self.assertEqual(self.produce_aircraft().status_code, 400)
+        self.assertEqual(self.reserve(parts=part_ids[:2]).status_code, 400)
+
+        convert_url = f"/api/part-reservations/{response.data['id']}/convert/"
+        with CaptureQueriesContext(connections['default']) as queries:
+            converted = self.client.post(convert_url)
+        self.assertEqual(converted.status_code, 201, converted.data)
+        self.assertEqual(sorted(part['part'] for part in converted.data['parts']), part_ids[1:])
+        self.assertEqual(PartReservation.objects.get(id=response.data['id']).status, 'converted')
+        self.assertEqual(self.stock_quantity(), 1)
+        self.assertEqual(self.client.post(convert_url).status_code, 400)
+
+        # Parça sayısı arttığında dönüştürme sorgu sayısı değişmez
+        AircraftPartRequirement.objects.filter(aircraft=self.aircraft).update(required_quantity=5)
+        self.produce_parts(4)
+        response = self.reserve()
+        self.assertEqual(response.status_code, 201, response.data)
+        with CaptureQueriesContext(connections['default']) as larger:
+            self.assertEqual(self.client.post(f"/api/part-reservations/{response.data['id']}/convert/").status_code, 201)
+        self.assertEqual(len(larger), len(queries))
+        self.assertEqual(self.stock_quantity(), 0)
+
+    def test_expired_reservations_are_released_by_sweep(self):
+        part_ids = self.produce_parts(2)
+        response = self.reserve()
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.stock_quantity(), 0)
+
+        PartReservation.objects.filter(id=response.data['id']).update(expires_at=timezone.now())
+        self.assertEqual(
+            self.client.post(f"/api/part-reservations/{response.data['id']}/convert/").status_code, 400
+        )
+        out = StringIO()
+        call_command('expire_reservations', stdout=out)
+        self.assertIn('1 rezervasyon bırakıldı', out.getvalue())
+        self.assertEqual(PartReservation.objects.get(id=response.data['id']).status, 'expired')
+        self.assertEqual(self.stock_quantity(), 2)
+        self.assertEqual(sorted(part['id'] for part in self.client.get('/api/parts/').data), part_ids)
+
+        # Bırakılan rezervasyon tekrar bırakılamaz, parçalar yeniden ayrılabilir
+        self.assertEqual(self.client.delete(f"/api/part-reservations/{response.data['id']}/").status_code, 400)
+        response = self.reserve()
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.client.delete(f"/api/part-reservations/{response.data['id']}/").status_code, 204)
+        self.assertEqual(self.stock_quantity(), 2)
+
+
+class CoalescingTest(ProductionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_identical_datatable_draws_share_one_computation(self):
+        self.produce_parts(2)
+        cache.clear()
+        client = self.client_for(self.assembly_user)
+        first = client.get('/api/datatable/parts/', {'draw': 1, 'length': 10, '_': 111})
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn(coalescing.COALESCED_HEADER, first)
+
+        with CaptureQueriesContext(connections['default']) as queries:
+            second = client.get('/api/datatable/parts/', {'draw': 7, 'length': 10, '_': 222})
+        self.assertEqual(second[coalescing.COALESCED_HEADER], 'true')
+        self.assertEqual(second.json(), {**first.json(), 'draw': 7})
+        self.assertFalse([query for query in queries if 'production_part"' in query['sql']])
+
+        # Farklı takım kapsamı ve farklı parametreler paylaşılmaz
+        reader = self.create_personnel('kanatci2', self.wing_team)
+        other = self.client_for(reader).get('/api/datatable/parts/', {'draw': 1, 'length': 10})
+        self.assertNotIn(coalescing.COALESCED_HEADER, other)
+        paged = client.get('/api/datatable/parts/', {'draw': 2, 'length': 1})
+        self.assertNotIn(coalescing.COALESCED_HEADER, paged)
+
+    def test_writer_reads_own_stock_changes(self):
+        client = self.client_for(self.assembly_user)
+        self.assertEqual(client.get('/api/part-stock/').data, [])
+        self.assertEqual(self.client_for(self.wing_user).get('/api/part-stock/')[coalescing.COALESCED_HEADER], 'true')
+
+        # Yazma yapan kullanıcı birincile sabitlenir ve paylaşılan sonucu kullanmaz
+        self.produce_parts(2)
+        response = self.client_for(self.wing_user).get('/api/part-stock/')
+        self.assertNotIn(coalescing.COALESCED_HEADER, response)
+        self.assertEqual(response.data[0]['stock_quantity'], 2)
+
+    def test_concurrent_identical_requests_wait_for_leader(self):
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        class View(coalescing.CoalescingMixin):
+            @coalescing.coalesced
+            def list(self, request):
+                calls.append(1)
+                started.set()
+                release.wait(5)
+                return Response({'count': len(calls)})
+
+        def request():
+            return Request(APIRequestFactory().get('/api/part-stock/'))
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(View().list(request())))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(View().list(request()))) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([response.data for response in results], [{'count': 1}] * 5)
+        self.assertEqual(sum(coalescing.COALESCED_HEADER in response for response in results), 4)
+
+
+class StartupProfileTest(TestCase):
+    def test_api_worker_starts_within_budget_without_lazy_modules(self):
+        out = StringIO()
+        # Bütçe aşılırsa veya ertelenen modüller açılışta yüklenirse komut hata verir
+        call_command('startup_profile', '--profile', 'api', '--json', '--check', stdout=out)
+        result = json.loads(out.getvalue())
+        self.assertEqual(result['status'], '401')
+        self.assertEqual(result['eager_lazy_modules'], [])
+        self.assertLessEqual(result['total_ms'], settings.STARTUP_PROFILE['BUDGET_MS'])
+        self.assertIn('django', result['packages'])
@@ -0,0 +1,177 @@
+"""
+Ağır uç noktalar için kullanıcı ve takım bazlı giriş kontrolü (admission control).
+
+Ağır (expensive) olarak işaretlenen okuma istekleri için:
+- kullanıcı ve takım başına token bucket hız sınırı,
+- kullanıcı, takım ve tüm sistem için eşzamanlı istek sınırı
+uygulanır. Sayaçlar Django cache'inde tutulduğu için, cache backend'i
+paylaşımlı olduğunda (Redis, Memcached) sınırlar tüm worker'lar arasında
+ortaktır. Reddedilen istekler DRF tarafından 429 ve `Retry-After` ile
+yanıtlanır.
+
+Yazma istekleri ve `critical_actions` (ör. parça ve uçak üretimi) hiçbir
+sınıra takılmaz. GLOBAL_READ_CONCURRENCY toplam worker kapasitesinin
+altında tutularak bu yollar için kapasite ayrılmış olur.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from .models import Personnel
+
+# Sızan (ör. worker çökmesi) eşzamanlılık sayaçlarının sıfırlanma süresi (sn)
+SLOT_TTL = 120
+TEAM_CACHE_TTL = 300
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_config():
+    return getattr(settings, 'ADMISSION_CONTROL', {})
+
+
+def parse_rate(rate):
+    """'60/min' biçimindeki oranı saniye başına token sayısına çevirir."""
+    if not rate:
+        return None
+    count, period = rate.split('/')
+    return int(count) / DURATIONS[period[0]]
+
+
+def is_expensive(request, view):
+    if request.method not in SAFE_METHODS:
+        return False
+    action = getattr(view, 'action', None)
+    if action is not None:
+        return action in getattr(view, 'expensive_actions', ())
+    return getattr(view, 'expensive', False)
+
+
+def is_critical(view):
+    return getattr(view, 'action', None) in getattr(view, 'critical_actions', ())
+
+
+def get_team_id(user):
+    key = f"admission:team:{user.pk}"
+    team_id = cache.get(key)
+    if team_id is None:
+        team_id = Personnel.objects.filter(user=user).values_list('team_id', flat=True).first() or 0
+        cache.set(key, team_id, TEAM_CACHE_TTL)
+    return team_id
+
+
+def increment(key, ttl):
+    """Sayacı atomik olarak artırır; anahtar yoksa `ttl` süreli oluşturur."""
+    cache.add(key, 0, ttl)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Anahtarın süresi add ile incr arasında dolmuş
+        cache.add(key, 1, ttl)
+        return 1
+
+
+def take_token(key, rate, burst, now):
+    """
+    Pencereli sayaçla token bucket: ilk istekle başlayan `burst / rate`
+    saniyelik pencerede en fazla `burst` istek kabul edilir, böylece
+    ortalama oran `rate` olur. Sayaç add/incr ile atomik artırıldığı için
+    eşzamanlı istekler (farklı worker'larda da) sınırı aşamaz; ardışık iki
+    pencerenin sınırında kısa süre için 2 * burst isteğe izin verilebilir.
+    Token yoksa pencerenin bitmesine kalan süreyi, varsa 0 döner.
+    """
+    window = burst / rate
+    ttl = max(1, math.ceil(window))
+    cache.add(f"{key}:start", now, ttl)
+    if increment(f"{key}:count", ttl) <= burst:
+        return 0
+    start = cache.get(f"{key}:start", now)
+    return max(start + window - now, 1 / rate)
+
+
+def acquire_slot(key, limit):
+    if increment(key, SLOT_TTL) > limit:
+        release_slot(key)
+        return False
+    return True
+
+
+def release_slot(key):
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass
+
+
+def release_admission(request):
+    """İstek bitince alınan eşzamanlılık slotlarını geri bırakır."""
+    for key in getattr(request, '_admission_slots', ()):
+        release_slot(key)
+    request._admission_slots = []
+
+
+class AdmissionControlThrottle(BaseThrottle):
+    """
+    Ağır okuma istekleri için token bucket ve eşzamanlılık sınırı.
+    Alınan slotlar view'in finalize_response metodunda
+    `release_admission` ile bırakılır (bkz. AdmissionControlMixin).
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        config = get_config()
+        if not config.get('ENABLED', False) or is_critical(view) or not is_expensive(request, view):
+            return True
+        if not request.user or not request.user.is_authenticated:
+            return True
+
+        now = time.time()
+        user_key = f"user:{request.user.pk}"
+        team_id = get_team_id(request.user)
+        # Takımı olmayan kullanıcılar ortak bir takım kovasını paylaşmaz
+        team_key = f"team:{team_id}" if team_id else None
+
+        buckets = (
+            (user_key, parse_rate(config.get('USER_RATE')), config.get('USER_BURST', 1)),
+            (team_key, parse_rate(config.get('TEAM_RATE')), config.get('TEAM_BURST', 1)),
+        )
+        for key, rate, burst in buckets:
+            if key and rate:
+                wait = take_token(f"admission:bucket:{key}", rate, burst, now)
+                if wait:
+                    self.wait_seconds = wait
+                    return False
+
+        limits = (
+            (f"admission:slots:{user_key}", config.get('USER_CONCURRENCY')),
+            (f"admission:slots:{team_key}", config.get('TEAM_CONCURRENCY') if team_key else None),
+            ("admission:slots:global", config.get('GLOBAL_READ_CONCURRENCY')),
+        )
+        acquired = []
+        for key, limit in limits:
+            if not limit:
+                continue
+            if not acquire_slot(key, limit):
+                for acquired_key in acquired:
+                    release_slot(acquired_key)
+                self.wait_seconds = 1
+                return False
+            acquired.append(key)
+        request._admission_slots = acquired
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AdmissionControlMixin:
+    """Eşzamanlılık slotlarını yanıt oluşturulduktan sonra bırakır."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        release_admission(request)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,102 @@
+"""
+JWT refresh token'ları ve önbellek tabanlı iptal listesi.
+
+Girişte access token ile birlikte bir refresh token verilir; access token
+süresi dolduğunda istemci parola doğrulaması olmadan refresh token ile
+yeni token alır. İki token da kullanıcının sahasını (`site` claim'i) taşır.
+
+İptal edilen refresh token'ların `jti` değerleri, token'ın süresi dolana
+kadar önbellekte tutulur. ROTATE_REFRESH_TOKENS ve BLACKLIST_AFTER_ROTATION
+açıkken her yenilemede eski token listeye eklenir; ekleme atomik olduğu
+için aynı token ile yapılan ikinci (veya eşzamanlı) yenileme reddedilir.
+Liste worker'lar arasında paylaşılmalıdır: süreç içi önbellekle iptal
+edilen token diğer worker'larda geçerli kalır. `check --deploy` bu durumda
+hata verir.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.checks import Error, Tags, register
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+BLACKLIST_KEY = 'jwt-blacklist:{}'
+
+# Sadece kendi sürecinde geçerli önbellek arka uçları
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.security, deploy=True)
+def check_shared_blacklist(app_configs, **kwargs):
+    if not (api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION):
+        return []
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        "Token iptal listesi süreç içi önbellekte tutuluyor; iptal edilen refresh "
+        "token'lar diğer worker'larda geçerli kalır.",
+        hint="CACHE_URL ile paylaşılan bir önbellek (Redis) tanımlayın.",
+        id='production.E001',
+    )]
+
+
+def issue_tokens(user, site):
+    refresh = RefreshToken.for_user(user)
+    # İstekler token'daki sahanın veritabanına yönlendirilir
+    refresh['site'] = site
+    return {'token': str(refresh.access_token), 'refresh': str(refresh)}
+
+
+def blacklist(token):
+    """
+    Token'ı süresi dolana kadar iptal listesine ekler. Token zaten
+    listedeyse False döner.
+    """
+    remaining = int(token['exp'] - time.time())
+    if remaining <= 0:
+        return False
+    return cache.add(BLACKLIST_KEY.format(token[api_settings.JTI_CLAIM]), 1, timeout=remaining)
+
+
+def is_blacklisted(token):
+    return cache.get(BLACKLIST_KEY.format(token[api_settings.JTI_CLAIM])) is not None
+
+
+def refresh_tokens(raw_token):
+    """
+    Refresh token ile yeni access token (ve rotasyon açıksa yeni refresh
+    token) üretir. Geçersiz, süresi dolmuş veya iptal edilmiş token'lar ve
+    pasif kullanıcılar için TokenError fırlatılır.
+    """
+    refresh = RefreshToken(raw_token)
+    if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+        if not blacklist(refresh):
+            raise TokenError('Token iptal edilmiş')
+    elif is_blacklisted(refresh):
+        raise TokenError('Token iptal edilmiş')
+
+    User = get_user_model()
+    if not User._default_manager.filter(
+        **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}, is_active=True
+    ).exists():
+        raise TokenError('Kullanıcı bulunamadı veya pasif')
+
+    data = {'token': str(refresh.access_token)}
+    if api_settings.ROTATE_REFRESH_TOKENS:
+        # `site` dahil diğer claim'ler korunur, yeni jti ve süre atanır
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        data['refresh'] = str(refresh)
+    return data
+
+
+def revoke(raw_token):
+    """Refresh token'ı iptal eder (çıkış)."""
+    blacklist(RefreshToken(raw_token))
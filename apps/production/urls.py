@@ -9,12 +9,24 @@ from .views import (
     ProducedAircraftViewSet,
     PersonnelRegisterView,
     PartTypeViewSet,
+    PartTypeComponentViewSet,
     AircraftPartViewSet,
     AircraftPartRequirementViewSet,
     LoginView,
+    TokenRefreshView,
+    LogoutView,
     PartStockViewSet,
-    TeamMateListView
+    AssemblyOrderViewSet,
+    PartReservationViewSet,
+    TeamMateListView,
+    ImportView,
+    PlanningView,
+    SiteReportView,
+    AuditView,
+    BatchView,
+    SyncView
 )
+from .events import event_stream
 
 # Router yapılandırması
 router = DefaultRouter()
@@ -24,9 +36,12 @@ router.register('teams', TeamViewSet)
 router.register('personnels', PersonnelViewSet)
 router.register('produced-aircrafts', ProducedAircraftViewSet)
 router.register('part-types', PartTypeViewSet)
+router.register('part-components', PartTypeComponentViewSet)
 router.register('aircraft-parts', AircraftPartViewSet)
 router.register('part-requirements', AircraftPartRequirementViewSet)
 router.register('part-stock', PartStockViewSet, basename='part-stock')
+router.register('assembly-orders', AssemblyOrderViewSet)
+router.register('part-reservations', PartReservationViewSet)
 
 # URL patterns
 urlpatterns = [
@@ -40,8 +55,31 @@ urlpatterns = [
     path('auth/', include([
         path('register/', PersonnelRegisterView.as_view(), name='register'),
         path('login/', LoginView.as_view(), name='login'),
+        path('refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+        path('logout/', LogoutView.as_view(), name='logout'),
     ])),
     
+    # Stok ve üretim değişiklik akışı (Server-Sent Events)
+    path('events/', event_stream, name='events'),
+    
+    # Delta senkronizasyonu
+    path('sync/', SyncView.as_view(), name='sync'),
+    
+    # CSV toplu veri aktarımı
+    path('import/<str:kind>/', ImportView.as_view(), name='import'),
+    
+    # Üretim kapasitesi planlaması
+    path('planning/optimize/', PlanningView.as_view(), name='planning-optimize'),
+    
+    # Sahalar arası rapor
+    path('reports/sites/', SiteReportView.as_view(), name='site-report'),
+    
+    # Denetim kayıtları
+    path('audit/', AuditView.as_view(), name='audit'),
+    
+    # Birden fazla API çağrısını tek istekte çalıştırma
+    path('batch/', BatchView.as_view(), name='batch'),
+    
     # DataTable endpoints
     path('datatable/', include([
         path('aircrafts/', AircraftViewSet.as_view({'get': 'datatable'}), name='aircraft-datatable'),
@@ -1,29 +1,102 @@
+import io
 from django.shortcuts import render, get_object_or_404
-from rest_framework_simplejwt.tokens import AccessToken
+from django.http import Http404, HttpResponse
+from django.utils.http import quote_etag
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework import viewsets, permissions, status, generics 
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import datetime, timedelta, timezone as dt_timezone
 from drf_yasg import openapi
-from django_datatables_view.base_datatable_view import BaseDatatableView
-from django.db.models import Q
+from django.db.models import Count, F, Q, Sum
 from django.contrib.auth import authenticate
-from drf_yasg.utils import swagger_auto_schema
+from django.conf import settings
+from django.contrib.auth.models import User
+from drf_yasg.utils import no_body, swagger_auto_schema
 from .models import (
     Aircraft, Part, Team, Personnel, ProducedAircraft,PartStock,
-    PartType, AircraftPart, AircraftPartRequirement, STATUS_CHOICES
+    PartType, AircraftPart, AircraftPartRequirement, ChangeLog, PartTypeComponent, AuditEntry, STATUS_CHOICES,
+    AssemblyOrder, PartReservation
 )
 from .serializers import (
     AircraftSerializer, PartSerializer, TeamSerializer, 
     PersonnelSerializer, ProducedAircraftSerializer,
     PersonnelRegisterSerializer, PartTypeSerializer,
-    AircraftPartRequirementSerializer, AircraftPartSerializer,LoginSerializer,LoginResponseSerializer,PartStockSerializer,TeamMateSerializer
+    AircraftPartRequirementSerializer, AircraftPartSerializer,LoginSerializer,LoginResponseSerializer,PartStockSerializer,TeamMateSerializer,
+    PartTypeComponentSerializer, AuditEntrySerializer, RefreshTokenSerializer, AssemblyOrderSerializer,
+    PartReservationSerializer
 )
+from .stock import apply_stock_deltas, count_stock_deltas
+from .importers import IMPORTERS, ImportRowError
+from .idempotency import idempotent
+from .events import publish_on_commit
+from .audit import AuditMixin
+from .fieldsets import FieldSelectionMixin
+from .changes import record_changes
+from .concurrency import OptimisticConcurrencyMixin, VersionConflict
+from .throttling import AdmissionControlMixin, get_team_id
+from .coalescing import CoalescingMixin, coalesced
+from .db_routers import ReplicaRoutingMixin
+from .sites import SiteMixin, get_current_site, scatter_gather, site_atomic
+from .bom import check_feasibility, get_bom
+from .assembly import assemble_aircraft, consume_parts, reserve_parts
+from .orders import fulfil_triggered
+from .reservations import (
+    ReservationError, convert_reservation, create_reservation, expire_reservations, release_reservations
+)
+from .batch import BatchError, execute, parse_sub_requests
+from .hashing import HashingBusy
+from .tokens import issue_tokens, refresh_tokens, revoke
+from . import render_cache
+
+# Toplu parça işlemlerinde tek istekte işlenebilecek en fazla parça sayısı
+BULK_MAX_PARTS = 5000
+
+# Toplu parça işlemlerinde kabul edilen filtreler
+BULK_FILTER_FIELDS = {
+    'part_type': 'part_type_id',
+    'aircraft': 'aircraft_id',
+    'status': 'status',
+}
+
+def get_scoped_parts(user, personnel=None):
+    """
+    Kullanıcının görebileceği parçalar: montaj takımı stoktaki tüm
+    parçaları, diğer takımlar kendi ürettikleri parçaları görür. Bir montaj
+    için ayrılmış parçalar rezervasyon bitene kadar kimseye görünmez.
+    """
+    try:
+        if personnel is None:
+            personnel = Personnel.objects.select_related('team').get(user=user)
+        if personnel.team.name == 'Montaj Takımı':
+            return Part.objects.filter(status='stock', is_deleted=False, reservation__isnull=True)
+        return Part.objects.filter(team=personnel.team, is_deleted=False, reservation__isnull=True)
+    except Personnel.DoesNotExist:
+        return Part.objects.none()
+
+
+def check_assembly_team(request, message):
+    """Kullanıcı montaj takımında değilse dönülecek hata yanıtı, aksi halde None."""
+    try:
+        personnel = Personnel.objects.select_related('team').get(user=request.user)
+    except Personnel.DoesNotExist:
+        return Response(
+            {"error": "Personel bilgisi bulunamadı"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    if personnel.team.name != 'Montaj Takımı':
+        return Response({"error": message}, status=status.HTTP_403_FORBIDDEN)
+    return None
 
-class BaseViewSet(viewsets.ModelViewSet):
+
+class BaseViewSet(FieldSelectionMixin, OptimisticConcurrencyMixin, AdmissionControlMixin, SiteMixin, ReplicaRoutingMixin,
+                  AuditMixin, CoalescingMixin, viewsets.ModelViewSet):
     """
     Tüm ViewSet'ler için temel sınıf.
     Bu sınıf, ortak authentication, permission ve silme işlemlerini içerir.
@@ -35,6 +108,12 @@ class BaseViewSet(viewsets.ModelViewSet):
     # Sadece giriş yapmış (authenticate olmuş) kullanıcıların erişimine izin verir
     permission_classes = [permissions.IsAuthenticated]
 
+    # Admission control: hız ve eşzamanlılık sınırına tabi ağır okuma işlemleri
+    expensive_actions = ('list', 'datatable')
+
+    # Admission control: hiçbir sınıra takılmayan kritik yazma işlemleri
+    critical_actions = ()
+
     def get_queryset(self):
         """
         Veritabanından kayıtları getirirken sadece silinmemiş
@@ -45,40 +124,12 @@ class BaseViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         """
         Soft delete işlemi gerçekleştirir.
-        Kaydı veritabanından silmek yerine is_deleted alanını True yapar.
-
+        Kaydı veritabanından silmek yerine is_deleted alanını True yapar;
+        sadece bu alan yazılır, sürümlü modellerde sürüm kontrol edilir.
         """
         instance.is_deleted = True
-        instance.save()
-
+        instance.save(update_fields=['is_deleted'])
 
-class BaseDataTableViewSet(BaseDatatableView):
-    authentication_classes = [JWTAuthentication]
-    permission_classes = [permissions.IsAuthenticated]
-    model = None
-    columns = []
-    order_columns = []
-    searchable_columns = []
-    
-    def get_initial_queryset(self):
-        return self.model.objects.filter(is_deleted=False)
-
-    def filter_queryset(self, qs):
-        search = self.request.GET.get('search[value]', None)
-        if search:
-            q = Q()
-            for column in self.searchable_columns:
-                q |= Q(**{f"{column}__icontains": search})
-            qs = qs.filter(q)
-        return qs
-
-    def render_response(self, data):
-        return Response({
-            'draw': int(self.request.GET.get('draw', 1)),
-            'recordsTotal': self.total_records,
-            'recordsFiltered': self.total_display_records,
-            'data': data
-        })
 
 class AircraftViewSet(BaseViewSet):
     
@@ -99,11 +150,52 @@ class AircraftViewSet(BaseViewSet):
         serializer = AircraftPartRequirementSerializer(requirements, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def bom(self, request, pk=None):
+        """
+        Uçağın alt montajlar dahil düzleştirilmiş ürün ağacını döndürür.
+        """
+        aircraft = self.get_object()
+        bom = get_bom(aircraft.id)
+        names = dict(PartType.objects.filter(id__in=list(bom['totals'])).values_list('id', 'name'))
+        return Response([
+            {
+                'part_type': part_type_id,
+                'part_type_name': names.get(part_type_id),
+                'quantity': bom['totals'][part_type_id],
+                'level': bom['levels'][part_type_id],
+                'is_assembly': part_type_id in bom['components'],
+            }
+            for part_type_id in bom['order']
+        ])
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('quantity', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Uçak adedi (varsayılan 1)"),
+        ]
+    )
+    @action(detail=True, methods=['get'])
+    def feasibility(self, request, pk=None):
+        """
+        Mevcut stokla `quantity` adet uçak üretilip üretilemeyeceğini,
+        stoktan kullanılacak ve bileşenlerinden üretilmesi gereken alt
+        montajları ve eksik parçaları döndürür.
+        """
+        try:
+            quantity = int(request.query_params.get('quantity', 1))
+        except ValueError:
+            quantity = 0
+        if quantity < 1:
+            return Response({'error': 'quantity en az 1 olmalıdır'}, status=status.HTTP_400_BAD_REQUEST)
+        aircraft = self.get_object()
+        return Response(check_feasibility(aircraft.id, quantity))
+
     @action(detail=False, methods=['get'])
     def datatable(self, request):
         """
         Uçak listesini DataTable formatında döndürür.
         """
+        from .datatables import AircraftDatatableView
         return AircraftDatatableView.as_view()(request)
 
 
@@ -111,21 +203,26 @@ class PartTypeViewSet(BaseViewSet):
     queryset = PartType.objects.all()
     serializer_class = PartTypeSerializer
 
+class PartTypeComponentViewSet(BaseViewSet):
+    """
+    Alt montajların bileşenleri (ürün ağacı).
+    """
+    queryset = PartTypeComponent.objects.all()
+    serializer_class = PartTypeComponentSerializer
+
 class PartViewSet(BaseViewSet):
     serializer_class = PartSerializer
+    critical_actions = ('create',)
 
     def get_queryset(self):
         """
         Kullanıcının yetkisine göre filtrelenmiş parça listesini döndürür.
         """
-        user = self.request.user
-        try:
-            personnel = Personnel.objects.select_related('team').get(user=user)
-            if personnel.team.name == 'Montaj Takımı':
-                return Part.objects.filter(status='stock', is_deleted=False)
-            return Part.objects.filter(team=personnel.team, is_deleted=False)
-        except Personnel.DoesNotExist:
-            return Part.objects.none()
+        return get_scoped_parts(self.request.user)
+
+    def get_coalescing_scope(self, request):
+        # Görünen parçalar kullanıcının takımına göre belirlenir
+        return f"team:{get_team_id(request.user)}"
 
     @swagger_auto_schema(
         request_body=openapi.Schema(
@@ -144,6 +241,7 @@ class PartViewSet(BaseViewSet):
             403: openapi.Response("User not authorized"),
         }
     )
+    @idempotent
     def create(self, request, *args, **kwargs):
         try:
             # Personel kontrolü
@@ -177,7 +275,7 @@ class PartViewSet(BaseViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            with transaction.atomic():
+            with site_atomic():
                 created_parts = []
                 
                 # PartStock güncelle - belirli aircraft için
@@ -198,9 +296,17 @@ class PartViewSet(BaseViewSet):
                     serializer = self.get_serializer(part)
                     created_parts.append(serializer.data)
 
-                # Stok miktarını güncelle
-                part_stock.stock_quantity += stock_count
-                part_stock.save()
+                publish_on_commit('part.created', {
+                    'ids': [part['id'] for part in created_parts],
+                    'part_type': part_type.id,
+                    'aircraft': aircraft.id,
+                }, team_id=personnel.team_id)
+
+                # Stok miktarını güncelle; eşzamanlı üretimler birbirini ezmesin diye
+                # sayaç veritabanında artırılır
+                apply_stock_deltas({(part_type.id, aircraft.id): stock_count})
+                part_stock.refresh_from_db(fields=['stock_quantity', 'version'])
+                record_changes('part', [part['id'] for part in created_parts], team_id=personnel.team_id)
 
                 return Response({
                     "message": f"{stock_count} adet parça başarıyla oluşturuldu",
@@ -229,24 +335,22 @@ class PartViewSet(BaseViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @idempotent
     def destroy(self, request, *args, **kwargs):
         try:
             part = self.get_object()
             
-            # Parça stokta ise, stok sayısını güncelle
-            if part.status == 'stock':
-                with transaction.atomic():
-                    part_stock = PartStock.objects.get(
-                        part_type=part.part_type,
-                        aircraft=part.aircraft
-                    )
-                    if part_stock.stock_quantity >= 0:
-                        part_stock.stock_quantity -= 1
-                        part_stock.save()
-
-            # Parçayı silmek yerine is_deleted'ı True yap
-            part.is_deleted = True
-            part.save()
+            with site_atomic():
+                # Parçayı silmek yerine is_deleted'ı True yap
+                part.is_deleted = True
+                part.deleted_at = timezone.now()
+                part.save()
+
+                # Parça stokta ise, stok sayısını güncelle
+                if part.status == 'stock':
+                    apply_stock_deltas({(part.part_type_id, part.aircraft_id): -1})
+                publish_on_commit('part.deleted', {'ids': [part.id]}, team_id=part.team_id)
+                record_changes('part', [part.id], team_id=part.team_id, deleted=True)
 
             return Response({
                 "message": "Parça başarıyla silindi",
@@ -257,6 +361,8 @@ class PartViewSet(BaseViewSet):
                 }
             }, status=status.HTTP_200_OK)
 
+        except (Http404, VersionConflict):
+            raise
         except Exception as e:
             return Response(
                 {"error": f"Parça silinirken bir hata oluştu: {str(e)}"},
@@ -264,28 +370,271 @@ class PartViewSet(BaseViewSet):
             )
 
     @action(detail=True, methods=['post'])
+    @idempotent
     def update_status(self, request, pk=None):
         part = self.get_object()
         new_status = request.data.get('status')
         if new_status in dict(STATUS_CHOICES):
-            part.status = new_status
-            part.save()
+            with site_atomic():
+                # Stoğa giren/stoktan çıkan parça için stok sayacını güncelle
+                if part.status != new_status:
+                    apply_stock_deltas(count_stock_deltas(
+                        [{'part_type_id': part.part_type_id, 'aircraft_id': part.aircraft_id}],
+                        1 if new_status == 'stock' else -1
+                    ))
+                part.status = new_status
+                part.save()
+                publish_on_commit('part.status', {'ids': [part.id], 'status': new_status}, team_id=part.team_id)
+                record_changes('part', [part.id], team_id=part.team_id)
             return Response({'status': 'başarılı'})
         return Response(
             {'error': 'Geçersiz status değeri'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    def get_bulk_targets(self, request):
+        """
+        Toplu işlemlerin hedef parçalarını kilitleyerek seçer.
+        `ids` listesi veya `filters` sözlüğü kabul edilir; takım yetkisi
+        get_queryset üzerinden doğrudan SQL'de uygulanır.
+        (parçalar, istenen id'ler, hata mesajı) üçlüsü döner.
+        """
+        ids = request.data.get('ids')
+        filters = request.data.get('filters')
+        queryset = self.get_queryset()
+
+        if ids is not None:
+            if not isinstance(ids, list) or not all(type(part_id) is int for part_id in ids):
+                return None, None, "ids bir tam sayı listesi olmalıdır"
+            queryset = queryset.filter(id__in=ids)
+        elif isinstance(filters, dict) and filters:
+            unknown = set(filters) - set(BULK_FILTER_FIELDS)
+            if unknown:
+                return None, None, f"Geçersiz filtre alanları: {', '.join(sorted(unknown))}"
+            for key, value in filters.items():
+                if key == 'status':
+                    if not isinstance(value, str) or value not in dict(STATUS_CHOICES):
+                        return None, None, f"Geçersiz durum: {value}"
+                elif type(value) is not int:
+                    return None, None, f"{key} bir tam sayı olmalıdır"
+            queryset = queryset.filter(**{
+                BULK_FILTER_FIELDS[key]: value for key, value in filters.items()
+            })
+        else:
+            return None, None, "ids veya filters alanı gereklidir"
+
+        parts = list(
+            queryset.order_by('id').select_for_update()
+            .values('id', 'part_type_id', 'aircraft_id', 'team_id', 'status')[:BULK_MAX_PARTS + 1]
+        )
+        if len(parts) > BULK_MAX_PARTS:
+            return None, None, f"Tek istekte en fazla {BULK_MAX_PARTS} parça işlenebilir"
+        return parts, ids, None
+
+    @staticmethod
+    def notify_part_changes(event_type, parts, deleted=False, **data):
+        """
+        Parça değişikliklerini takım bazında yayınlar ve değişiklik
+        günlüğüne yazar; her takım sadece kendi parçalarını görür.
+        """
+        ids_by_team = {}
+        for part in parts:
+            ids_by_team.setdefault(part['team_id'], []).append(part['id'])
+        for team_id, ids in ids_by_team.items():
+            publish_on_commit(event_type, {'ids': ids, **data}, team_id=team_id)
+            record_changes('part', ids, team_id=team_id, deleted=deleted)
+
+    @staticmethod
+    def get_not_found(ids, parts):
+        if ids is None:
+            return []
+        found = {part['id'] for part in parts}
+        return sorted(set(ids) - found)
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "status": openapi.Schema(type=openapi.TYPE_STRING, description="Yeni parça durumu"),
+                "ids": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                "filters": openapi.Schema(type=openapi.TYPE_OBJECT, description="part_type, aircraft, status"),
+            },
+            required=["status"]
+        )
+    )
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def bulk_status(self, request):
+        """
+        Birden fazla parçanın durumunu tek UPDATE ile değiştirir ve
+        etkilenen stok sayaçlarını tek gruplu UPDATE ile günceller.
+        """
+        new_status = request.data.get('status')
+        if new_status not in dict(STATUS_CHOICES):
+            return Response(
+                {'error': 'Geçersiz status değeri'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with site_atomic():
+            parts, ids, error = self.get_bulk_targets(request)
+            if error:
+                return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+            changed = [part for part in parts if part['status'] != new_status]
+            Part.objects.filter(id__in=[part['id'] for part in changed]).update(
+                status=new_status,
+                version=F('version') + 1
+            )
+            apply_stock_deltas(count_stock_deltas(changed, 1 if new_status == 'stock' else -1))
+            self.notify_part_changes('part.status', changed, status=new_status)
+
+        changed_ids = {part['id'] for part in changed}
+        return Response({
+            'status': new_status,
+            'updated': sorted(changed_ids),
+            'unchanged': sorted(part['id'] for part in parts if part['id'] not in changed_ids),
+            'not_found': self.get_not_found(ids, parts),
+        })
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "ids": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                "filters": openapi.Schema(type=openapi.TYPE_OBJECT, description="part_type, aircraft, status"),
+            }
+        )
+    )
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def bulk_delete(self, request):
+        """
+        Birden fazla parçayı tek UPDATE ile soft delete yapar ve stoktaki
+        parçaların sayaçlarını tek gruplu UPDATE ile düşürür.
+        """
+        with site_atomic():
+            parts, ids, error = self.get_bulk_targets(request)
+            if error:
+                return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+            Part.objects.filter(id__in=[part['id'] for part in parts]).update(
+                is_deleted=True,
+                deleted_at=timezone.now(),
+                version=F('version') + 1
+            )
+            apply_stock_deltas(count_stock_deltas(
+                [part for part in parts if part['status'] == 'stock'], -1
+            ))
+            self.notify_part_changes('part.deleted', parts, deleted=True)
+
+        return Response({
+            'deleted': [part['id'] for part in parts],
+            'not_found': self.get_not_found(ids, parts),
+        })
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "part_type": openapi.Schema(type=openapi.TYPE_INTEGER, description="Alt montaj parça tipi ID"),
+                "aircraft": openapi.Schema(type=openapi.TYPE_INTEGER, description="Aircraft ID"),
+                "quantity": openapi.Schema(type=openapi.TYPE_INTEGER, description="Üretilecek adet", default=1),
+            },
+            required=["part_type", "aircraft"]
+        )
+    )
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def assemble(self, request):
+        """
+        Stoktaki bileşen parçalardan alt montaj (ör. kirişler ve sinirlerden
+        kanat) üretir. Bileşenler uçak üretimindeki gibi stoktan düşülür ve
+        üretilen montaj parçaları stoğa eklenir.
+        """
+        try:
+            personnel = Personnel.objects.select_related('team').get(user=request.user)
+        except Personnel.DoesNotExist:
+            return Response({"error": "Personel bilgisi bulunamadı"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            quantity = int(request.data.get('quantity', 1))
+            aircraft = Aircraft.objects.get(id=request.data.get('aircraft'))
+            part_type = PartType.objects.get(id=request.data.get('part_type'))
+        except (TypeError, ValueError, Aircraft.DoesNotExist, PartType.DoesNotExist):
+            return Response(
+                {"error": "Geçersiz Aircraft ID, Part Type ID veya quantity"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if quantity < 1:
+            return Response({"error": "quantity en az 1 olmalıdır"}, status=status.HTTP_400_BAD_REQUEST)
+        if personnel.team.responsible_part_id != part_type.id:
+            return Response(
+                {"error": f"{personnel.team.name} takımı bu parçayı üretemez"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        components = list(
+            PartTypeComponent.objects.filter(parent=part_type, is_deleted=False).select_related('component')
+        )
+        if not components:
+            return Response(
+                {"error": f"{part_type.name} bir alt montaj değil"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with site_atomic():
+            reserved, missing_parts = reserve_parts(
+                aircraft,
+                {component.component_id: component.component for component in components},
+                {component.component_id: component.quantity * quantity for component in components}
+            )
+            if missing_parts:
+                return Response({
+                    'error': 'Stokta yeterli parça bulunmuyor',
+                    'missing_parts': missing_parts
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            assemblies = Part.objects.bulk_create([
+                Part(part_type=part_type, aircraft=aircraft, team=personnel.team, status='stock')
+                for _ in range(quantity)
+            ])
+            # Her montaja kendi bileşenleri bağlanır
+            for component in components:
+                for index, part in enumerate(reserved[component.component_id]):
+                    part.assembled_into = assemblies[index // component.quantity]
+            consume_parts(aircraft, [part for parts in reserved.values() for part in parts], timezone.now())
+
+            PartStock.objects.get_or_create(part_type=part_type, aircraft=aircraft)
+            apply_stock_deltas({(part_type.id, aircraft.id): quantity})
+            assembly_ids = [part.id for part in assemblies]
+            publish_on_commit('part.created', {
+                'ids': assembly_ids,
+                'part_type': part_type.id,
+                'aircraft': aircraft.id,
+            }, team_id=personnel.team_id)
+            record_changes('part', assembly_ids, team_id=personnel.team_id)
+
+        return Response({
+            'parts': self.get_serializer(assemblies, many=True).data,
+            'consumed': {
+                component.component_id: component.quantity * quantity for component in components
+            },
+        }, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'])
+    @coalesced
     def datatable(self, request):
+        from .datatables import PartDatatableView
         return PartDatatableView.as_view()(request)
 
-class TeamMateListView(generics.ListAPIView):
+class TeamMateListView(AdmissionControlMixin, generics.ListAPIView):
     """
     Giriş yapmış kullanıcının aynı takımındaki diğer personelleri listeler.
     """
     serializer_class = TeamMateSerializer
     permission_classes = [IsAuthenticated]
+    expensive = True
     
     def get_queryset(self):
         # Giriş yapmış kullanıcının Personnel kaydını bul
@@ -338,9 +687,68 @@ class PersonnelViewSet(BaseViewSet):
 
 
 class ProducedAircraftViewSet(BaseViewSet):
-    queryset = ProducedAircraft.objects.all()
+    # Arşive taşınmış parçalar da tek sorguda çözülsün diye her iki ilişki önceden yüklenir
+    queryset = ProducedAircraft.objects.select_related('aircraft').prefetch_related(
+        'aircraftpart_set__part__part_type',
+        'aircraftpart_set__archived_part__part_type',
+    )
     serializer_class = ProducedAircraftSerializer
+    critical_actions = ('create',)
+    expand_prefetches = {
+        'parts': ('aircraftpart_set__part__part_type', 'aircraftpart_set__archived_part__part_type'),
+    }
+
+    def use_render_cache(self, request):
+        # Alan seçimi yapılan istekler önbellekteki tam çıktıyı kullanamaz
+        return 'fields' not in request.query_params and 'expand' not in request.query_params
+
+    def retrieve(self, request, *args, **kwargs):
+        """Önbellekteki uçak veritabanına gitmeden JSON baytları olarak döner."""
+        if not self.use_render_cache(request):
+            return super().retrieve(request, *args, **kwargs)
+        try:
+            pk = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except (KeyError, ValueError):
+            return super().retrieve(request, *args, **kwargs)
+
+        cached = render_cache.get_many([pk]).get(pk)
+        if cached is not None:
+            version, body = cached
+            return HttpResponse(body, content_type='application/json', headers={'ETag': quote_etag(str(version))})
+
+        response = super().retrieve(request, *args, **kwargs)
+        if render_cache.is_cacheable_read(self.get_queryset()):
+            render_cache.store(render_cache.render_entries([response.data]))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """Liste, önbellekteki kayıtların birleştirilmesiyle oluşturulur; eksikler tek sorguda üretilir."""
+        if not self.use_render_cache(request) or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ids = list(queryset.values_list('id', flat=True))
+        entries = render_cache.get_many(ids)
+        missing = [pk for pk in ids if pk not in entries]
+        if missing:
+            rendered = render_cache.render_entries(
+                self.get_serializer(queryset.filter(id__in=missing), many=True).data
+            )
+            if render_cache.is_cacheable_read(queryset):
+                render_cache.store(rendered)
+            entries.update(rendered)
+        body = b'[' + b','.join(entries[pk][1] for pk in ids if pk in entries) + b']'
+        return HttpResponse(body, content_type='application/json')
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        render_cache.invalidate([serializer.instance.pk])
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        render_cache.invalidate([instance.pk])
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         
         try:
@@ -352,69 +760,15 @@ class ProducedAircraftViewSet(BaseViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            with transaction.atomic():
+            with site_atomic():
                 # Üretilecek uçak modelini al
                 aircraft = get_object_or_404(
                     Aircraft, 
                     id=request.data.get('aircraft')
                 )
                 
-                # Uçak için gerekli parça gereksinimlerini al
-                requirements = AircraftPartRequirement.objects.filter(
-                    aircraft=aircraft
-                ).select_related('part_type')
-                
-                # Stok kontrolü ve kullanılacak parçaları topla
-                missing_parts = []
-                parts_to_use = {}  # Her part_type için kullanılacak parçaları tutacak
-
-                for requirement in requirements:
-                    try:
-                        # Aircraft'a özel stok kontrolü
-                        part_stock = PartStock.objects.get(
-                            part_type=requirement.part_type,
-                            aircraft=aircraft
-                        )
-                        
-                        # Stokta yeterli parça var mı kontrol et
-                        if part_stock.stock_quantity < requirement.required_quantity:
-                            missing_parts.append({
-                                'part_type': requirement.part_type.name,
-                                'aircraft': aircraft.name,
-                                'required': requirement.required_quantity,
-                                'available': part_stock.stock_quantity,
-                                'missing': requirement.required_quantity - part_stock.stock_quantity
-                            })
-                            continue
-
-                        # Kullanılacak parçaları bul
-                        available_parts = Part.objects.filter(
-                            part_type=requirement.part_type,
-                            aircraft=aircraft,
-                            status='stock',
-                            is_deleted=False
-                        )[:requirement.required_quantity]
-
-                        if len(available_parts) < requirement.required_quantity:
-                            missing_parts.append({
-                                'part_type': requirement.part_type.name,
-                                'aircraft': aircraft.name,
-                                'required': requirement.required_quantity,
-                                'available': len(available_parts),
-                                'missing': requirement.required_quantity - len(available_parts)
-                            })
-                            continue
-
-                        parts_to_use[requirement.part_type.id] = list(available_parts)
-
-                    except PartStock.DoesNotExist:
-                        missing_parts.append({
-                            'part_type': requirement.part_type.name,
-                            'aircraft': aircraft.name,
-                            'required': requirement.required_quantity,
-                            'available': 0,
-                            'missing': requirement.required_quantity
-                        })
+                # Stok kontrolü, parça tüketimi ve uçak kaydı
+                produced_aircraft, missing_parts = assemble_aircraft(aircraft)
 
                 # Eksik parça varsa hata dön
                 if missing_parts:
@@ -423,35 +777,8 @@ class ProducedAircraftViewSet(BaseViewSet):
                         'missing_parts': missing_parts
                     }, status=status.HTTP_400_BAD_REQUEST)
 
-                # Tüm gereksinimler karşılanıyorsa uçağı üret
-                produced_aircraft = ProducedAircraft.objects.create(
-                    aircraft=aircraft
-                )
-
-                # Her parça tipi için gerekli sayıda parçayı kullan
-                for requirement in requirements:
-                    # Aircraft'a özel stok güncelleme
-                    part_stock = PartStock.objects.get(
-                        part_type=requirement.part_type,
-                        aircraft=aircraft
-                    )
-                    part_stock.stock_quantity -= requirement.required_quantity
-                    part_stock.save()
-
-                    # Kullanılan parçaları işaretle ve AircraftPart oluştur
-                    for part in parts_to_use[requirement.part_type.id]:
-                        # Parçayı kullanıldı olarak işaretle
-                        part.is_deleted = True
-
-                        part.save()
-
-                        # Parçayı üretilen uçağa bağla
-                        AircraftPart.objects.create(
-                            produced_aircraft=produced_aircraft,
-                            part=part
-                        )
-
                 serializer = self.get_serializer(produced_aircraft)
+                render_cache.store_on_commit(render_cache.render_entries([serializer.data]))
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         except Personnel.DoesNotExist:
@@ -465,6 +792,184 @@ class ProducedAircraftViewSet(BaseViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+class AssemblyOrderViewSet(BaseViewSet):
+    """
+    Montaj siparişleri. Stokla hemen karşılanamayan siparişler bekler ve
+    gerekli parçaların stoğu arttığında öncelik sırasıyla otomatik
+    karşılanır.
+    """
+    queryset = AssemblyOrder.objects.select_related('aircraft')
+    serializer_class = AssemblyOrderSerializer
+    http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Şema üretiminde istek olmayabilir (bkz. generate_schema)
+        if getattr(self, 'swagger_fake_view', False):
+            return queryset
+        order_status = self.request.query_params.get('status')
+        if order_status:
+            queryset = queryset.filter(status=order_status)
+        return queryset.order_by('-priority', 'id')
+
+    @swagger_auto_schema(
+        operation_description="Montaj siparişi verir; stok yeterliyse sipariş hemen karşılanır",
+        request_body=AssemblyOrderSerializer,
+        responses={201: AssemblyOrderSerializer, 403: 'Yetkisiz işlem'}
+    )
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        error = check_assembly_team(request, "Sadece montaj takımı sipariş verebilir")
+        if error is not None:
+            return error
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with site_atomic():
+            order = serializer.save(requested_by=request.user)
+            publish_on_commit('assembly_order.created', {
+                'id': order.id,
+                'aircraft': order.aircraft_id,
+                'priority': order.priority,
+            })
+
+        # Daha öncelikli bekleyen siparişler varsa önce onlar karşılanır
+        fulfil_triggered([order.aircraft_id])
+        order.refresh_from_db()
+        return Response(self.get_serializer(order).data, status=status.HTTP_201_CREATED)
+
+    def update(self, request, *args, **kwargs):
+        error = check_assembly_team(request, "Sadece montaj takımı sipariş verebilir")
+        if error is not None:
+            return error
+        partial = kwargs.pop('partial', False)
+        pk = self.get_object().pk
+        with site_atomic():
+            # Karşılama aynı anda siparişi kilitleyip durumunu değiştirebilir
+            order = AssemblyOrder.objects.select_for_update().get(pk=pk)
+            if order.status != 'pending':
+                return Response(
+                    {"error": "Sadece bekleyen siparişler güncellenebilir"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            serializer = self.get_serializer(order, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            fields = [field for field in ('priority', 'aircraft') if field in serializer.validated_data]
+            for field in fields:
+                setattr(order, field, serializer.validated_data[field])
+            order.save(update_fields=fields)
+        return Response(self.get_serializer(order).data)
+
+    def destroy(self, request, *args, **kwargs):
+        """Bekleyen siparişi iptal eder; karşılanmış siparişler iptal edilemez."""
+        error = check_assembly_team(request, "Sadece montaj takımı sipariş verebilir")
+        if error is not None:
+            return error
+        pk = self.get_object().pk
+        with site_atomic():
+            order = AssemblyOrder.objects.select_for_update().get(pk=pk)
+            if order.status != 'pending':
+                return Response(
+                    {"error": "Karşılanmış sipariş iptal edilemez"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            order.status = 'cancelled'
+            order.is_deleted = True
+            order.save(update_fields=['status', 'is_deleted'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class PartReservationViewSet(BaseViewSet):
+    """
+    Planlanan uçaklar için parça rezervasyonları. Ayrılan parçalar süre
+    dolana kadar başka montajlarda kullanılamaz; `convert` ile rezervasyon
+    sabit sayıda sorgu ile üretilen uçağa dönüşür.
+    """
+    queryset = PartReservation.objects.select_related('aircraft').prefetch_related('parts')
+    serializer_class = PartReservationSerializer
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Şema üretiminde istek olmayabilir (bkz. generate_schema)
+        if getattr(self, 'swagger_fake_view', False):
+            return queryset
+        reservation_status = self.request.query_params.get('status')
+        if reservation_status:
+            queryset = queryset.filter(status=reservation_status)
+        return queryset.order_by('-id')
+
+    def reservation_error(self, error):
+        data = {'error': str(error)}
+        if error.missing_parts:
+            data['missing_parts'] = error.missing_parts
+        return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+    @swagger_auto_schema(
+        operation_description="Uçağın gereksinimlerini karşılayan parçaları ayırır",
+        request_body=PartReservationSerializer,
+        responses={201: PartReservationSerializer, 400: 'Parçalar ayrılamadı', 403: 'Yetkisiz işlem'}
+    )
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        error = check_assembly_team(request, "Sadece montaj takımı parça ayırabilir")
+        if error is not None:
+            return error
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Süresi dolan rezervasyonların parçaları önce stoğa döner
+        expire_reservations()
+        try:
+            with site_atomic():
+                reservation = create_reservation(
+                    serializer.validated_data['aircraft'],
+                    request.user,
+                    serializer.validated_data.get('parts')
+                )
+        except ReservationError as e:
+            return self.reservation_error(e)
+        return Response(self.get_serializer(reservation).data, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_description="Rezervasyondaki parçalarla uçak üretir",
+        request_body=no_body,
+        responses={201: ProducedAircraftSerializer, 400: 'Rezervasyon aktif değil veya süresi dolmuş'}
+    )
+    @action(detail=True, methods=['post'])
+    @idempotent
+    def convert(self, request, pk=None):
+        error = check_assembly_team(request, "Sadece montaj takımı uçak üretebilir")
+        if error is not None:
+            return error
+        pk = self.get_object().pk
+        try:
+            with site_atomic():
+                produced_aircraft = convert_reservation(PartReservation.objects.select_for_update().get(pk=pk))
+                # Yanıt, uçak listesiyle aynı önceden yükleme ile sabit sayıda sorguda üretilir
+                data = ProducedAircraftSerializer(
+                    ProducedAircraftViewSet.queryset.get(pk=produced_aircraft.pk),
+                    context=self.get_serializer_context()
+                ).data
+                render_cache.store_on_commit(render_cache.render_entries([data]))
+        except ReservationError as e:
+            return self.reservation_error(e)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def destroy(self, request, *args, **kwargs):
+        """Aktif rezervasyonu bırakır; parçalar stoğa geri döner."""
+        error = check_assembly_team(request, "Sadece montaj takımı rezervasyon bırakabilir")
+        if error is not None:
+            return error
+        pk = self.get_object().pk
+        with site_atomic():
+            reservation = PartReservation.objects.select_for_update().get(pk=pk)
+            if reservation.status != 'active':
+                return Response(
+                    {"error": "Sadece aktif rezervasyonlar bırakılabilir"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            release_reservations([reservation], 'released')
+            PartReservation.objects.filter(pk=pk).update(is_deleted=True)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 class LoginView(APIView):
     """
     Kullanıcı adı ve şifre ile kimlik doğrulama yaparak JWT token üretir.
@@ -486,22 +991,28 @@ class LoginView(APIView):
         if serializer.is_valid():
             username = serializer.validated_data['username']
             password = serializer.validated_data['password']
-            
-            user = authenticate(username=username, password=password)
-            
+
+            # Parola, isteği işleyen iş parçacığını meşgul etmeden süreç havuzunda
+            # doğrulanır (bkz. hashing.PooledPasswordBackend)
+            try:
+                user = authenticate(request, username=username, password=password)
+            except HashingBusy:
+                return Response(
+                    {'error': 'Çok fazla giriş isteği var, lütfen tekrar deneyin'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={'Retry-After': '1'}
+                )
+
             if user is not None:
                 try:
-                    personnel = Personnel.objects.get(user=user)
-                    # Sadece access token oluştur
-                    token = AccessToken.for_user(user)
-                    
+                    personnel = Personnel.objects.select_related('team').get(user=user)
+                    personnel.user = user
+
                     response_data = LoginResponseSerializer(personnel).data
-                    response_data.update({
-                        'token': str(token)
-                    })
-                    
+                    response_data.update(issue_tokens(user, personnel.team.site))
+
                     return Response(response_data, status=status.HTTP_200_OK)
-                    
+
                 except Personnel.DoesNotExist:
                     return Response(
                         {'error': 'Personel kaydı bulunamadı'}, 
@@ -515,6 +1026,44 @@ class LoginView(APIView):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+class TokenRefreshView(APIView):
+    """
+    Refresh token ile parola doğrulaması yapmadan yeni access token üretir.
+    Rotasyon açıksa yeni bir refresh token döner ve eskisi iptal edilir.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    @swagger_auto_schema(
+        request_body=RefreshTokenSerializer,
+        responses={200: RefreshTokenSerializer, 401: 'Unauthorized - Geçersiz veya iptal edilmiş token'}
+    )
+    def post(self, request):
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            data = refresh_tokens(serializer.validated_data['refresh'])
+        except TokenError as e:
+            return Response({'error': str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class LogoutView(APIView):
+    """Refresh token'ı iptal eder."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    @swagger_auto_schema(request_body=RefreshTokenSerializer, responses={204: 'No Content'})
+    def post(self, request):
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            revoke(serializer.validated_data['refresh'])
+        except TokenError as e:
+            return Response({'error': str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 class PartStockViewSet(BaseViewSet):
     """
     Parça stoklarının yönetimi
@@ -524,7 +1073,16 @@ class PartStockViewSet(BaseViewSet):
     queryset = PartStock.objects.all()
     serializer_class = PartStockSerializer
 
+    def get_coalescing_scope(self, request):
+        # Stok listesi kullanıcıdan bağımsızdır; sahadaki herkes aynı yanıtı alır
+        return 'all'
+
+    @coalesced
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(detail=False, methods=['post'])
+    @idempotent
     def add_stock(self, request):
         """
         Belirtilen parça tipine stok ekler.
@@ -536,8 +1094,7 @@ class PartStockViewSet(BaseViewSet):
         try:
             part_type = PartType.objects.get(id=part_type_id)
             part_stock, created = PartStock.objects.get_or_create(part_type=part_type)
-            part_stock.stock_quantity += int(quantity)
-            part_stock.save()
+            apply_stock_deltas({(part_type.id, part_stock.aircraft_id): int(quantity)})
             return Response({'status': 'Stok güncellendi'})
         except PartType.DoesNotExist:
             return Response(
@@ -546,9 +1103,414 @@ class PartStockViewSet(BaseViewSet):
             )
 
 
+class SyncView(SiteMixin, APIView):
+    """
+    Delta senkronizasyonu: `since` imlecinden sonra değişen parça, stok ve
+    üretilen uçak kayıtlarını, silinenler için tombstone listesini ve yeni
+    imleci döndürür. Sorgu değişiklik günlüğünün birincil anahtarı
+    üzerinden çalışır.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    default_limit = 1000
+    max_limit = 5000
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Son alınan imleç (ilk senkronizasyon için 0)"),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="En fazla değişiklik sayısı"),
+        ]
+    )
+    def get(self, request):
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response(
+                {'error': 'since ve limit tam sayı olmalıdır'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            personnel = Personnel.objects.select_related('team').get(user=request.user)
+        except Personnel.DoesNotExist:
+            return Response(
+                {"error": "Personel bilgisi bulunamadı"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        entries = list(ChangeLog.objects.filter(seq__gt=since).order_by('seq')[:limit + 1])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        cursor = self.get_next_cursor(since, entries)
+
+        if any(entry.model == 'reset' for entry in entries):
+            # İstemci tüm listeleri yeniden yükler ve en son imleçten devam eder
+            latest = ChangeLog.objects.order_by('-seq').values_list('seq', flat=True).first()
+            return Response({'cursor': latest, 'has_more': False, 'reset': True})
+
+        changed = {'part': {}, 'stock': {}, 'produced_aircraft': {}}
+        for entry in entries:
+            changed[entry.model][entry.object_id] = entry
+
+        return Response({
+            'cursor': cursor,
+            'has_more': has_more,
+            'reset': False,
+            'parts': self.get_part_changes(personnel, changed['part']),
+            'stock': self.get_changes(
+                PartStock.objects.select_related('part_type', 'aircraft'),
+                PartStockSerializer, changed['stock']
+            ),
+            'produced_aircrafts': self.get_changes(
+                ProducedAircraftViewSet.queryset, ProducedAircraftSerializer,
+                changed['produced_aircraft']
+            ),
+        })
+
+    def get_next_cursor(self, since, entries):
+        """
+        Sıra numaraları transaction içinde alındığı için henüz commit
+        edilmemiş bir işlem günlükte boşluk bırakabilir. Yeni kayıtlardan
+        önceki boşluklarda imleç ilerletilmez; bu kayıtlar sonraki istekte
+        tekrar gönderilir. Eski boşluklar geri alınmış işlemlerdir.
+        """
+        settle_before = timezone.now() - timedelta(seconds=5)
+        cursor = since
+        for entry in entries:
+            if entry.seq != cursor + 1 and entry.created_at > settle_before:
+                break
+            cursor = entry.seq
+        return cursor
+
+    def get_part_changes(self, personnel, changed):
+        visible = get_scoped_parts(personnel.user, personnel).filter(
+            id__in=list(changed)
+        ).select_related('part_type', 'aircraft', 'team')
+        updated = PartSerializer(visible, many=True).data
+        updated_ids = {part['id'] for part in updated}
+        # Kapsamdan çıkan parçalar için tombstone, diğer takımların parça id'leri hariç
+        is_assembly = personnel.team.name == 'Montaj Takımı'
+        deleted = sorted(
+            object_id for object_id, entry in changed.items()
+            if object_id not in updated_ids and (is_assembly or entry.team_id == personnel.team_id)
+        )
+        return {'updated': updated, 'deleted': deleted}
+
+    def get_changes(self, queryset, serializer_class, changed):
+        rows = queryset.filter(id__in=list(changed), is_deleted=False)
+        updated = serializer_class(rows, many=True).data
+        updated_ids = {row['id'] for row in updated}
+        return {
+            'updated': updated,
+            'deleted': sorted(set(changed) - updated_ids),
+        }
+
+
+class ImportView(AuditMixin, SiteMixin, APIView):
+    """
+    CSV dosyasından toplu veri aktarımı.
+    `requirements`: uçak parça gereksinimleri, `parts`: parça envanteri,
+    `personnel`: toplu personel kaydı (son ikisi sadece staff kullanıcılar).
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True, description="CSV dosyası"),
+        ]
+    )
+    def post(self, request, kind):
+        importer_class = IMPORTERS.get(kind)
+        if importer_class is None:
+            return Response(
+                {'error': f"Geçersiz aktarım tipi: {kind}"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if importer_class.staff_only and not request.user.is_staff:
+            return Response(
+                {'error': 'Bu aktarım için yetkiniz yok'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file alanı gereklidir'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Yüklenen dosya diskten/bellekten satır satır okunur
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            result = importer_class().run(stream)
+        except ImportRowError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except UnicodeDecodeError:
+            return Response({'error': 'Dosya UTF-8 formatında olmalıdır'}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            stream.detach()
+
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class PlanningView(SiteMixin, APIView):
+    """
+    Hedef üretim karmasına göre mevcut stoktan üretilebilecek uçakları ve
+    takımların üretmesi gereken parçaları hesaplar.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    max_target = 10000
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "targets": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "aircraft": openapi.Schema(type=openapi.TYPE_INTEGER, description="Aircraft ID"),
+                            "quantity": openapi.Schema(type=openapi.TYPE_INTEGER, description="Hedef adet"),
+                        }
+                    )
+                ),
+            },
+            required=["targets"]
+        )
+    )
+    def post(self, request):
+        targets = {}
+        items = request.data.get('targets')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'targets boş olmayan bir liste olmalıdır'}, status=status.HTTP_400_BAD_REQUEST)
+        for item in items:
+            aircraft_id = item.get('aircraft') if isinstance(item, dict) else None
+            quantity = item.get('quantity') if isinstance(item, dict) else None
+            if type(aircraft_id) is not int or type(quantity) is not int or not 0 <= quantity <= self.max_target:
+                return Response(
+                    {'error': f"Her hedef aircraft ve 0-{self.max_target} arası quantity içermelidir"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            targets[aircraft_id] = targets.get(aircraft_id, 0) + quantity
+
+        # numpy sadece planlama istekleri için yüklenir
+        from .planning import optimize
+
+        try:
+            result = optimize(targets, request.site)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
+class BatchView(APIView):
+    """
+    Birden fazla API çağrısını tek istekte çalıştırır. Alt istekler
+    gönderilme sırasıyla, her biri kendi durum kodu ile döner.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "requests": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "id": openapi.Schema(type=openapi.TYPE_STRING, description="Yanıtta dönen istemci anahtarı"),
+                            "method": openapi.Schema(type=openapi.TYPE_STRING, description="HTTP metodu (varsayılan GET)"),
+                            "path": openapi.Schema(type=openapi.TYPE_STRING, description="/api/ ile başlayan yol"),
+                            "params": openapi.Schema(type=openapi.TYPE_OBJECT, description="Sorgu parametreleri"),
+                            "body": openapi.Schema(type=openapi.TYPE_OBJECT, description="İstek gövdesi"),
+                            "headers": openapi.Schema(type=openapi.TYPE_OBJECT, description="If-Match, Idempotency-Key"),
+                        }
+                    )
+                ),
+            },
+            required=["requests"]
+        )
+    )
+    def post(self, request):
+        try:
+            sub_requests = parse_sub_requests(request.data)
+        except BatchError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'responses': execute(request, sub_requests)})
+
+
+# Denetim kayıtları imlecindeki zaman damgasının başlangıcı
+AUDIT_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class AuditView(SiteMixin, APIView):
+    """
+    Denetim kayıtları: parça, kullanıcı, takım ve zaman aralığına göre
+    filtrelenir, en yeniden eskiye (created_at, id) sırasıyla sıralanır.
+    Sonraki sayfa için yanıttaki `next_before` imleci `before` olarak
+    gönderilir. Kayıtlar commit'ten sonra toplu eklendiği için id sırası
+    zaman sırasından farklı olabilir; imleç bu yüzden iki alanı da içerir.
+    Parça ve uçak id'leri saha veritabanına özgü olduğundan kayıtlar her
+    zaman tek bir sahaya göre süzülür: varsayılan olarak isteğin sahası,
+    yöneticiler için `site` parametresiyle seçilen saha. Yöneticiler sahanın
+    tüm kayıtlarını, diğer kullanıcılar kendi takımlarının kayıtlarını görür.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    default_limit = 100
+    max_limit = 1000
+    filter_fields = {
+        'part': 'part_id',
+        'produced_aircraft': 'produced_aircraft_id',
+        'user': 'user_id',
+        'team': 'team_id',
+    }
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('site', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Saha (sadece yöneticiler; varsayılan isteğin sahası)"),
+            openapi.Parameter('part', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Parça ID"),
+            openapi.Parameter('produced_aircraft', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Üretilen uçak ID"),
+            openapi.Parameter('user', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Kullanıcı ID"),
+            openapi.Parameter('team', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Takım ID"),
+            openapi.Parameter('action', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="ör. part.produced, part.consumed"),
+            openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Başlangıç zamanı (ISO 8601)"),
+            openapi.Parameter('until', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Bitiş zamanı (ISO 8601)"),
+            openapi.Parameter('before', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Önceki sayfanın next_before imleci"),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="En fazla kayıt sayısı"),
+        ]
+    )
+    def get(self, request):
+        site = get_current_site()
+        if request.user.is_staff and 'site' in request.query_params:
+            site = request.query_params['site']
+            if site not in settings.SITE_DATABASES:
+                return Response({'error': f"Tanımsız saha: {site}"}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = AuditEntry.objects.filter(site=site)
+        try:
+            for param, lookup in self.filter_fields.items():
+                if param in request.query_params:
+                    queryset = queryset.filter(**{lookup: int(request.query_params[param])})
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+            if limit < 1:
+                raise ValueError(limit)
+        except ValueError:
+            return Response(
+                {'error': f"{', '.join(self.filter_fields)} tam sayı, limit pozitif tam sayı olmalıdır"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        for param, lookup in (('since', 'created_at__gte'), ('until', 'created_at__lt')):
+            if param in request.query_params:
+                value = parse_datetime(request.query_params[param])
+                if value is None:
+                    return Response(
+                        {'error': f"{param} ISO 8601 biçiminde olmalıdır"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                queryset = queryset.filter(**{lookup: value})
+        if 'before' in request.query_params:
+            try:
+                created_at, entry_id = self.decode_cursor(request.query_params['before'])
+            except ValueError:
+                return Response({'error': 'Geçersiz before imleci'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=entry_id)
+            )
+        if 'action' in request.query_params:
+            queryset = queryset.filter(action=request.query_params['action'])
+
+        if not request.user.is_staff:
+            team_id = Personnel.objects.filter(user=request.user).values_list('team_id', flat=True).first()
+            queryset = queryset.filter(team_id=team_id)
+
+        entries = list(queryset.order_by('-created_at', '-id')[:limit])
+        return Response({
+            'results': AuditEntrySerializer(entries, many=True).data,
+            'next_before': self.encode_cursor(entries[-1]) if len(entries) == limit else None,
+        })
+
+    @staticmethod
+    def encode_cursor(entry):
+        """Kaydın (created_at, id) konumu: '<epoch mikrosaniye>_<id>'."""
+        return f"{(entry.created_at - AUDIT_EPOCH) // timedelta(microseconds=1)}_{entry.id}"
+
+    @staticmethod
+    def decode_cursor(value):
+        microseconds, entry_id = value.split('_')
+        return AUDIT_EPOCH + timedelta(microseconds=int(microseconds)), int(entry_id)
+
+
+class SiteReportView(APIView):
+    """
+    Sahalar arası üretim raporu. Her sahanın veritabanı paralel olarak
+    sorgulanır (scatter) ve sonuçlar birleştirilir (gather).
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    @staticmethod
+    def get_site_summary(site):
+        return {
+            'stock': dict(
+                PartStock.objects.filter(is_deleted=False)
+                .values('part_type_id').annotate(total=Sum('stock_quantity'))
+                .values_list('part_type_id', 'total')
+            ),
+            'produced_aircrafts': dict(
+                ProducedAircraft.objects.filter(is_deleted=False)
+                .values('aircraft_id').annotate(total=Count('id'))
+                .values_list('aircraft_id', 'total')
+            ),
+        }
+
+    @staticmethod
+    def format_counts(counts, names):
+        return [
+            {'id': object_id, 'name': names.get(object_id), 'total': total}
+            for object_id, total in sorted(counts.items())
+        ]
+
+    def get(self, request):
+        summaries = scatter_gather(self.get_site_summary)
+        part_type_names = dict(PartType.objects.values_list('id', 'name'))
+        aircraft_names = dict(Aircraft.objects.values_list('id', 'name'))
+
+        totals = {'stock': {}, 'produced_aircrafts': {}}
+        sites = {}
+        for site, summary in summaries.items():
+            for key, counts in summary.items():
+                for object_id, total in counts.items():
+                    totals[key][object_id] = totals[key].get(object_id, 0) + (total or 0)
+            sites[site] = {
+                'stock': self.format_counts(summary['stock'], part_type_names),
+                'produced_aircrafts': self.format_counts(summary['produced_aircrafts'], aircraft_names),
+            }
+
+        return Response({
+            'sites': sites,
+            'totals': {
+                'stock': self.format_counts(totals['stock'], part_type_names),
+                'produced_aircrafts': self.format_counts(totals['produced_aircrafts'], aircraft_names),
+            },
+        })
+
+
 class AircraftPartViewSet(BaseViewSet):
+    """
+    Üretilen uçak-parça bağlantıları (sadece okuma). Bağlantılar montajda
+    oluşturulur ve sonra değişmez; üretilen uçakların önbellekteki JSON
+    çıktısı (bkz. render_cache.py) bu varsayıma dayanır.
+    """
     queryset = AircraftPart.objects.all()
     serializer_class = AircraftPartSerializer
+    http_method_names = ['get', 'head', 'options']
+
+    def get_queryset(self):
+        # Bağlantıların kendi is_deleted alanı yoktur, uçağınki kullanılır
+        return self.queryset.filter(produced_aircraft__is_deleted=False).order_by('id')
 
 class AircraftPartRequirementViewSet(BaseViewSet):
     """
@@ -565,49 +1527,3 @@ class AircraftPartRequirementViewSet(BaseViewSet):
         if aircraft_id:
             queryset = queryset.filter(aircraft_id=aircraft_id)
         return queryset
-
-# DataTable Views
-class AircraftDatatableView(BaseDataTableViewSet):
-    model = Aircraft
-    columns = ['id', 'name', 'description']
-    order_columns = ['id', 'name', 'description']
-    searchable_columns = ['name', 'description']
-
-class PartDatatableView(BaseDataTableViewSet):
-    model = Part
-    columns = ['id', 'part_type__name', 'aircraft__name', 'team__name', 'status', 'stock']
-    order_columns = ['id', 'part_type__name', 'aircraft__name', 'team__name', 'status', 'stock']
-    searchable_columns = ['part_type__name', 'aircraft__name', 'team__name']
-
-    def get_initial_queryset(self):
-        qs = super().get_initial_queryset()
-        try:
-            personnel = Personnel.objects.get(user=self.request.user)
-            if personnel.team.name == 'Montaj Takımı':
-                return qs.filter(status='stock')
-            return qs.filter(team=personnel.team)
-        except Personnel.DoesNotExist:
-            return Part.objects.none()
-
-    def render_column(self, row, column):
-        if column == 'part_type__name':
-            return row.part_type.name if row.part_type else ''
-        elif column == 'aircraft__name':
-            return row.aircraft.name if row.aircraft else ''
-        elif column == 'team__name':
-            return row.team.name if row.team else ''
-        else:
-            return super().render_column(row, column)
-
-class ProducedAircraftDatatableView(BaseDataTableViewSet):
-    model = ProducedAircraft
-    columns = ['id', 'aircraft__name', 'date']
-    order_columns = ['id', 'aircraft__name', 'date']
-    searchable_columns = ['aircraft__name']
-
-    def render_column(self, row, column):
-        if column == 'aircraft__name':
-            return row.aircraft.name if row.aircraft else ''
-        else:
-            return super().render_column(row, column)
-        
@@ -42,12 +42,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'apps.production.throttling.AdmissionControlThrottle',
+    ),
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-    'ROTATE_REFRESH_TOKENS': False,
+    'ROTATE_REFRESH_TOKENS': True,
+    # İptal listesi önbellekte tutulur (apps/production/tokens.py); birden fazla
+    # worker için CACHE_URL ile paylaşılan önbellek gerekir (check --deploy)
     'BLACKLIST_AFTER_ROTATION': True,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
@@ -60,6 +65,7 @@ SIMPLE_JWT = {
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'apps.production.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,6 +87,11 @@ SWAGGER_SETTINGS = {
     },
     'USE_SESSION_AUTH': False,
     'VALIDATOR_URL': None,
+    # Arayüzler şemayı önceden üretilmiş /swagger.json dosyasından yükler
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
 }
 
 
@@ -107,6 +118,29 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 import os
 
+# Uygulama profili. 'api' profili sadece JWT ile çalışan API worker'ları
+# içindir: oturum, mesaj, admin ve dokümantasyon arayüzü uygulamaları ile
+# middleware'leri yüklenmez, /admin/, /swagger/ ve /redoc/ adresleri
+# tanımlanmaz (bkz. startup_profile komutu).
+APP_PROFILE = os.environ.get('APP_PROFILE', 'full')
+if APP_PROFILE == 'api':
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS
+        if app not in (
+            'django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages',
+            'django.contrib.staticfiles', 'drf_yasg', 'django_datatables_view',
+        )
+    ]
+    MIDDLEWARE = [
+        middleware for middleware in MIDDLEWARE
+        if middleware not in (
+            'django.contrib.sessions.middleware.SessionMiddleware',
+            'django.contrib.auth.middleware.AuthenticationMiddleware',
+            'django.contrib.messages.middleware.MessageMiddleware',
+        )
+    ]
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove('django.contrib.messages.context_processors.messages')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -118,6 +152,174 @@ DATABASES = {
     }
 }
 
+# Okuma replikaları. POSTGRES_REPLICA_HOSTS virgülle ayrılmış host listesidir
+# (ör. db-replica-1,db-replica-2). Güvenli metotlu API okumaları bu
+# replikalara, yazmalar ve transaction içindeki okumalar birincil
+# veritabanına gider (bkz. apps/production/db_routers.py).
+REPLICA_DATABASES = []
+for index, host in enumerate(filter(None, os.environ.get('POSTGRES_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+# Üretim sahaları. Her sahanın işlem verisi kendi veritabanındadır
+# (bkz. apps/production/sites.py). Varsayılan saha birincil veritabanını
+# kullanır; ek sahalar SITE_SHARDS ile tanımlanır (ör. IZM=db-izm,ANK=db-ank).
+DEFAULT_SITE = os.environ.get('DEFAULT_SITE', 'MERKEZ')
+SITE_DATABASES = {DEFAULT_SITE: 'default'}
+for entry in filter(None, os.environ.get('SITE_SHARDS', '').split(',')):
+    site, _, host = entry.partition('=')
+    alias = f'site_{site.strip().lower()}'
+    DATABASES[alias] = {**DATABASES['default'], 'HOST': host.strip()}
+    SITE_DATABASES[site.strip()] = alias
+
+DATABASE_ROUTERS = [
+    'apps.production.db_routers.SiteRouter',
+    'apps.production.db_routers.PrimaryReplicaRouter',
+]
+
+# Yazma yapan kullanıcının okumalarının birincil veritabanına sabitlendiği süre (sn)
+REPLICA_PIN_SECONDS = 10
+
+# Önbellek. Admission control sayaçlarının ve token iptal listesinin worker'lar
+# arasında paylaşılması için CACHE_URL ile Redis kullanılmalıdır
+# (ör. redis://redis:6379/0). CACHE_URL yoksa süreç içi önbellek kullanılır ve
+# check --deploy hata verir.
+CACHES = {
+    'default': {
+        'BACKEND': (
+            'django.core.cache.backends.redis.RedisCache' if os.environ.get('CACHE_URL')
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_URL', ''),
+    }
+}
+
+# Ağır uç noktalar için giriş kontrolü (apps/production/throttling.py)
+ADMISSION_CONTROL = {
+    'ENABLED': os.environ.get('ADMISSION_CONTROL_ENABLED', 'True') == 'True',
+    # Kullanıcı ve takım başına token bucket (oran ve anlık patlama kapasitesi)
+    'USER_RATE': '60/min',
+    'USER_BURST': 20,
+    'TEAM_RATE': '240/min',
+    'TEAM_BURST': 60,
+    # Aynı anda işlenebilecek ağır istek sayıları
+    'USER_CONCURRENCY': 2,
+    'TEAM_CONCURRENCY': 6,
+    # Toplam worker kapasitesinin altında tutulmalı; kalan kapasite yazma işlemlerine ayrılır
+    'GLOBAL_READ_CONCURRENCY': int(os.environ.get('ADMISSION_GLOBAL_READ_CONCURRENCY', '16')),
+}
+
+# Özdeş eşzamanlı ağır okumaların tek hesaplamada birleştirilmesi (apps/production/coalescing.py)
+COALESCING = {
+    'ENABLED': os.environ.get('COALESCING_ENABLED', 'True') == 'True',
+    # Hesaplanan yanıtın özdeş isteklere paylaştırılmaya devam ettiği süre (sn)
+    'TTL': 1,
+    # Devam eden hesaplamanın en fazla beklenme süresi (sn); aşılırsa istek kendisi hesaplar
+    'WAIT_TIMEOUT': 5,
+    # Çöken worker'ın bıraktığı kilidin kendiliğinden düşme süresi (sn)
+    'LOCK_TIMEOUT': 30,
+    # Anahtara dahil edilmeyen parametreler (DataTables sayacı ve önbellek kırıcı)
+    'IGNORED_PARAMS': ('draw', 'sEcho', '_'),
+}
+
+# İstek profilleme (apps/production/profiling.py)
+# ENABLED kapalıyken middleware hiç yüklenmez.
+PROFILING = {
+    'ENABLED': os.environ.get('PROFILING_ENABLED', 'False') == 'True',
+    'OUTPUT_DIR': os.environ.get('PROFILING_OUTPUT_DIR', str(BASE_DIR / 'profiles')),
+    # Her N istekten birini profille (0 = örnekleme kapalı)
+    'SAMPLE_RATE': int(os.environ.get('PROFILING_SAMPLE_RATE', '0')),
+    # Örneklenen istek bu süreden (ms) kısa sürerse kaydedilmez
+    'SLOW_THRESHOLD_MS': int(os.environ.get('PROFILING_SLOW_THRESHOLD_MS', '500')),
+}
+
+# Önceden üretilmiş OpenAPI şeması (apps/production/schema.py).
+# APP_VERSION tanımlı değilse sürüm kaynak dosyaların özetinden hesaplanır.
+APP_VERSION = os.environ.get('APP_VERSION')
+OPENAPI = {
+    'OUTPUT_DIR': os.environ.get('OPENAPI_OUTPUT_DIR', str(BASE_DIR / 'openapi')),
+}
+
+# Asenkron denetim kaydı (apps/production/audit.py)
+AUDIT = {
+    # Tampondaki kayıt sayısı bu değere ulaşınca toplu yazılır
+    'BATCH_SIZE': 500,
+    # Arka planda boşaltma aralığı (sn); None ise sadece dolunca ve süreç kapanırken yazılır
+    'FLUSH_INTERVAL': 1.0,
+    # Veritabanı yetişemezse bu sayıdan sonra yazma işlemleri boşaltmayı bekler
+    'MAX_PENDING': 50000,
+    # Çökmelere karşı tampon kopyası; None ise kapalı
+    'SPOOL_DIR': os.environ.get('AUDIT_SPOOL_DIR', str(BASE_DIR / 'audit_spool')),
+}
+
+# Toplu API istekleri (apps/production/batch.py)
+BATCH = {
+    # Tek toplu istekteki en fazla alt istek sayısı
+    'MAX_REQUESTS': 20,
+    # Ardışık GET alt isteklerini paralel çalıştıran iş parçacığı sayısı; 1 ise sırayla çalışır
+    'MAX_WORKERS': 4,
+}
+
+# Üretilen uçakların JSON çıktı önbelleği (apps/production/render_cache.py)
+RENDER_CACHE = {
+    # Kayıtlar silinince açıkça geçersiz kılınır; süre sadece eski katalog sürümlerinin anahtarlarını temizler (sn)
+    'TIMEOUT': 7 * 86400,
+}
+
+# Giriş, parolayı süreç havuzunda doğrulayan ModelBackend ile yapılır (apps/production/hashing.py)
+AUTHENTICATION_BACKENDS = ['apps.production.hashing.PooledPasswordBackend']
+
+# Toplu personel aktarımında parola özetleme ve girişte parola doğrulama (apps/production/hashing.py)
+PASSWORD_HASHING = {
+    # Süreç havuzu boyutu; None ise çekirdek sayısı
+    'WORKERS': None,
+    # Bu sayıdan az parola süreç havuzu kullanılmadan özetlenir
+    'MIN_PARALLEL': 16,
+    # Girişte parola doğrulayan kalıcı süreç havuzu; None ise çekirdek sayısı, 0 ise istek içinde
+    'VERIFY_WORKERS': None,
+    # Aynı anda doğrulanan/bekleyen en fazla parola sayısı
+    'VERIFY_MAX_PENDING': 64,
+    # Sıra bekleme süresi (sn); aşılırsa giriş 503 ile reddedilir
+    'VERIFY_WAIT_TIMEOUT': 5,
+}
+
+# Montaj siparişi kuyruğu (apps/production/orders.py)
+ASSEMBLY_ORDERS = {
+    # Stok artışında istek içinde karşılanan en fazla sipariş; kalanlar fulfil_orders komutu ile karşılanır
+    'MAX_PER_TRIGGER': 5,
+}
+
+# Montaj için parça rezervasyonları (apps/production/reservations.py)
+PART_RESERVATIONS = {
+    # Rezervasyonun geçerlilik süresi; dolanlar expire_reservations komutu ile stoğa geri döner
+    'TTL': timedelta(minutes=30),
+    # Temizlikte tek transaction içinde bırakılan en fazla rezervasyon sayısı
+    'SWEEP_BATCH_SIZE': 500,
+}
+
+# Worker açılış süresi bütçesi (apps/production/management/commands/startup_profile.py)
+STARTUP_PROFILE = {
+    # API profilinde django.setup + URL yükleme + ilk yanıt için üst sınır (ms)
+    'BUDGET_MS': int(os.environ.get('STARTUP_BUDGET_MS', '1500')),
+    # Açılışta yüklenmemesi gereken modüller; ilk kullanımda içe aktarılırlar
+    'LAZY_MODULES': ('numpy', 'drf_yasg.views', 'drf_yasg.generators', 'django_datatables_view.base_datatable_view', 'jsonschema'),
+}
+
+# Idempotency-Key desteği (apps/production/idempotency.py)
+IDEMPOTENCY = {
+    # Saklanan yanıtların geçerlilik süresi (purge_idempotency_keys komutu ile temizlenir)
+    'TTL': timedelta(hours=24),
+    # Aynı anahtarla eşzamanlı gelen isteğin ilk isteği bekleyeceği en uzun süre (sn)
+    'WAIT_TIMEOUT': 10,
+    # Bu süreden uzun süredir tamamlanmamış kayıtlar yarıda kalmış kabul edilir (sn)
+    'STALE_AFTER': 300,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -1,34 +1,27 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include, re_path
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
+from apps.production.schema import schema_file_view, schema_ui_view
 
-# Swagger/OpenAPI şeması
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Aircraft Production API",
-      default_version='v1',
-      description="API documentation",
-      license=openapi.License(name="BSD License"),
-   ),
-   public=True,
-   permission_classes=[permissions.AllowAny],
-)
 
 urlpatterns = [
-    # Admin
-    path('admin/', admin.site.urls),
-    
     # API URLs
     path('api/', include('apps.production.urls')),
     
     
-    # Swagger/OpenAPI documentation
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # OpenAPI şeması önceden üretilmiş dosyadan sunulur
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_file_view, name='schema-json'),
 ]
 
+# API profilinde (APP_PROFILE=api) admin ve dokümantasyon arayüzleri yüklenmez
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
 
+if 'drf_yasg' in settings.INSTALLED_APPS:
+    # Swagger/OpenAPI arayüzleri; drf_yasg görünümleri ilk istekte yüklenir
+    urlpatterns += [
+        path('swagger/', schema_ui_view('swagger'), name='schema-swagger-ui'),
+        path('redoc/', schema_ui_view('redoc'), name='schema-redoc'),
+    ]
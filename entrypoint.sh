@@ -7,11 +7,17 @@ while ! nc -z db 5432; do
 done
 echo "Veritabanı hazır!"
 
+# Dağıtım kontrolleri (ör. paylaşılan önbellek olmadan token iptali)
+python manage.py check --deploy --fail-level ERROR || exit 1
+
 # Migrationları uygula
 python manage.py migrate
 
 # Fixture'ları yükle
 python manage.py loaddata initial_data
 
+# OpenAPI şemasını üret
+python manage.py generate_schema
+
 # Django uygulamasını başlat
 exec "$@"